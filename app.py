@@ -28,6 +28,15 @@ try:
     from ui.night_ui import render_night_phase
     from ui.day_ui import render_day_phase
     from ui.game_over_ui import render_game_over
+    from ui.spectator_ui import render_spectator
+    from ui.replay_ui import render_replay
+    from ui.stats_ui import render_stats
+    from ui.history_ui import render_history
+    from ui.checkpoint_ui import save_checkpoint, render_resume, pending_resume_game_id
+    from ui.room_ui import room_session, join_room, pending_room_code, render_room_sidebar
+    from ui.device_ui import render_device_night, render_seat_sidebar
+    from ui.resources import get_admission_controller
+    from ui.session_state import collect_session_garbage, render_memory_report
 except ImportError as e:
     st.error(f"UIモジュールのインポートに失敗しました: {e}")
     st.error("プロジェクト構造を確認し、ui ディレクトリとファイルが存在するか確認してください。")
@@ -45,45 +54,85 @@ if 'stage' not in st.session_state:
     st.session_state.player_names = [] # 初期化を元に戻す
     # st.session_state.role_counts = {} # これは role_setup で初期化
     st.session_state.error_message = "" # これは setup UI でも使う可能性あり
+    # URL にルームコードがあれば、そのルームのゲームを開く
+    room_code = pending_room_code()
+    if room_code:
+        join_room(room_code)
+    # URL に中断したゲームのIDがあれば (ブラウザの再読み込みやサーバーの再起動後)、再開を確認する
+    else:
+        resume_game_id = pending_resume_game_id()
+        if resume_game_id:
+            st.session_state.stage = 'resume'
+            st.session_state.resume_game_id = resume_game_id
 
 # --- アプリケーションのタイトル ---
 st.title("人狼ゲーム🐺")
+render_room_sidebar()
+render_seat_sidebar()
 
 # --- ステージに応じたUIの描画 ---
-if st.session_state.stage == 'initial_setup':
-    render_initial_setup()
+# ルームに参加していれば、ルームのゲームを読み込んで描画し、終わったらルームに書き戻す
+# 描画が st.rerun / st.stop で中断された場合も、最後にチェックポイントを取る
+# 描画中は受付制御に知らせ、観戦用のボット対戦などのバックグラウンドの処理より優先させる
+# フェーズが変わったら、前のフェーズの入力欄などのキーを画面の状態から捨てる (長く続けてもセッションが太らないように)
+with get_admission_controller().live(), room_session():
+    try:
+        collect_session_garbage()
+        render_memory_report()
+        if st.session_state.stage == 'initial_setup':
+            render_initial_setup()
 
-elif st.session_state.stage == 'role_setup':
-    render_role_setup()
+        elif st.session_state.stage == 'role_setup':
+            render_role_setup()
 
-elif st.session_state.stage == 'confirm_setup':
-    render_confirm_setup()
+        elif st.session_state.stage == 'confirm_setup':
+            render_confirm_setup()
 
-elif st.session_state.stage == 'night_phase':
-    # GameManager の存在チェック
-    if 'game_manager' not in st.session_state:
-        st.error("ゲーム状態が不正です。設定画面に戻ります。")
-        st.session_state.stage = 'initial_setup'
-        st.rerun()
-    else:
-        render_night_phase()
-
-elif st.session_state.stage == 'day_phase':
-    # GameManager の存在チェック
-    if 'game_manager' not in st.session_state:
-        st.error("ゲーム状態が不正です。設定画面に戻ります。")
-        st.session_state.stage = 'initial_setup'
-        st.rerun()
-    else:
-        render_day_phase()
-
-elif st.session_state.stage == 'game_over':
-    # GameManager の存在チェックは render_game_over 内で行われる
-    render_game_over()
-
-# --- どのステージにも当てはまらない場合 (念のため) ---
-else:
-    st.error("不明なアプリケーションステージです。リセットします。")
-    for key in list(st.session_state.keys()):
-        del st.session_state[key]
-    st.rerun()
+        elif st.session_state.stage == 'night_phase':
+            # GameManager の存在チェック
+            if 'game_manager' not in st.session_state:
+                st.error("ゲーム状態が不正です。設定画面に戻ります。")
+                st.session_state.stage = 'initial_setup'
+                st.rerun()
+            # 各自の端末で参加するゲームでは、全員の夜アクションを並行して受け付ける
+            elif st.session_state.get("multi_device"):
+                render_device_night()
+            else:
+                render_night_phase()
+
+        elif st.session_state.stage == 'day_phase':
+            # GameManager の存在チェック
+            if 'game_manager' not in st.session_state:
+                st.error("ゲーム状態が不正です。設定画面に戻ります。")
+                st.session_state.stage = 'initial_setup'
+                st.rerun()
+            else:
+                render_day_phase()
+
+        elif st.session_state.stage == 'game_over':
+            # GameManager の存在チェックは render_game_over 内で行われる
+            render_game_over()
+
+        elif st.session_state.stage == 'spectator':
+            render_spectator()
+
+        elif st.session_state.stage == 'resume':
+            render_resume()
+
+        elif st.session_state.stage == 'replay':
+            render_replay()
+
+        elif st.session_state.stage == 'stats':
+            render_stats()
+
+        elif st.session_state.stage == 'history':
+            render_history()
+
+        # --- どのステージにも当てはまらない場合 (念のため) ---
+        else:
+            st.error("不明なアプリケーションステージです。リセットします。")
+            for key in list(st.session_state.keys()):
+                del st.session_state[key]
+            st.rerun()
+    finally:
+        save_checkpoint()
@@ -12,3 +12,32 @@ DEFAULT_ROLE_COUNTS = {
 }
 
 DEFAULT_PLAYER_COUNT = sum(DEFAULT_ROLE_COUNTS.values())
+
+# ゲーム結果を保存する SQLite データベースのパス
+RESULTS_DB_PATH = "result/results.db"
+
+# 進行中のゲームのチェックポイントを保存するディレクトリ
+CHECKPOINT_DIR = "result/checkpoints"
+
+# ルーム (ゲーム卓) の上限。超えた分と、放置時間を超えたルームはチェックポイントに退避してメモリから外す
+ROOM_MAX_LOADED_ROOMS = 200
+ROOM_MAX_BYTES = 256 * 1024 * 1024
+ROOM_IDLE_TTL = 30 * 60 # 秒
+
+# 受付制御。プロセスの CPU 使用量 (コア数換算) や待ち行列の長さがしきい値を超えると、
+# 新しいルームを待たせ (最大 ADMISSION_ROOM_WAIT 秒)、観戦用のボット対戦などのバックグラウンドの処理を断る
+ADMISSION_MAX_CPU = 0.8
+ADMISSION_MAX_QUEUE = 20
+ADMISSION_WORKERS = 2
+ADMISSION_ROOM_WAIT = 2.0 # 秒
+ADMISSION_MAX_DEFER = 0.5 # 描画中のセッションがある間、バックグラウンドの処理の開始を遅らせる最大の時間 (秒)
+
+# 生存者がこの人数以上なら、昼の投票を大人数向けの投票用紙 (ページごとにまとめて確定) にする
+LARGE_LOBBY_PLAYERS = 16
+BALLOT_PAGE_SIZE = 10
+
+# 議論タイマーを他の端末での開始・停止に合わせ直す間隔 (秒)
+DISCUSSION_TIMER_SYNC_SECONDS = 5
+
+# 1セッションの画面の状態のメモリの目安 (バイト)。フェーズが変わったときに超えていれば、リプレイのキャッシュなどを捨てる
+SESSION_MEMORY_BUDGET = 8 * 1024 * 1024
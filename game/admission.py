@@ -0,0 +1,254 @@
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Optional
+
+DEFAULT_MAX_CPU = 0.8      # プロセスが使っている CPU (コア数換算)。Python のスレッドは GIL を共有するため、約1コアが上限
+DEFAULT_MAX_QUEUE = 20     # 待たせておけるバックグラウンドの処理の数
+DEFAULT_WORKERS = 2        # バックグラウンドの処理を実行するスレッドの数
+DEFAULT_ROOM_WAIT = 2.0    # 新しいルームを、混雑が収まるまで待たせる最大の時間 (秒)
+DEFAULT_MAX_DEFER = 0.5    # 描画中のセッションがある間、バックグラウンドの処理の開始を遅らせる最大の時間 (秒)
+CPU_SAMPLE_INTERVAL = 0.5  # CPU 使用量を測り直す間隔 (秒)
+WAIT_HISTORY = 200         # 待ち時間の統計に使う直近の件数
+
+
+class Overloaded(RuntimeError):
+    """混雑しているため、新しいルームやバックグラウンドの処理を受け付けられない"""
+
+
+class CpuMonitor:
+    """プロセスの CPU 使用量 (直近の区間で使ったコア数)。呼ばれたときに、前回から interval 秒以上たっていれば測り直す"""
+    def __init__(self, interval: float = CPU_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._wall = time.monotonic()
+        self._cpu = time.process_time()
+        self._load = 0.0
+
+    def __call__(self) -> float:
+        with self._lock:
+            wall = time.monotonic()
+            if wall - self._wall >= self.interval:
+                cpu = time.process_time()
+                self._load = (cpu - self._cpu) / (wall - self._wall)
+                self._wall, self._cpu = wall, cpu
+            return self._load
+
+
+class _Job:
+    __slots__ = ("fn", "args", "future", "submitted")
+
+    def __init__(self, fn, args, submitted):
+        self.fn = fn
+        self.args = args
+        self.future: Future = Future()
+        self.submitted = submitted
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class AdmissionController:
+    """
+    サーバープロセスの受付制御。混雑時に全卓が遅くなる代わりに、新しい仕事を待たせる・断る。
+    - 対話中のセッションの描画 (live) を数え、その間はバックグラウンドの処理 (観戦用のボット対戦など) の開始を遅らせる
+    - バックグラウンドの処理は上限付きのキューに入れ、少数のスレッドで順に実行する (キューがいっぱいなら Overloaded)
+    - 新しいルームは、CPU 使用量かキューの長さがしきい値を超えている間は待たせ、収まらなければ Overloaded
+    - キューと新しいルームの待ち時間を記録し、stats で公開する
+    """
+    def __init__(self, max_cpu: float = DEFAULT_MAX_CPU, max_queue: int = DEFAULT_MAX_QUEUE,
+                 workers: int = DEFAULT_WORKERS, room_wait: float = DEFAULT_ROOM_WAIT,
+                 max_defer: float = DEFAULT_MAX_DEFER, cpu_probe: Optional[Callable[[], float]] = None,
+                 clock=time.monotonic):
+        self.max_cpu = max_cpu
+        self.max_queue = max_queue
+        self.room_wait = room_wait
+        self.max_defer = max_defer
+        self.cpu_probe = cpu_probe or CpuMonitor()
+        self.clock = clock
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._cond = threading.Condition()
+        self._live = 0
+        self._queued = 0
+        self._running = 0
+        self.live_renders = 0
+        self.jobs_done = 0
+        self.rejected_jobs = 0
+        self.rooms_admitted = 0
+        self.rejected_rooms = 0
+        self._job_waits: "deque[float]" = deque(maxlen=WAIT_HISTORY)
+        self._room_waits: "deque[float]" = deque(maxlen=WAIT_HISTORY)
+        self._render_times: "deque[float]" = deque(maxlen=WAIT_HISTORY)
+        self._local = threading.local() # このスレッドで描画中か・描画の中で待った時間
+        self._closed = False
+        self._threads = [threading.Thread(target=self._worker, name=f"admission-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    # --- 対話中の描画 ---
+    @contextmanager
+    def live(self):
+        """セッションの描画 (app.py の1回の実行) の間、バックグラウンドの処理より優先させる"""
+        start = self.clock()
+        self._local.live = True
+        self._local.idle_time = 0.0
+        with self._cond:
+            self._live += 1
+        try:
+            yield
+        finally:
+            self._local.live = False
+            with self._cond:
+                self._live -= 1
+                self.live_renders += 1
+                self._render_times.append(self.clock() - start - self._local.idle_time)
+                if self._live == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def idle(self):
+        """
+        描画の中で待つ間 (新しいルームの受付待ちなど) は描画中に数えず、描画時間にも含めない
+        (待っている間にバックグラウンドの処理を止めないため)。描画の外で使えば何もしない。
+        """
+        if not getattr(self._local, "live", False):
+            yield
+            return
+        start = self.clock()
+        with self._cond:
+            self._live -= 1
+            if self._live == 0:
+                self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._live += 1
+            self._local.idle_time += self.clock() - start
+
+    # --- 混雑の判定 ---
+    def overload_reason(self) -> Optional[str]:
+        """しきい値を超えていればその理由、超えていなければ None"""
+        cpu = self.cpu_probe()
+        if cpu >= self.max_cpu:
+            return f"CPU 使用量 {cpu:.0%}"
+        if self._queued >= self.max_queue:
+            return f"待ち行列 {self._queued} 件"
+        return None
+
+    def admit_room(self):
+        """
+        新しいルームを作ってよいか確かめる。混雑していれば最大 room_wait 秒待ち、収まらなければ Overloaded。
+        既存のルームへの参加や進行中のゲームの描画は制限しない。
+        """
+        start = self.clock()
+        with self.idle():
+            while True:
+                reason = self.overload_reason()
+                if reason is None:
+                    with self._cond:
+                        self.rooms_admitted += 1
+                        self._room_waits.append(self.clock() - start)
+                    return
+                if self.clock() - start >= self.room_wait:
+                    with self._cond:
+                        self.rejected_rooms += 1
+                    raise Overloaded(reason)
+                time.sleep(0.05)
+
+    # --- バックグラウンドの処理 ---
+    def submit(self, fn: Callable, *args) -> Future:
+        """バックグラウンドの処理をキューに入れる。キューがいっぱいなら Overloaded"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("受付制御は停止しています。")
+            if self._queued >= self.max_queue:
+                self.rejected_jobs += 1
+                raise Overloaded(f"待ち行列 {self._queued} 件")
+            self._queued += 1
+        job = _Job(fn, args, self.clock())
+        self._queue.put(job)
+        return job.future
+
+    def queue_position(self, future: Future) -> Optional[int]:
+        """キューで待っている処理の順番 (1 から)。実行中・完了済みなら None"""
+        with self._queue.mutex:
+            for position, job in enumerate(self._queue.queue, start=1):
+                if job is not None and job.future is future:
+                    return position
+        return None
+
+    def _wait_for_live(self):
+        """描画中のセッションがなくなるまで (最大 max_defer 秒) 待つ"""
+        deadline = self.clock() + self.max_defer
+        with self._cond:
+            while self._live > 0:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            self._wait_for_live()
+            with self._cond:
+                self._queued -= 1
+                self._job_waits.append(self.clock() - job.submitted)
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            with self._cond:
+                self._running += 1
+            try:
+                job.future.set_result(job.fn(*job.args))
+            except BaseException as e:
+                job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    self.jobs_done += 1
+
+    def close(self):
+        """受付を止め、キューに残った処理を実行してからスレッドを止める"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    # --- 状況 ---
+    def stats(self) -> Dict[str, Any]:
+        """CPU 使用量・描画中のセッション数・キューの長さと待ち時間 (ミリ秒)・断った件数"""
+        cpu = self.cpu_probe()
+        with self._cond:
+            job_waits = list(self._job_waits)
+            room_waits = list(self._room_waits)
+            render_times = list(self._render_times)
+            return {
+                "cpu": cpu,
+                "live": self._live,
+                "live_renders": self.live_renders,
+                "render_p95_ms": 1000 * _percentile(render_times, 0.95),
+                "queued": self._queued,
+                "running": self._running,
+                "jobs_done": self.jobs_done,
+                "job_wait_mean_ms": 1000 * sum(job_waits) / len(job_waits) if job_waits else 0.0,
+                "job_wait_p95_ms": 1000 * _percentile(job_waits, 0.95),
+                "room_wait_p95_ms": 1000 * _percentile(room_waits, 0.95),
+                "rooms_admitted": self.rooms_admitted,
+                "rejected_rooms": self.rejected_rooms,
+                "rejected_jobs": self.rejected_jobs,
+            }
@@ -0,0 +1,154 @@
+import random
+from typing import Dict, List, Optional, Type
+from collections import Counter
+
+import numpy as np
+
+from .player import Player
+from .inference import NUM_FEATURES, ACTION_INDEX, evaluate_batch, default_service
+
+
+class Bot:
+    """
+    ボット (自動プレイヤー) の基底クラス。
+    夜アクションの対象と昼の投票先を決定する。
+    1ゲーム・1プレイヤーにつき1インスタンスを生成し、占い結果などの記憶を保持する。
+    """
+    name = "base"
+
+    def __init__(self, player: Player, rng: random.Random):
+        self.player = player
+        self.rng = rng
+        self.seer_results: Dict[str, str] = {} # 占った相手の名前 -> 結果
+
+    def observe_seer_result(self, target_name: str, result: str):
+        """占い結果を記憶する"""
+        self.seer_results[target_name] = result
+
+    def known_wolves(self) -> List[str]:
+        """占いで人狼と判明している (と思っている) プレイヤー名のリスト"""
+        return [name for name, result in self.seer_results.items() if result == "人狼"]
+
+    def choose_night_target(self, gm, options: List[str]) -> Optional[str]:
+        """夜アクションの対象を options から選ぶ。"""
+        return self.rng.choice(options) if options else None
+
+    def choose_vote(self, gm, options: List[str], current_votes: Dict[str, str]) -> Optional[str]:
+        """
+        昼の投票先を options から選ぶ。
+        current_votes: これまでに投票したプレイヤー名 -> 投票先
+        """
+        candidates = [name for name in options if name != self.player.name]
+        return self.rng.choice(candidates) if candidates else None
+
+
+class RandomBot(Bot):
+    """合法手からランダムに選ぶボット"""
+    name = "random"
+
+
+class TeamAwareBot(Bot):
+    """
+    自分の役職で知り得る情報を使うボット。
+    - 人狼: 仲間の人狼には投票しない
+    - 占い師: 人狼判定の相手に投票し、村人判定の相手は避ける
+    - 騎士/占い師: 未確認のプレイヤーを優先して守る・占う
+    """
+    name = "team_aware"
+
+    def _wolf_partners(self, gm) -> List[str]:
+        if self.player.role.name != "人狼":
+            return []
+        return [p.name for p in gm.players if p.role.name == "人狼" and p.name != self.player.name]
+
+    def choose_night_target(self, gm, options: List[str]) -> Optional[str]:
+        if not options:
+            return None
+        unknown = [name for name in options if name not in self.seer_results]
+        if self.player.role.name in ("占い師", "偽占い師") and unknown:
+            return self.rng.choice(unknown)
+        return self.rng.choice(options)
+
+    def choose_vote(self, gm, options: List[str], current_votes: Dict[str, str]) -> Optional[str]:
+        excluded = set(self._wolf_partners(gm)) | {self.player.name}
+        excluded |= {name for name, result in self.seer_results.items() if result != "人狼"}
+        wolves = [name for name in self.known_wolves() if name in options]
+        if wolves:
+            return self.rng.choice(wolves)
+        candidates = [name for name in options if name not in excluded]
+        if not candidates:
+            return super().choose_vote(gm, options, current_votes)
+        return self.rng.choice(candidates)
+
+
+class BandwagonBot(TeamAwareBot):
+    """既に票を集めているプレイヤーに相乗りするボット"""
+    name = "bandwagon"
+
+    def choose_vote(self, gm, options: List[str], current_votes: Dict[str, str]) -> Optional[str]:
+        tally = Counter(target for target in current_votes.values() if target in options)
+        excluded = set(self._wolf_partners(gm)) | {self.player.name}
+        for target, _ in tally.most_common():
+            if target not in excluded:
+                return target
+        return super().choose_vote(gm, options, current_votes)
+
+
+class ScoringBot(Bot):
+    """
+    候補ごとの特徴量 (占い結果・得票など) から人狼らしさを推定し、行動ごとのスコアで選ぶボット。
+    評価は game.inference.evaluate_batch で行い、共有の推論サービスが起動していれば
+    他の部屋のボットの意思決定とまとめて評価される。
+    """
+    name = "scored"
+
+    def features(self, gm, options: List[str], current_votes: Dict[str, str]) -> np.ndarray:
+        """options の各候補の特徴量 (候補数, NUM_FEATURES) を作る"""
+        partners = set()
+        if self.player.role.name == "人狼":
+            partners = {p.name for p in gm.players if p.role.name == "人狼"}
+        received = Counter(current_votes.values())
+        voters = max(len(current_votes), 1)
+        features = np.zeros((len(options), NUM_FEATURES))
+        for i, name in enumerate(options):
+            seer_result = self.seer_results.get(name)
+            features[i] = (
+                1.0,
+                1.0 if seer_result == "人狼" else 0.0,
+                1.0 if seer_result is not None and seer_result != "人狼" else 0.0,
+                received[name] / voters,
+                1.0 if name in partners else 0.0,
+                1.0 if current_votes.get(name) == self.player.name else 0.0,
+            )
+        return features
+
+    def _decide(self, features: np.ndarray, action: str) -> int:
+        noise = np.array([self.rng.random() * 1e-6 for _ in range(len(features))])
+        service = default_service()
+        if service is not None:
+            return service.decide(features, action, noise)
+        return int(evaluate_batch(features[None], np.ones((1, len(features)), dtype=bool),
+                                  np.array([ACTION_INDEX[action]]), noise[None])[0])
+
+    def choose_night_target(self, gm, options: List[str]) -> Optional[str]:
+        if not options:
+            return None
+        action = gm.get_night_action_type(self.player)
+        if action not in ACTION_INDEX:
+            return super().choose_night_target(gm, options)
+        return options[self._decide(self.features(gm, options, {}), action)]
+
+    def choose_vote(self, gm, options: List[str], current_votes: Dict[str, str]) -> Optional[str]:
+        candidates = [name for name in options if name != self.player.name]
+        if not candidates:
+            return None
+        return candidates[self._decide(self.features(gm, candidates, current_votes), "vote")]
+
+
+# ボットを生成するための辞書 (role_dict と同様に名前から引く)
+bot_dict: Dict[str, Type[Bot]] = {
+    "random": RandomBot,
+    "team_aware": TeamAwareBot,
+    "bandwagon": BandwagonBot,
+    "scored": ScoringBot,
+}
@@ -0,0 +1,202 @@
+import os
+import re
+import json
+import time
+import struct
+import random
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+from .game_manager import GameManager
+from .gamelog import encode_game, decode_game
+
+DEFAULT_CHECKPOINT_DIR = "result/checkpoints"
+CHECKPOINT_SUFFIX = ".ckpt"
+
+# スナップショットの先頭 (形式のバージョンを含む)
+CHECKPOINT_MAGIC = b"WWCKPT\x01"
+_RNG_STATE_SIZE = 625 # random.Random の内部状態 (Mersenne Twister) の整数の数
+
+# ゲームIDはファイル名に使うため、英数字・ハイフン・アンダースコアのみ受け付ける
+_GAME_ID_PATTERN = re.compile(r"^[0-9A-Za-z_-]{1,64}$")
+
+
+def encode_checkpoint(gm: GameManager, session: Dict[str, Any], stage: str) -> bytes:
+    """
+    進行中のゲームのスナップショットを作る。
+    ゲームの状態は進行イベント (ゲームログと同じ符号化) と乱数生成器の状態だけを保存し、
+    復元時にイベントを畳み込んで GameManager を作り直す。
+    session には画面の状態 (夜の手番・投票など。JSON にできる値) を渡す。
+
+    形式: MAGIC | ヘッダー長 (u32) | ヘッダー (JSON) | 乱数の状態 (u32 x 625) | 進行イベント
+    """
+    version, internal, gauss_next = gm.rng.getstate()
+    header = json.dumps({
+        "saved_at": time.time(),
+        "stage": stage,
+        "turn": gm.turn,
+        "players": [p.name for p in gm.players],
+        "debug_mode": gm.debug_mode,
+        "rng_version": version,
+        "rng_gauss_next": gauss_next,
+        "session": session,
+    }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return b"".join([
+        CHECKPOINT_MAGIC,
+        struct.pack("<I", len(header)),
+        header,
+        struct.pack(f"<{_RNG_STATE_SIZE}I", *internal),
+        encode_game(gm.game_id, gm.events),
+    ])
+
+
+def read_checkpoint_header(data: bytes) -> Dict[str, Any]:
+    """スナップショットのヘッダー (保存日時・画面・ターン・プレイヤー名など) だけを読む"""
+    if data[:len(CHECKPOINT_MAGIC)] != CHECKPOINT_MAGIC:
+        raise ValueError("チェックポイントの形式が正しくありません。")
+    start = len(CHECKPOINT_MAGIC) + 4
+    (length,) = struct.unpack_from("<I", data, len(CHECKPOINT_MAGIC))
+    return json.loads(data[start:start + length].decode("utf-8"))
+
+
+def decode_checkpoint(data: bytes) -> Tuple[GameManager, Dict[str, Any]]:
+    """encode_checkpoint の逆変換。(GameManager, ヘッダー) を返す (画面の状態はヘッダーの "session")"""
+    header = read_checkpoint_header(data)
+    pos = len(CHECKPOINT_MAGIC) + 4 + struct.unpack_from("<I", data, len(CHECKPOINT_MAGIC))[0]
+    internal = struct.unpack_from(f"<{_RNG_STATE_SIZE}I", data, pos)
+    pos += 4 * _RNG_STATE_SIZE
+    game_id, events = decode_game(memoryview(data)[pos:])
+    rng = random.Random()
+    rng.setstate((header["rng_version"], internal, header["rng_gauss_next"]))
+    gm = GameManager.from_events(events, debug_mode=header["debug_mode"], rng=rng)
+    gm.game_id = game_id
+    return gm, header
+
+
+class CheckpointStore:
+    """
+    チェックポイントをゲームIDごとのファイルに保存するストア。
+    save はキューに積むだけで、書き込みはバックグラウンドのスレッドで行う。
+    同じゲームの書き込みが溜まっている場合は最新のスナップショットだけを書く。
+    書き込みは一時ファイルに書いてから置き換えるため、途中で止まっても前回のファイルが壊れることはない。
+    """
+    def __init__(self, directory: str = DEFAULT_CHECKPOINT_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.last_error: Optional[BaseException] = None
+        self.written = 0
+        self._pending: Dict[str, Optional[bytes]] = {} # ゲームID -> スナップショット (None は削除)
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def path(self, game_id: str) -> str:
+        if not _GAME_ID_PATTERN.match(game_id):
+            raise ValueError(f"ゲームIDが不正です: {game_id!r}")
+        return os.path.join(self.directory, game_id + CHECKPOINT_SUFFIX)
+
+    # --- 書き込み (非同期) ---
+    def save(self, game_id: str, data: bytes):
+        """スナップショットの書き込みを予約する (すぐに戻る)"""
+        self._put(game_id, data)
+
+    def delete(self, game_id: str):
+        """チェックポイントの削除を予約する (ゲーム終了時など)"""
+        self._put(game_id, None)
+
+    def _put(self, game_id: str, data: Optional[bytes]):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("チェックポイントのストアは停止しています。")
+            self._pending[game_id] = data
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """予約済みの書き込みがすべて終わるまで待つ"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending and self._closed:
+                    return
+                pending, self._pending = self._pending, {}
+                self._busy = True
+            for game_id, data in pending.items():
+                try:
+                    if data is None:
+                        self._remove(game_id)
+                    else:
+                        self._write(game_id, data)
+                        self.written += 1
+                except OSError as e:
+                    self.last_error = e
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _write(self, game_id: str, data: bytes):
+        path = self.path(game_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _remove(self, game_id: str):
+        try:
+            os.remove(self.path(game_id))
+        except FileNotFoundError:
+            pass
+
+    # --- 読み込み ---
+    def header(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """保存済みのチェックポイントのヘッダー。なければ (または読めなければ) None"""
+        try:
+            with open(self.path(game_id), "rb") as f:
+                return read_checkpoint_header(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def load(self, game_id: str) -> Optional[Tuple[GameManager, Dict[str, Any]]]:
+        """保存済みのチェックポイントを復元する。なければ None (書き込み待ちのものがあればそれを使う)"""
+        with self._cond:
+            if game_id in self._pending:
+                data = self._pending[game_id]
+                return decode_checkpoint(data) if data is not None else None
+        try:
+            with open(self.path(game_id), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return decode_checkpoint(data)
+
+    def list_checkpoints(self) -> List[Dict[str, Any]]:
+        """保存済みのチェックポイントのヘッダー (新しい順)。各要素に "game_id" を含む"""
+        checkpoints = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(CHECKPOINT_SUFFIX):
+                continue
+            try:
+                with open(entry.path, "rb") as f:
+                    header = read_checkpoint_header(f.read())
+            except (OSError, ValueError):
+                continue
+            header["game_id"] = entry.name[:-len(CHECKPOINT_SUFFIX)]
+            header.pop("session", None)
+            checkpoints.append(header)
+        checkpoints.sort(key=lambda h: h["saved_at"], reverse=True)
+        return checkpoints
@@ -0,0 +1,239 @@
+import os
+import json
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Iterator
+
+import numpy as np
+
+from .env import VectorEnv, PHASE_NIGHT
+from .bot import bot_dict
+
+MANIFEST_NAME = "manifest.json"
+DEFAULT_SHARD_SIZE = 65536 # 1シャードあたりの行数
+
+
+def generate_games(roles: List[str], num_games: int, seed: int, strategies: Optional[List[str]] = None,
+                   num_envs: int = 32) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    ボット同士のゲームを VectorEnv で進め、終了したゲームごとに遷移をまとめて yield する。
+    座席ごとの戦略は strategies からゲームごとにランダムに選ぶ。
+
+    Yields:
+        {
+            "obs": (T, obs_dim) 行動時の観測,
+            "mask": (T, N) 合法手マスク,
+            "action": (T,) 選んだ対象座席,
+            "actor": (T,) 行動した座席,
+            "outcome": (T,) 行動した座席のゲーム結果 (勝利 +1 / 敗北 -1 / 打ち切り 0),
+        }
+    """
+    strategies = strategies or list(bot_dict.keys())
+    rng = random.Random(seed)
+    env = VectorEnv(num_envs, roles, seed=seed)
+    env.reset()
+    bots = [_new_bots(env, k, strategies, rng) for k in range(num_envs)]
+    pending: List[List[tuple]] = [[] for _ in range(num_envs)] # 終了待ちのゲームの遷移
+    actions = np.zeros(num_envs, dtype=np.int64)
+    finished = 0
+
+    while finished < num_games:
+        for k in range(num_envs):
+            actions[k] = _bot_action(env, k, bots[k])
+            pending[k].append((env.obs[k].copy(), env.mask[k].copy(), int(actions[k]), int(env.actor[k])))
+        _, _, rewards, dones = env.step(actions)
+        for k in np.flatnonzero(dones):
+            transitions = pending[k]
+            pending[k] = []
+            bots[k] = _new_bots(env, k, strategies, rng)
+            if finished >= num_games:
+                continue
+            finished += 1
+            actors = np.array([t[3] for t in transitions], dtype=np.int64)
+            yield {
+                "obs": np.stack([t[0] for t in transitions]),
+                "mask": np.stack([t[1] for t in transitions]),
+                "action": np.array([t[2] for t in transitions], dtype=np.int64),
+                "actor": actors,
+                "outcome": rewards[k, actors].astype(np.float32),
+            }
+
+
+def _new_bots(env: VectorEnv, k: int, strategies: List[str], rng: random.Random) -> list:
+    gm = env.game_manager(k)
+    return [bot_dict[rng.choice(strategies)](player, rng) for player in gm.players]
+
+
+def _bot_action(env: VectorEnv, k: int, bots: list) -> int:
+    """ゲーム k の actor のボットに行動を選ばせ、対象座席番号を返す"""
+    gm = env.game_manager(k)
+    bot = bots[int(env.actor[k])]
+    options = [env.player_names[seat] for seat in np.flatnonzero(env.mask[k])]
+    if env.current_phase(k) == PHASE_NIGHT:
+        target = bot.choose_night_target(gm, options)
+        player = gm.players[int(env.actor[k])]
+        if target and gm.get_night_action_type(player) == "seer":
+            # シミュレーターと同じく占い結果をボットに伝える (同じ夜の再問い合わせは記録済みの結果を返すので、
+            # この後 env が占った座席の既知情報に書き込むときも同じ結果になる)
+            bot.observe_seer_result(target, gm.get_seer_result(player, target))
+    else:
+        target = bot.choose_vote(gm, options, env.current_votes(k))
+    return env.name_to_seat[target or options[0]]
+
+
+class ShardWriter:
+    """
+    遷移を固定行数のシャード (.npz, 圧縮) に書き出す。
+    メモリ上にはシャード1つぶんのバッファしか持たない。
+    """
+    def __init__(self, output_dir: str, prefix: str, shard_size: int, obs_dim: int, num_players: int):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.shard_size = shard_size
+        self.shards: List[Dict[str, Any]] = [] # 書き出したシャードの統計
+        self._obs = np.zeros((shard_size, obs_dim), dtype=np.float32)
+        self._mask = np.zeros((shard_size, num_players), dtype=bool)
+        self._action = np.zeros(shard_size, dtype=np.int64)
+        self._actor = np.zeros(shard_size, dtype=np.int64)
+        self._outcome = np.zeros(shard_size, dtype=np.float32)
+        self._rows = 0
+        self._games = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write_game(self, game: Dict[str, np.ndarray]):
+        """1ゲームぶんの遷移を追加する。シャードが埋まったら書き出す。"""
+        start = 0
+        total = len(game["action"])
+        while start < total:
+            count = min(total - start, self.shard_size - self._rows)
+            end = self._rows + count
+            self._obs[self._rows:end] = game["obs"][start:start + count]
+            self._mask[self._rows:end] = game["mask"][start:start + count]
+            self._action[self._rows:end] = game["action"][start:start + count]
+            self._actor[self._rows:end] = game["actor"][start:start + count]
+            self._outcome[self._rows:end] = game["outcome"][start:start + count]
+            self._rows = end
+            start += count
+            if start == total:
+                self._games += 1 # ゲームは最後の遷移を含むシャードで数える
+            if self._rows == self.shard_size:
+                self.flush()
+
+    def flush(self):
+        """バッファに残っている遷移をシャードとして書き出す"""
+        if self._rows == 0:
+            return
+        rows = self._rows
+        filename = f"{self.prefix}-{len(self.shards):05d}.npz"
+        np.savez_compressed(
+            os.path.join(self.output_dir, filename),
+            obs=self._obs[:rows], mask=self._mask[:rows], action=self._action[:rows],
+            actor=self._actor[:rows], outcome=self._outcome[:rows],
+        )
+        outcome = self._outcome[:rows]
+        self.shards.append({
+            "file": filename,
+            "rows": rows,
+            "games": self._games,
+            "win_rate": float((outcome > 0).mean()),
+            "outcome_mean": float(outcome.mean()),
+            "action_counts": np.bincount(self._action[:rows], minlength=self._mask.shape[1]).tolist(),
+        })
+        self._rows = 0
+        self._games = 0
+
+
+def _build_worker(worker_id: int, output_dir: str, roles: List[str], num_games: int, seed: int,
+                  strategies: Optional[List[str]], shard_size: int, num_envs: int) -> List[Dict[str, Any]]:
+    """ワーカープロセス: 担当ぶんのゲームを生成してシャードに書き出し、シャードの統計を返す"""
+    probe = VectorEnv(1, roles)
+    writer = ShardWriter(output_dir, f"shard-w{worker_id:03d}", shard_size, probe.obs_dim, probe.num_players)
+    for game in generate_games(roles, num_games, seed, strategies, num_envs):
+        writer.write_game(game)
+    writer.flush()
+    return writer.shards
+
+
+def build_dataset(output_dir: str, roles: List[str], num_games: int, workers: int = 1, seed: int = 0,
+                  strategies: Optional[List[str]] = None, shard_size: int = DEFAULT_SHARD_SIZE,
+                  num_envs: int = 32) -> Dict[str, Any]:
+    """
+    セルフプレイのデータセットを作成し、マニフェストを書き出して返す。
+    ゲームは workers 個のプロセスに分割され、各プロセスが自分のシャードを直接書き出す。
+    """
+    per_worker = [num_games // workers + (1 if i < num_games % workers else 0) for i in range(workers)]
+    jobs = [(i, output_dir, roles, count, seed * 1000003 + i, strategies, shard_size, num_envs)
+            for i, count in enumerate(per_worker) if count > 0]
+    if workers <= 1:
+        shard_lists = [_build_worker(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shard_lists = list(pool.map(_build_worker, *zip(*jobs)))
+
+    shards = [shard for shard_list in shard_lists for shard in shard_list]
+    probe = VectorEnv(1, roles)
+    manifest = {
+        "roles": list(roles),
+        "obs_dim": probe.obs_dim,
+        "num_players": probe.num_players,
+        "seed": seed,
+        "games": sum(shard["games"] for shard in shards),
+        "rows": sum(shard["rows"] for shard in shards),
+        "shards": shards,
+    }
+    tmp_path = os.path.join(output_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+    return manifest
+
+
+def load_manifest(dataset_dir: str) -> Dict[str, Any]:
+    with open(os.path.join(dataset_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_shards(dataset_dir: str) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    シャードを1つずつ読み込んで yield する (データセット全体をメモリに載せない)。
+    各シャードは {"obs", "mask", "action", "actor", "outcome"} の配列を持つ。
+    """
+    for shard in load_manifest(dataset_dir)["shards"]:
+        with np.load(os.path.join(dataset_dir, shard["file"])) as data:
+            yield {key: data[key] for key in data.files}
+
+
+def iter_batches(dataset_dir: str, batch_size: int) -> Iterator[Dict[str, np.ndarray]]:
+    """シャードをまたいで batch_size 行ずつの遷移を yield する (最後のバッチは端数)"""
+    carry: Optional[Dict[str, np.ndarray]] = None
+    for shard in iter_shards(dataset_dir):
+        if carry is not None:
+            shard = {key: np.concatenate([carry[key], shard[key]]) for key in shard}
+            carry = None
+        rows = len(shard["action"])
+        start = 0
+        while rows - start >= batch_size:
+            yield {key: value[start:start + batch_size] for key, value in shard.items()}
+            start += batch_size
+        if start < rows:
+            carry = {key: value[start:] for key, value in shard.items()}
+    if carry is not None:
+        yield carry
+
+
+if __name__ == "__main__":
+    import argparse
+    import config.settings as settings
+
+    parser = argparse.ArgumentParser(description="セルフプレイのデータセットを作成します")
+    parser.add_argument("output_dir")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    roles = [role for role, count in settings.DEFAULT_ROLE_COUNTS.items() for _ in range(count)]
+    manifest = build_dataset(args.output_dir, roles, args.games, workers=args.workers, seed=args.seed,
+                             shard_size=args.shard_size)
+    print(f"{manifest['games']} ゲーム / {manifest['rows']} 行 / {len(manifest['shards'])} シャード")
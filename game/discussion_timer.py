@@ -0,0 +1,52 @@
+from dataclasses import dataclass, replace, asdict
+from typing import Optional, Dict, Any
+
+
+@dataclass(frozen=True)
+class DiscussionTimer:
+    """
+    昼の議論タイマー。残り時間をサーバー側で持ち、同じルームのすべての端末で共有する。
+    動いている間は開始した時刻 (UNIX 時間) と、その時点の残り秒数だけを持ち、残り時間は読むときに計算する。
+    書き換えずに新しいタイマーを返す (画面の状態の辞書と同じく、置き換えて使う)。
+    """
+    duration: float                     # 設定した議論時間 (秒)
+    remaining: float                    # started_at の時点の残り秒数 (止まっている間はそのまま)
+    started_at: Optional[float] = None  # 動いていれば開始した時刻、止まっていれば None
+
+    @classmethod
+    def new(cls, duration: float) -> "DiscussionTimer":
+        return cls(duration, duration)
+
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None
+
+    def remaining_at(self, now: float) -> float:
+        """now の時点の残り秒数 (0 未満にはならない)"""
+        if self.started_at is None:
+            return self.remaining
+        return max(0.0, self.remaining - (now - self.started_at))
+
+    def start(self, now: float) -> "DiscussionTimer":
+        """開始 (再開)。動いている・時間切れなら何もしない"""
+        if self.running or self.remaining <= 0:
+            return self
+        return replace(self, started_at=now)
+
+    def pause(self, now: float) -> "DiscussionTimer":
+        """一時停止"""
+        if not self.running:
+            return self
+        return replace(self, remaining=self.remaining_at(now), started_at=None)
+
+    def reset(self, duration: Optional[float] = None) -> "DiscussionTimer":
+        """止めて、残り時間を議論時間 (duration を渡せばその時間) に戻す"""
+        return DiscussionTimer.new(self.duration if duration is None else duration)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """画面の状態 (チェックポイント) に保存する形式"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DiscussionTimer":
+        return cls(data["duration"], data["remaining"], data.get("started_at"))
@@ -0,0 +1,273 @@
+import random
+from typing import List, Dict, Any, Optional, Tuple
+from collections import Counter
+
+import numpy as np
+
+from .game_manager import GameManager, TARGETED_ACTION_TYPES
+from .role import role_dict
+from .simulator import MAX_TURNS
+
+# 観測ベクトルで使う役職の並び (one-hot の位置)
+ROLE_NAMES: List[str] = list(role_dict.keys())
+
+PHASE_NIGHT = 0
+PHASE_DAY = 1
+
+
+class _GameSlot:
+    """VectorEnv 内の1ゲームぶんの進行状態"""
+    def __init__(self):
+        self.gm: Optional[GameManager] = None
+        self.phase = PHASE_NIGHT
+        self.deciders: List[int] = []  # このフェーズで行動する座席番号 (順番待ち)
+        self.cursor = 0
+        self.night_actions: Dict[str, Dict[str, Any]] = {}
+        self.votes: Dict[str, str] = {}
+
+
+class VectorEnv:
+    """
+    K ゲームをまとめて進める強化学習向けの環境 (gym の VectorEnv に近いインターフェース)。
+
+    - 各ゲームでは、いま行動すべき座席 (actor) が1つずつ決まっており、step では全ゲームの
+      actor の行動 (対象の座席番号) をまとめて受け取る
+    - 夜は対象を選ぶアクションを持つ生存者が、昼は生存者全員が座席順に行動する
+    - 合法手マスクは夜は GameManager.get_night_target_options (夜画面と同じ規則)、
+      昼は生存者全員 (昼画面の投票先と同じ) から作る
+    - 終了したゲームは自動でリセットされ、rewards にその座席ごとの報酬 (勝利 +1 / 敗北 -1) が入る
+    - obs / mask / rewards / dones / actor は事前に確保した配列で、step のたびに上書きされる
+      (保持したい場合は呼び出し側でコピーすること)
+
+    観測は actor から見た部分観測で、次の区画からなる:
+        自分の座席 (N) / 自分の役職 (R) / 生存 (N) / 既知の人狼 (N) / 占いで村人判定 (N) /
+        本日の得票 (N) / フェーズ (2) / ターン (1)
+    """
+    def __init__(self, num_envs: int, roles: List[str], seed: Optional[int] = None, max_turns: int = MAX_TURNS):
+        self.num_envs = num_envs
+        self.roles = list(roles)
+        self.num_players = len(roles)
+        self.player_names = [f"P{i}" for i in range(self.num_players)]
+        self.name_to_seat = {name: seat for seat, name in enumerate(self.player_names)}
+        self.max_turns = max_turns
+        self._seed_rng = random.Random(seed)
+
+        n = self.num_players
+        r = len(ROLE_NAMES)
+        # 観測ベクトルの区画 (開始位置)
+        self._seat_off = 0
+        self._role_off = n
+        self._alive_off = n + r
+        self._private_off = 2 * n + r      # 既知の人狼 (N) + 村人判定 (N)
+        self._votes_off = 4 * n + r
+        self._phase_off = 5 * n + r
+        self._turn_off = 5 * n + r + 2
+        self.obs_dim = 5 * n + r + 3
+
+        k = num_envs
+        # 外部に返すバッファ
+        self.obs = np.zeros((k, self.obs_dim), dtype=np.float32)
+        self.mask = np.zeros((k, n), dtype=bool)
+        self.rewards = np.zeros((k, n), dtype=np.float32)
+        self.dones = np.zeros(k, dtype=bool)
+        self.actor = np.zeros(k, dtype=np.int64)
+        # 内部状態のバッファ
+        self._alive = np.zeros((k, n), dtype=np.float32)
+        self._role_idx = np.zeros((k, n), dtype=np.int64)
+        self._private = np.zeros((k * n, 2 * n), dtype=np.float32) # (ゲーム, 座席) ごとの既知情報
+        self._votes = np.zeros((k, n), dtype=np.float32)
+        self._phase = np.zeros(k, dtype=np.int64)
+        self._turn = np.zeros(k, dtype=np.float32)
+        self._rows = np.arange(k)
+        self._index = np.zeros(k, dtype=np.int64)
+        self._slots = [_GameSlot() for _ in range(k)]
+
+    # --- 公開API ---
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """全ゲームを初期化し、(obs, mask) を返す"""
+        if seed is not None:
+            self._seed_rng.seed(seed)
+        for k in range(self.num_envs):
+            self._reset_game(k)
+        self.rewards[:] = 0
+        self.dones[:] = False
+        self._encode()
+        return self.obs, self.mask
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        全ゲームの actor の行動を適用し、(obs, mask, rewards, dones) を返す。
+        actions: 形状 (K,) の対象座席番号。mask で許されていない行動は ValueError。
+        """
+        if not self.mask[self._rows, actions].all():
+            bad = int(np.flatnonzero(~self.mask[self._rows, actions])[0])
+            raise ValueError(f"ゲーム {bad} の行動 {int(actions[bad])} は合法手ではありません。")
+        self.rewards[:] = 0
+        self.dones[:] = False
+        for k in range(self.num_envs):
+            self._apply(k, int(actions[k]))
+        self._encode()
+        return self.obs, self.mask, self.rewards, self.dones
+
+    def game_manager(self, k: int) -> GameManager:
+        """ゲーム k の GameManager (ボットによる行動選択や集計用。直接変更しないこと)"""
+        return self._slots[k].gm
+
+    def current_phase(self, k: int) -> int:
+        """ゲーム k の現在のフェーズ (PHASE_NIGHT / PHASE_DAY)"""
+        return self._slots[k].phase
+
+    def current_votes(self, k: int) -> Dict[str, str]:
+        """ゲーム k でこれまでに行われた本日の投票 (投票者名 -> 投票先)"""
+        return dict(self._slots[k].votes)
+
+    # --- ゲーム進行 ---
+    def _reset_game(self, k: int):
+        slot = self._slots[k]
+        rng = random.Random(self._seed_rng.getrandbits(64))
+        gm = GameManager(list(self.player_names), rng=rng)
+        gm.assign_roles(list(self.roles))
+        slot.gm = gm
+
+        n = self.num_players
+        self._alive[k] = 1.0
+        self._private[k * n:(k + 1) * n] = 0.0
+        wolves = [p.id for p in gm.players if p.role.name == "人狼"]
+        for seat, player in enumerate(gm.players):
+            self._role_idx[k, seat] = ROLE_NAMES.index(player.role.name)
+            if player.role.name == "人狼":
+                for wolf_seat in wolves:
+                    self._private[k * n + seat, wolf_seat] = 1.0
+        self._begin_night(k)
+
+    def _begin_night(self, k: int):
+        """夜を開始する。対象を選ぶ行動者がいなければそのまま夜を解決する。"""
+        slot = self._slots[k]
+        gm = slot.gm
+        slot.phase = PHASE_NIGHT
+        gm.start_night()
+        slot.night_actions = {}
+        slot.deciders = []
+        alive_players = gm.get_alive_players()
+        for player in alive_players:
+            action_type = gm.get_night_action_type(player)
+            slot.night_actions[player.name] = {"type": action_type}
+            if action_type in TARGETED_ACTION_TYPES and gm.get_night_target_options(player, alive_players):
+                slot.deciders.append(player.id)
+        slot.cursor = 0
+        self._votes[k] = 0.0
+        if not slot.deciders:
+            self._end_night(k)
+        else:
+            self._set_actor(k)
+
+    def _end_night(self, k: int):
+        slot = self._slots[k]
+        gm = slot.gm
+        gm.resolve_night_actions(slot.night_actions)
+        victory_info = gm.check_victory()
+        gm.start_day()
+        self._sync_alive(k)
+        if victory_info or gm.turn > self.max_turns:
+            self._finish(k)
+            return
+        slot.phase = PHASE_DAY
+        slot.votes = {}
+        slot.deciders = [p.id for p in gm.get_alive_players()]
+        slot.cursor = 0
+        self._set_actor(k)
+
+    def _end_day(self, k: int):
+        slot = self._slots[k]
+        gm = slot.gm
+        gm.execute_day_vote(Counter(slot.votes.values()))
+        victory_info = gm.check_victory()
+        self._sync_alive(k)
+        if victory_info:
+            self._finish(k)
+            return
+        self._begin_night(k)
+
+    def _apply(self, k: int, target_seat: int):
+        slot = self._slots[k]
+        gm = slot.gm
+        player = gm.players[slot.deciders[slot.cursor]]
+        target_name = self.player_names[target_seat]
+        if slot.phase == PHASE_NIGHT:
+            action = slot.night_actions[player.name]
+            action["target"] = target_name
+            if action["type"] == "seer":
+                self._observe_seer(k, player, gm.players[target_seat])
+        else:
+            slot.votes[player.name] = target_name
+            gm.record_vote(player.name, target_name)
+            self._votes[k, target_seat] += 1.0
+
+        slot.cursor += 1
+        if slot.cursor < len(slot.deciders):
+            self._set_actor(k)
+        elif slot.phase == PHASE_NIGHT:
+            self._end_night(k)
+        else:
+            self._end_day(k)
+
+    def _observe_seer(self, k: int, seer, target):
+        """占い結果を占った座席の既知情報に書き込む"""
+        result = self._slots[k].gm.get_seer_result(seer, target.name)
+        row = k * self.num_players + seer.id
+        column = target.id if result == "人狼" else self.num_players + target.id
+        self._private[row, column] = 1.0
+
+    def _finish(self, k: int):
+        """ゲーム終了時の報酬を書き込み、新しいゲームを開始する"""
+        gm = self._slots[k].gm
+        self.dones[k] = True
+        if gm.victory_team is not None:
+            for seat, player in enumerate(gm.players):
+                self.rewards[k, seat] = 1.0 if player.role.team == gm.victory_team else -1.0
+        self._reset_game(k)
+
+    def _sync_alive(self, k: int):
+        for seat, player in enumerate(self._slots[k].gm.players):
+            self._alive[k, seat] = 1.0 if player.alive else 0.0
+
+    def _set_actor(self, k: int):
+        """actor と合法手マスクを更新する"""
+        slot = self._slots[k]
+        gm = slot.gm
+        seat = slot.deciders[slot.cursor]
+        self.actor[k] = seat
+        self._phase[k] = slot.phase
+        self._turn[k] = gm.turn / self.max_turns
+        row = self.mask[k]
+        row[:] = False
+        if slot.phase == PHASE_NIGHT:
+            for name in gm.get_night_target_options(gm.players[seat]):
+                row[self.name_to_seat[name]] = True
+        else:
+            row[:] = self._alive[k] > 0
+
+    # --- 観測のエンコード ---
+    def _encode(self):
+        """全ゲームの actor 視点の観測を obs に書き込む (配列はすべて事前確保済み)"""
+        obs = self.obs
+        n = self.num_players
+        rows = self._rows
+        index = self._index
+
+        obs[:, self._seat_off:self._alive_off] = 0.0
+        np.add(self.actor, self._seat_off, out=index)
+        obs[rows, index] = 1.0
+        np.add(self._role_idx[rows, self.actor], self._role_off, out=index)
+        obs[rows, index] = 1.0
+
+        obs[:, self._alive_off:self._private_off] = self._alive
+        np.multiply(rows, n, out=index)
+        index += self.actor
+        np.take(self._private, index, axis=0, out=obs[:, self._private_off:self._votes_off], mode="clip")
+        obs[:, self._votes_off:self._phase_off] = self._votes
+
+        obs[:, self._phase_off:self._turn_off] = 0.0
+        np.add(self._phase, self._phase_off, out=index)
+        obs[rows, index] = 1.0
+        obs[:, self._turn_off] = self._turn
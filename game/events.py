@@ -0,0 +1,175 @@
+from dataclasses import dataclass, field, fields
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Type
+
+# フェーズ名
+PHASE_NIGHT = "night"
+PHASE_DAY = "day"
+
+
+@dataclass(frozen=True)
+class Event:
+    """ゲーム進行イベントの基底クラス。イベントは追記のみで、書き換えない。"""
+    kind = "event"
+
+
+@dataclass(frozen=True)
+class RolesAssigned(Event):
+    """役職の割り当て (座席順のプレイヤー名と役職名)"""
+    kind = "roles_assigned"
+    players: Tuple[str, ...]
+    roles: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class PhaseStarted(Event):
+    """フェーズの開始 (夜は turn 日目の夜、昼は turn 日目の昼)"""
+    kind = "phase_started"
+    turn: int
+    phase: str
+
+
+@dataclass(frozen=True)
+class NightActionTaken(Event):
+    """夜アクション (action は "attack", "seer", "guard", "medium", "none")"""
+    kind = "night_action"
+    turn: int
+    actor: str
+    action: str
+    target: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SeerResultShown(Event):
+    """占い師/偽占い師に表示した占い結果"""
+    kind = "seer_result"
+    turn: int
+    seer: str
+    target: str
+    result: str
+
+
+@dataclass(frozen=True)
+class VoteCast(Event):
+    """昼の投票 (同じ投票者が投票し直した場合は最後の投票が有効)"""
+    kind = "vote"
+    turn: int
+    voter: str
+    target: str
+
+
+@dataclass(frozen=True)
+class VoteResolved(Event):
+    """投票の締め切り (executed は処刑が決まったプレイヤー。処刑なしの場合は None)"""
+    kind = "vote_resolved"
+    turn: int
+    executed: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class PlayerKilled(Event):
+    """プレイヤーの死亡 (reason は Player.kill と同じ "attack", "execute" など)"""
+    kind = "killed"
+    turn: int
+    player: str
+    reason: str
+
+
+@dataclass(frozen=True)
+class GameEnded(Event):
+    """勝敗の決定"""
+    kind = "game_ended"
+    team: str
+    message: str
+
+
+EVENT_TYPES: Dict[str, Type[Event]] = {
+    cls.kind: cls for cls in (RolesAssigned, PhaseStarted, NightActionTaken, SeerResultShown,
+                              VoteCast, VoteResolved, PlayerKilled, GameEnded)
+}
+
+
+def event_to_dict(event: Event) -> Dict[str, Any]:
+    """イベントを JSON に保存できる辞書にする"""
+    data = {"type": event.kind}
+    data.update({f.name: getattr(event, f.name) for f in fields(event)})
+    if isinstance(event, RolesAssigned):
+        data["players"] = list(event.players)
+        data["roles"] = list(event.roles)
+    return data
+
+
+def event_from_dict(data: Dict[str, Any]) -> Event:
+    """event_to_dict の逆変換"""
+    data = dict(data)
+    cls = EVENT_TYPES[data.pop("type")]
+    if cls is RolesAssigned:
+        data["players"] = tuple(data["players"])
+        data["roles"] = tuple(data["roles"])
+    return cls(**data)
+
+
+@dataclass
+class GameState:
+    """
+    イベント列を先頭から畳み込んで得られるゲームの状態。
+    GameManager が保持する状態と同じものを、イベントだけから再構成する。
+    """
+    players: List[str] = field(default_factory=list)
+    roles: Dict[str, str] = field(default_factory=dict)
+    alive: Dict[str, bool] = field(default_factory=dict)
+    death_info: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    turn: int = 1
+    phase: Optional[str] = None
+    night_actions: Dict[int, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+    seer_results: Dict[int, Dict[str, Dict[str, str]]] = field(default_factory=dict)
+    votes: Dict[int, Dict[str, str]] = field(default_factory=dict)
+    last_night_victims: List[str] = field(default_factory=list)
+    last_executed: Optional[str] = None
+    victory_team: Optional[str] = None
+    victory_message: Optional[str] = None
+
+    def alive_players(self) -> List[str]:
+        return [name for name in self.players if self.alive[name]]
+
+
+def apply_event(state: GameState, event: Event) -> GameState:
+    """1つのイベントを状態に反映する (state をその場で更新して返す)"""
+    if isinstance(event, RolesAssigned):
+        state.players = list(event.players)
+        state.roles = dict(zip(event.players, event.roles))
+        state.alive = {name: True for name in event.players}
+    elif isinstance(event, PhaseStarted):
+        state.turn = event.turn
+        state.phase = event.phase
+        if event.phase == PHASE_NIGHT:
+            state.last_night_victims = []
+    elif isinstance(event, NightActionTaken):
+        action = {"type": event.action}
+        if event.target is not None:
+            action["target"] = event.target
+        state.night_actions.setdefault(event.turn, {})[event.actor] = action
+    elif isinstance(event, SeerResultShown):
+        state.seer_results.setdefault(event.turn, {})[event.seer] = {"target": event.target, "result": event.result}
+    elif isinstance(event, VoteCast):
+        state.votes.setdefault(event.turn, {})[event.voter] = event.target
+    elif isinstance(event, VoteResolved):
+        state.last_executed = event.executed
+    elif isinstance(event, PlayerKilled):
+        if state.alive.get(event.player):
+            state.alive[event.player] = False
+            state.death_info[event.player] = {"turn": event.turn, "reason": event.reason}
+            if state.phase != PHASE_DAY:
+                state.last_night_victims = sorted(state.last_night_victims + [event.player])
+    elif isinstance(event, GameEnded):
+        state.victory_team = event.team
+        state.victory_message = event.message
+    return state
+
+
+def fold_events(events: Iterable[Event], state: Optional[GameState] = None) -> GameState:
+    """イベント列を畳み込んで状態を作る (state を渡すとその続きから反映する)"""
+    if state is None:
+        state = GameState()
+    for event in events:
+        apply_event(state, event)
+    return state
@@ -1,3 +1,4 @@
+import uuid
 import random
 import json
 from datetime import datetime
@@ -7,34 +8,141 @@ from collections import Counter
 # werewolf_streamlit 内の Player と Role を import
 from .player import Player
 from .role import role_dict, Role # role_dict と Role クラス自体も使う可能性あり
+from .events import (Event, RolesAssigned, PhaseStarted, NightActionTaken, SeerResultShown, VoteCast,
+                     VoteResolved, PlayerKilled, GameEnded, PHASE_NIGHT, PHASE_DAY, fold_events)
+from .phase_view import PhaseView
+
+# 夜アクションの種別 (役職名 -> アクション種別)
+NIGHT_ACTION_TYPES: Dict[str, str] = {
+    "人狼": "attack",
+    "占い師": "seer",
+    "偽占い師": "seer",
+    "騎士": "guard",
+    "霊媒師": "medium",
+}
+
+# 対象の選択が必要な夜アクション
+TARGETED_ACTION_TYPES = ("attack", "seer", "guard")
 
 class GameManager:
-    def __init__(self, player_names:List[str], debug_mode: bool = False):
+    def __init__(self, player_names:List[str], debug_mode: bool = False, rng: Optional[random.Random] = None):
         """
         ゲーム管理クラスの初期化
         - プレイヤーを初期化
         - ゲーム状態を初期化
         - デバッグモードを設定
+        - rng: 乱数生成器 (シード固定のシミュレーション用。省略時は新規生成)
         """
 
         # プレイヤーの初期化 (streamlit 内の Player を使用)
         self.players = [Player(name) for name in player_names]
         self.debug_mode = debug_mode # デバッグモードフラグを保持
+        self.rng = rng if rng is not None else random.Random()
 
         # ゲーム状態
+        self.game_id = uuid.uuid4().hex  # 結果の保存に使うゲームID
         self.turn = 1  # 現在のターン数
         self.last_night_victim_name_list:List[str] = [] # 昨晩の犠牲者
         self.last_executed_name:Optional[str] = None  # 昨日処刑されたプレイヤー
         self.victory_team:Optional[str] = None  # 勝利チーム
+        self.phase:Optional[str] = None  # 現在のフェーズ ("night" / "day"、開始前は None)
+
+        # 進行イベント (追記のみ)。状態はこの列を畳み込めば再構成できる (GameManager.from_events)
+        self.events:List[Event] = []
+
+        # 夜・昼の画面用の表示データ (phase_view)。死亡・役職の割り当て・フェーズの切り替えで作り直す
+        self._phase_view:Optional[PhaseView] = None
+
+    @classmethod
+    def from_events(cls, events: List[Event], debug_mode: bool = False,
+                    rng: Optional[random.Random] = None) -> "GameManager":
+        """
+        イベント列からゲームを再構成する (監査・リプレイ・クラッシュからの復旧用)。
+        役職割り当て以降の状態 (生死・死因・ターン・フェーズ・勝敗) はすべてイベントから復元される。
+        """
+        state = fold_events(events)
+        gm = cls(list(state.players), debug_mode=debug_mode, rng=rng)
+        for seat, player in enumerate(gm.players):
+            player.assign_role(role_dict[state.roles[player.name]](seat), seat)
+            if not state.alive[player.name]:
+                player.alive = False
+                player.death_info = dict(state.death_info[player.name])
+        gm.turn = state.turn
+        gm.phase = state.phase
+        gm.last_night_victim_name_list = list(state.last_night_victims)
+        gm.last_executed_name = state.last_executed
+        gm.victory_team = state.victory_team
+        gm.events = list(events)
+        return gm
+
+    def _record(self, event: Event):
+        self.events.append(event)
+
+    def truncate_events(self, count: int):
+        """
+        進行イベントを先頭から count 件に切り詰める (取り消し用)。
+        フェーズ内の操作 (投票・夜アクション・占い結果) の取り消しのみ可能で、
+        死亡・フェーズの切り替え・勝敗の決定を含む範囲は取り消せない。
+        """
+        removed = self.events[count:]
+        if any(isinstance(e, (PlayerKilled, PhaseStarted, RolesAssigned, GameEnded, VoteResolved)) for e in removed):
+            raise ValueError("フェーズをまたぐ操作や死亡は取り消せません。")
+        del self.events[count:]
+
+    def _kill(self, player: Player, reason: str):
+        """プレイヤーを死亡させ、イベントを記録する"""
+        if player.alive:
+            player.kill(self.turn, reason)
+            self._phase_view = None
+            self._record(PlayerKilled(self.turn, player.name, reason))
 
     def assign_roles(self, roles: List[str]):
         """
         プレイヤーに役職を割り当てる
         """
-        random.shuffle(roles)
+        self.rng.shuffle(roles)
         for id, (player, role_name) in enumerate(zip(self.players, roles)):
             # streamlit 内の role_dict を使用
             player.assign_role(role_dict[role_name](id), id)
+        self._phase_view = None
+        self._record(RolesAssigned(tuple(p.name for p in self.players), tuple(p.role.name for p in self.players)))
+
+    def start_night(self):
+        """現在のターンの夜を開始する"""
+        self.phase = PHASE_NIGHT
+        self._phase_view = None
+        self._record(PhaseStarted(self.turn, PHASE_NIGHT))
+
+    def start_day(self):
+        """ターンを進めて昼を開始する (夜の解決後に呼ぶ)"""
+        self.turn += 1
+        self.phase = PHASE_DAY
+        self._phase_view = None
+        self._record(PhaseStarted(self.turn, PHASE_DAY))
+
+    def record_vote(self, voter_name: str, target_name: str):
+        """昼の投票を記録する (投票し直した場合は最後の投票が有効)"""
+        self._record(VoteCast(self.turn, voter_name, target_name))
+
+    def get_seer_result(self, seer: Player, target_name: str) -> Optional[str]:
+        """
+        占い師/偽占い師に表示する占い結果を返し、イベントとして記録する。
+        同じ夜に同じ相手を再度問い合わせた場合 (画面の再描画など) は記録済みの結果を返す。
+        """
+        for event in reversed(self.events):
+            if isinstance(event, PhaseStarted):
+                break
+            if isinstance(event, SeerResultShown) and event.seer == seer.name and event.target == target_name:
+                return event.result
+        target = next((p for p in self.players if p.name == target_name), None)
+        if target is None:
+            return None
+        if seer.role.name == "偽占い師":
+            result = seer.role.fake_seer_result(self.rng)
+        else:
+            result = target.role.seer_result()
+        self._record(SeerResultShown(self.turn, seer.name, target_name, result))
+        return result
 
     def get_alive_players(self) -> List[Player]: # 戻り値の型を修正
         """
@@ -42,6 +150,42 @@ class GameManager:
         """
         return [player for player in self.players if player.alive]
 
+    def phase_view(self) -> PhaseView:
+        """
+        現在のフェーズの表示用データ (生存者の並び・夜アクションの対象・表示文字列)。
+        フェーズの最初に呼んだときに作り、死亡が出るかフェーズが変わるまで同じものを返す。
+        """
+        view = self._phase_view
+        if view is None or view.turn != self.turn or view.phase != self.phase:
+            view = PhaseView.build(self)
+            self._phase_view = view
+        return view
+
+    def get_night_action_type(self, player: Player) -> str:
+        """
+        現在のターンにおけるプレイヤーの夜アクション種別を返す。
+        "attack", "seer", "guard", "medium", "none" のいずれか。
+        """
+        if not player.role.has_night_action(self.turn):
+            return "none"
+        return NIGHT_ACTION_TYPES.get(player.role.name, "none")
+
+    def get_night_target_options(self, player: Player, alive_players: Optional[List[Player]] = None) -> List[str]:
+        """
+        夜アクションで選択可能な対象プレイヤー名のリストを返す。
+        - 人狼: 人狼以外の生存者
+        - 占い師/偽占い師/騎士: 自分以外の生存者
+        - それ以外: 空リスト
+        """
+        if alive_players is None:
+            alive_players = self.get_alive_players()
+        action_type = self.get_night_action_type(player)
+        if action_type == "attack":
+            return [p.name for p in alive_players if p.role.species() != "人狼"]
+        if action_type in ("seer", "guard"):
+            return [p.name for p in alive_players if p.name != player.name]
+        return []
+
     def check_victory(self) -> Optional[Dict[str, str]]:
         """
         勝利条件をチェックし、ゲームが終了したか判定する。
@@ -83,6 +227,8 @@ class GameManager:
 
         # 勝利条件が満たされた場合、内部状態を更新して結果を返す
         if determined_victory_team and determined_victory_message:
+            if self.victory_team != determined_victory_team:
+                self._record(GameEnded(determined_victory_team, determined_victory_message))
             self.victory_team = determined_victory_team
             return {"team": determined_victory_team, "message": determined_victory_message}
         
@@ -160,6 +306,7 @@ class GameManager:
                 debug_info_list.append("投票なしのため処刑なし")
                 result["debug"] = "; ".join(debug_info_list)
             self.last_executed_name = None
+            self._record(VoteResolved(self.turn, None))
             # result["executed"] は None のまま
             return result
 
@@ -167,7 +314,7 @@ class GameManager:
         candidates = [name for name, count in votes.items() if count == max_votes]
 
         if len(candidates) > 1:
-            executed_name = random.choice(candidates)
+            executed_name = self.rng.choice(candidates)
             if self.debug_mode: 
                 debug_info_list.append(f"同票のためランダム処刑: {candidates} -> {executed_name}")
         else:
@@ -179,7 +326,8 @@ class GameManager:
         executed_player = next((p for p in self.players if p.name == executed_name), None)
 
         if executed_player and executed_player.alive:
-            executed_player.kill(self.turn, "execute")
+            self._record(VoteResolved(self.turn, executed_name))
+            self._kill(executed_player, "execute")
             self.last_executed_name = executed_name
             result["executed"] = executed_name
             if self.debug_mode: 
@@ -191,7 +339,7 @@ class GameManager:
                     debug_info_list.append("最後の妖狐が処刑されたため、背徳者の後追い処理を開始")
                 immoral_players_to_kill = [p for p in self.get_alive_players() if p.role.name == "背徳者"]
                 for immoral in immoral_players_to_kill:
-                    immoral.kill(self.turn, "suicide")
+                    self._kill(immoral, "suicide")
                     result["immoral_suicides"].append(immoral.name)
                     if self.debug_mode: 
                         debug_info_list.append(f"{immoral.name}(背徳者) が後追い自殺")
@@ -201,8 +349,8 @@ class GameManager:
                 # 猫又自身を除いた生存者リストを作成
                 other_alive_players = [p for p in self.get_alive_players() if p.alive and p.id != executed_player.id]
                 if other_alive_players:
-                    player_to_retaliate = random.choice(other_alive_players)
-                    player_to_retaliate.kill(self.turn, "retaliation")
+                    player_to_retaliate = self.rng.choice(other_alive_players)
+                    self._kill(player_to_retaliate, "retaliation")
                     result["retaliation_victim"] = player_to_retaliate.name # 道連れにした相手を記録
                     if self.debug_mode: 
                         debug_info_list.append(f"{executed_name}(猫又)が処刑されたため、{player_to_retaliate.name}を道連れにしました")
@@ -219,12 +367,14 @@ class GameManager:
                  debug_info_list.append(f"処刑対象 {executed_name} は既に死亡しています")
                  result["debug"] = "; ".join(debug_info_list)
              self.last_executed_name = None
+             self._record(VoteResolved(self.turn, None))
              # result["executed"] は None のまま
              return result
         else:
             # エラー情報を返す
             result["error"] = f"処刑対象プレイヤー '{executed_name}' が見つかりません"
             self.last_executed_name = None
+            self._record(VoteResolved(self.turn, None))
             return result
 
     def _initialize_night_state(self) -> dict:
@@ -274,6 +424,7 @@ class GameManager:
 
             action_type = action_data.get("type")
             target_name = action_data.get("target")
+            self._record(NightActionTaken(self.turn, player_name, action_type or "none", target_name))
 
             if action_type == "seer" and target_name:
                 target_player = next((p for p in alive_players if p.name == target_name), None)
@@ -282,7 +433,7 @@ class GameManager:
                         seer_result = target_player.role.seer_result()
                         seer_actions[player_name] = {"target": target_name, "result": seer_result}
                         if target_player.role.name == "妖狐":
-                            target_player.kill(self.turn, "curse")
+                            self._kill(target_player, "curse")
                             night_victims.add(target_name)
                             if self.debug_mode: 
                                 result["debug"].append(f"{player_name}が{target_name}(妖狐)を呪殺")
@@ -291,7 +442,7 @@ class GameManager:
                             if not remaining_alive_foxes:
                                 immoral_players_to_kill = [p for p in self.get_alive_players() if p.role.name == "背徳者" and p.alive]
                                 for immoral in immoral_players_to_kill:
-                                    immoral.kill(self.turn, "suicide")
+                                    self._kill(immoral, "suicide")
                                     night_victims.add(immoral.name) 
                                     result["immoral_suicides"].append(immoral.name)
                                     if self.debug_mode: 
@@ -326,7 +477,7 @@ class GameManager:
                 is_fox = victim_player.role.name == "妖狐"
                 if not is_protected and not is_fox:
                     # 襲撃成功
-                    victim_player.kill(self.turn, "attack")
+                    self._kill(victim_player, "attack")
                     night_victims.add(wolf_attack_victim_name)
                     if self.debug_mode: 
                         result["debug"].append(f"襲撃成功: {wolf_attack_victim_name} が死亡")
@@ -335,8 +486,8 @@ class GameManager:
                     if victim_player.role.name == "猫又":
                         alive_wolves = [p for p in self.get_alive_players() if p.role.species() == "人狼" and p.alive]
                         if alive_wolves:
-                            wolf_to_kill = random.choice(alive_wolves)
-                            wolf_to_kill.kill(self.turn, "retaliation") # 死因は "retaliation" とする
+                            wolf_to_kill = self.rng.choice(alive_wolves)
+                            self._kill(wolf_to_kill, "retaliation") # 死因は "retaliation" とする
                             night_victims.add(wolf_to_kill.name)
                             if self.debug_mode:
                                 result["debug"].append(f"{wolf_attack_victim_name}(猫又)が襲撃されたため、{wolf_to_kill.name}(人狼)を道連れにしました")
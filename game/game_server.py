@@ -0,0 +1,199 @@
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# フェーズの種類
+PHASE_NIGHT = "night" # 夜アクション
+PHASE_VOTE = "vote"   # 昼の投票
+
+# フェーズの状態
+STATE_OPEN = "open"           # 提出を受け付け中
+STATE_RESOLVING = "resolving" # 全員が提出し、解決 (on_complete) を実行中
+STATE_RESOLVED = "resolved"
+STATE_ERROR = "error"
+
+
+class _Phase:
+    __slots__ = ("kind", "turn", "expected", "submissions", "on_complete", "state", "error",
+                 "opened_at", "completed_at")
+
+    def __init__(self, kind: str, turn: int, expected: frozenset, submissions: Dict[str, Any],
+                 on_complete: Optional[Callable[[Dict[str, Any]], None]]):
+        self.kind = kind
+        self.turn = turn
+        self.expected = expected
+        self.submissions = submissions
+        self.on_complete = on_complete
+        self.state = STATE_OPEN
+        self.error: Optional[str] = None
+        self.opened_at = time.monotonic()
+        self.completed_at: Optional[float] = None
+
+
+class GameServer:
+    """
+    複数の端末から参加するゲームのための、サーバープロセス内の非同期サービス。
+    ルームごとに現在のフェーズ (夜アクション・投票) の提出を、各端末から並行して受け付ける。
+    最後の提出が届いた時点で on_complete を (イベントループを止めないよう別スレッドで) 1回だけ呼び、フェーズを解決する。
+
+    イベントループは専用のスレッドで動かし、各メソッドはどのスレッドからでも呼べる
+    (concurrent.futures.Future を返す)。状態はイベントループのスレッドだけが書き換え、
+    端末のポーリング用に、変化のたびに新しい辞書 (status) を公開する。
+    """
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._phases: Dict[str, _Phase] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._versions: Dict[str, int] = {}
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop.run_forever, name="game-server", daemon=True)
+        self._thread.start()
+
+    def _call(self, coro) -> Future:
+        if self._closed:
+            coro.close()
+            raise RuntimeError("ゲームサーバーは停止しています。")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # --- 公開API (どのスレッドからでも呼べる) ---
+    def open_phase(self, room: str, kind: str, turn: int, expected: Iterable[str],
+                   submitted: Optional[Dict[str, Any]] = None,
+                   on_complete: Optional[Callable[[Dict[str, Any]], None]] = None) -> Future:
+        """
+        ルームのフェーズを開始する (同じ kind・turn のフェーズが既にあれば何もしない)。
+        expected: 提出するプレイヤー名。submitted: 既に受け付けた提出 (サーバーの再起動後などに引き継ぐ)。
+        on_complete(提出) は全員の提出がそろったときに1回だけ呼ばれる。
+        Future の結果はルームの状況 (status と同じ)。
+        """
+        return self._call(self._open_phase(room, kind, turn, frozenset(expected), dict(submitted or {}), on_complete))
+
+    def submit(self, room: str, kind: str, turn: int, player: str, data: Any) -> Future:
+        """
+        プレイヤーの提出を受け付ける (解決前なら出し直せる)。Future の結果はルームの状況。
+        フェーズが違う・既に締め切られている・対象のプレイヤーでない場合は ValueError。
+        """
+        return self._call(self._submit(room, kind, turn, player, data))
+
+    def wait_for_change(self, room: str, version: int, timeout: Optional[float] = None) -> Future:
+        """ルームの状況が version から変わるまで待つ (ロングポーリング用)。Future の結果は新しい状況"""
+        return self._call(self._wait_for_change(room, version, timeout))
+
+    def notify(self, room: str):
+        """フェーズの提出以外でルームの状況が変わったことを、待っている端末に知らせる (version を進める)"""
+        if not self._closed:
+            self._loop.call_soon_threadsafe(self._publish, room)
+
+    def version(self, room: str) -> int:
+        """ルームの状況のバージョン (状況が変わるたびに増える)。ポーリングして変化を検出するのに使う"""
+        return self._versions.get(room, 0)
+
+    def status(self, room: str) -> Optional[Dict[str, Any]]:
+        """
+        ルームの現在のフェーズの状況 (kind, turn, expected, submitted, state, version など)。なければ None。
+        イベントループを経由せずに読めるため、端末が頻繁にポーリングしてよい (返り値は書き換えないこと)。
+        """
+        return self._status.get(room)
+
+    def close_room(self, room: str) -> Future:
+        """ルームのフェーズを破棄する (ゲーム終了時)"""
+        return self._call(self._close_room(room))
+
+    def close(self):
+        """サービスを停止する"""
+        if not self._closed:
+            self._closed = True
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    # --- イベントループ上の処理 ---
+    def _publish(self, room: str):
+        """状況を新しい辞書として公開し、待っている端末を起こす"""
+        self._versions[room] = self._versions.get(room, 0) + 1
+        phase = self._phases.get(room)
+        if phase is None:
+            self._status.pop(room, None)
+        else:
+            end = phase.completed_at or time.monotonic()
+            self._status[room] = {
+                "kind": phase.kind,
+                "turn": phase.turn,
+                "expected": tuple(sorted(phase.expected)),
+                "submitted": tuple(sorted(phase.submissions)),
+                "state": phase.state,
+                "error": phase.error,
+                "elapsed": end - phase.opened_at,
+                "version": self._versions[room],
+            }
+        event = self._changed.pop(room, None)
+        if event is not None:
+            event.set()
+
+    def _snapshot(self, room: str) -> Dict[str, Any]:
+        return self._status.get(room) or {"version": self._versions.get(room, 0)}
+
+    async def _open_phase(self, room, kind, turn, expected, submitted, on_complete):
+        phase = self._phases.get(room)
+        if phase is not None and phase.kind == kind and phase.turn == turn:
+            return self._snapshot(room)
+        submitted = {name: data for name, data in submitted.items() if name in expected}
+        self._phases[room] = _Phase(kind, turn, expected, submitted, on_complete)
+        self._publish(room)
+        self._maybe_complete(room)
+        return self._snapshot(room)
+
+    async def _submit(self, room, kind, turn, player, data):
+        phase = self._phases.get(room)
+        if phase is None or phase.kind != kind or phase.turn != turn:
+            raise ValueError(f"ルーム {room} では {turn}日目の {kind} を受け付けていません。")
+        if phase.state != STATE_OPEN:
+            raise ValueError("このフェーズは締め切られました。")
+        if player not in phase.expected:
+            raise ValueError(f"{player} はこのフェーズの提出者ではありません。")
+        phase.submissions[player] = data
+        self._publish(room)
+        self._maybe_complete(room)
+        return self._snapshot(room)
+
+    def _maybe_complete(self, room: str):
+        """全員の提出がそろっていれば、フェーズの解決を始める"""
+        phase = self._phases[room]
+        if phase.state != STATE_OPEN or not phase.expected <= phase.submissions.keys():
+            return
+        phase.state = STATE_RESOLVING
+        phase.completed_at = time.monotonic()
+        self._publish(room)
+        self._loop.create_task(self._complete(room, phase))
+
+    async def _complete(self, room: str, phase: _Phase):
+        try:
+            if phase.on_complete is not None:
+                # on_complete はルームのロックを待つことがあるため、イベントループのスレッドでは実行しない
+                await self._loop.run_in_executor(None, phase.on_complete, dict(phase.submissions))
+            phase.state = STATE_RESOLVED
+        except Exception as e:
+            logger.exception("フェーズの解決に失敗しました (ルーム %s)", room)
+            phase.state = STATE_ERROR
+            phase.error = str(e)
+        if self._phases.get(room) is phase:
+            self._publish(room)
+
+    async def _wait_for_change(self, room, version, timeout):
+        if self._versions.get(room, 0) == version:
+            event = self._changed.setdefault(room, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._snapshot(room)
+
+    async def _close_room(self, room):
+        if self._phases.pop(room, None) is not None:
+            self._publish(room)
+        self._versions.pop(room, None)
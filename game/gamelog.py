@@ -0,0 +1,482 @@
+import os
+import io
+import json
+import lzma
+import mmap
+import zlib
+import struct
+from collections import OrderedDict
+from typing import List, Dict, Optional, Iterator, Iterable, Tuple
+
+import numpy as np
+
+from .events import (Event, RolesAssigned, PhaseStarted, NightActionTaken, SeerResultShown, VoteCast,
+                     VoteResolved, PlayerKilled, GameEnded, event_from_dict)
+
+# ファイルの先頭 (形式のバージョンを含む)
+DATA_MAGIC = b"WWLOG\x01"
+INDEX_MAGIC = b"WWIDX\x01"
+INDEX_SUFFIX = ".idx"
+
+COMPRESSIONS = {"zlib": 0, "lzma": 1}
+DEFAULT_BLOCK_SIZE = 256 # 1ブロックあたりのゲーム数
+
+# 索引の1レコード (ゲームごとに固定長)。ヘッダーの項目で絞り込むときは展開せずにこれだけを読む
+INDEX_DTYPE = np.dtype([
+    ("block_offset", "<u8"),  # ブロック本体のファイル内の位置
+    ("block_length", "<u4"),  # ブロック本体 (圧縮後) の長さ
+    ("offset", "<u4"),        # 展開後のブロック内でのゲームの位置
+    ("length", "<u4"),        # ゲームのバイト数
+    ("player_count", "<u2"),
+    ("turns", "<u2"),
+    ("winner", "u1"),         # TEAM_CODES の番号 (勝敗なしは 0)
+])
+
+
+class CodeTable:
+    """
+    文字列の値と整数の番号の対応表。
+    番号はファイルに保存されるため、値の追加は末尾にのみ行うこと。
+    表にない値は番号 0 に続けて文字列そのものを書く。
+    """
+    def __init__(self, values: List[str]):
+        self.values = list(values)
+        self.codes = {value: i + 1 for i, value in enumerate(self.values)}
+
+    def code(self, value: Optional[str]) -> int:
+        """値の番号 (表にない値と None は 0)"""
+        return self.codes.get(value, 0)
+
+    def write(self, buf: bytearray, value: str):
+        code = self.codes.get(value)
+        if code is None:
+            buf.append(0)
+            _write_str(buf, value)
+        else:
+            write_varint(buf, code)
+
+    def read(self, data, pos: int) -> Tuple[str, int]:
+        code, pos = read_varint(data, pos)
+        if code == 0:
+            return _read_str(data, pos)
+        return self.values[code - 1], pos
+
+
+# --- 値の符号表 ---
+EVENT_CODES = ["roles_assigned", "phase_started", "night_action", "seer_result", "vote", "vote_resolved",
+               "killed", "game_ended"]
+ROLE_CODES = CodeTable(["村人", "人狼", "占い師", "霊媒師", "騎士", "猫又", "狂人", "狂信者", "妖狐", "背徳者", "偽占い師"])
+TEAM_CODES = CodeTable(["村人", "人狼", "妖狐"])
+PHASE_CODES = CodeTable(["night", "day"])
+ACTION_CODES = CodeTable(["none", "attack", "seer", "guard", "medium"])
+REASON_CODES = CodeTable(["attack", "execute", "curse", "suicide", "retaliation"])
+SEER_RESULT_CODES = CodeTable(["村人", "人狼", "人狼ではない"])
+VICTORY_MESSAGE_CODES = CodeTable([
+    "人狼は全滅しました。村人陣営の勝利です！",
+    "人狼が村人の人数以上となりました。人狼陣営の勝利です！",
+    "人狼は全滅しましたが、妖狐が生き残ったため妖狐陣営の勝利です！",
+    "人狼が村人の人数以上となりましたが、妖狐が生き残ったため妖狐陣営の勝利です！",
+])
+_EVENT_LOOKUP = {kind: i for i, kind in enumerate(EVENT_CODES)}
+
+
+# --- 可変長整数と文字列 ---
+def write_varint(buf: bytearray, value: int):
+    """非負整数を 7 ビットずつ (LEB128) 書く"""
+    if value < 0:
+        raise ValueError(f"負の値は書き込めません: {value}")
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def read_varint(data, pos: int) -> Tuple[int, int]:
+    """(値, 次の位置) を返す"""
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_str(buf: bytearray, value: str):
+    encoded = value.encode("utf-8")
+    write_varint(buf, len(encoded))
+    buf += encoded
+
+
+def _read_str(data, pos: int) -> Tuple[str, int]:
+    length, pos = read_varint(data, pos)
+    return bytes(data[pos:pos + length]).decode("utf-8"), pos + length
+
+
+def _write_optional_seat(buf: bytearray, seats: Dict[str, int], name: Optional[str]):
+    write_varint(buf, 0 if name is None else seats[name] + 1)
+
+
+def _read_optional_seat(data, pos: int, names: List[str]) -> Tuple[Optional[str], int]:
+    seat, pos = read_varint(data, pos)
+    return (names[seat - 1] if seat else None), pos
+
+
+# --- 1ゲームの符号化 ---
+def encode_game(game_id: str, events: List[Event]) -> bytes:
+    """
+    1ゲームのイベント列をバイト列にする。
+    プレイヤー名は役職割り当てのイベントに1回だけ書き、以降は座席番号で参照する。
+    """
+    buf = bytearray()
+    _write_str(buf, game_id)
+    write_varint(buf, len(events))
+    seats: Dict[str, int] = {}
+    for event in events:
+        buf.append(_EVENT_LOOKUP[event.kind])
+        if isinstance(event, RolesAssigned):
+            seats = {name: seat for seat, name in enumerate(event.players)}
+            write_varint(buf, len(event.players))
+            for name, role in zip(event.players, event.roles):
+                _write_str(buf, name)
+                ROLE_CODES.write(buf, role)
+        elif isinstance(event, PhaseStarted):
+            write_varint(buf, event.turn)
+            PHASE_CODES.write(buf, event.phase)
+        elif isinstance(event, NightActionTaken):
+            write_varint(buf, event.turn)
+            write_varint(buf, seats[event.actor])
+            ACTION_CODES.write(buf, event.action)
+            _write_optional_seat(buf, seats, event.target)
+        elif isinstance(event, SeerResultShown):
+            write_varint(buf, event.turn)
+            write_varint(buf, seats[event.seer])
+            write_varint(buf, seats[event.target])
+            SEER_RESULT_CODES.write(buf, event.result)
+        elif isinstance(event, VoteCast):
+            write_varint(buf, event.turn)
+            write_varint(buf, seats[event.voter])
+            write_varint(buf, seats[event.target])
+        elif isinstance(event, VoteResolved):
+            write_varint(buf, event.turn)
+            _write_optional_seat(buf, seats, event.executed)
+        elif isinstance(event, PlayerKilled):
+            write_varint(buf, event.turn)
+            write_varint(buf, seats[event.player])
+            REASON_CODES.write(buf, event.reason)
+        elif isinstance(event, GameEnded):
+            TEAM_CODES.write(buf, event.team)
+            VICTORY_MESSAGE_CODES.write(buf, event.message)
+        else:
+            raise ValueError(f"符号化できないイベントです: {event!r}")
+    return bytes(buf)
+
+
+def decode_game(data, pos: int = 0) -> Tuple[str, List[Event]]:
+    """encode_game の逆変換。(ゲームID, イベント列) を返す"""
+    game_id, pos = _read_str(data, pos)
+    count, pos = read_varint(data, pos)
+    names: List[str] = []
+    events: List[Event] = []
+    for _ in range(count):
+        kind = EVENT_CODES[data[pos]]
+        pos += 1
+        if kind == "roles_assigned":
+            n, pos = read_varint(data, pos)
+            names, roles = [], []
+            for _ in range(n):
+                name, pos = _read_str(data, pos)
+                role, pos = ROLE_CODES.read(data, pos)
+                names.append(name)
+                roles.append(role)
+            events.append(RolesAssigned(tuple(names), tuple(roles)))
+        elif kind == "phase_started":
+            turn, pos = read_varint(data, pos)
+            phase, pos = PHASE_CODES.read(data, pos)
+            events.append(PhaseStarted(turn, phase))
+        elif kind == "night_action":
+            turn, pos = read_varint(data, pos)
+            actor, pos = read_varint(data, pos)
+            action, pos = ACTION_CODES.read(data, pos)
+            target, pos = _read_optional_seat(data, pos, names)
+            events.append(NightActionTaken(turn, names[actor], action, target))
+        elif kind == "seer_result":
+            turn, pos = read_varint(data, pos)
+            seer, pos = read_varint(data, pos)
+            target, pos = read_varint(data, pos)
+            result, pos = SEER_RESULT_CODES.read(data, pos)
+            events.append(SeerResultShown(turn, names[seer], names[target], result))
+        elif kind == "vote":
+            turn, pos = read_varint(data, pos)
+            voter, pos = read_varint(data, pos)
+            target, pos = read_varint(data, pos)
+            events.append(VoteCast(turn, names[voter], names[target]))
+        elif kind == "vote_resolved":
+            turn, pos = read_varint(data, pos)
+            executed, pos = _read_optional_seat(data, pos, names)
+            events.append(VoteResolved(turn, executed))
+        elif kind == "killed":
+            turn, pos = read_varint(data, pos)
+            seat, pos = read_varint(data, pos)
+            reason, pos = REASON_CODES.read(data, pos)
+            events.append(PlayerKilled(turn, names[seat], reason))
+        else: # game_ended
+            team, pos = TEAM_CODES.read(data, pos)
+            message, pos = VICTORY_MESSAGE_CODES.read(data, pos)
+            events.append(GameEnded(team, message))
+    return game_id, events
+
+
+def game_header(events: List[Event]) -> Tuple[int, int, int]:
+    """索引に載せる (プレイヤー数, ターン数, 勝利陣営の番号) をイベント列から求める"""
+    player_count = 0
+    turns = 1
+    winner = 0
+    for event in events:
+        if isinstance(event, RolesAssigned):
+            player_count = len(event.players)
+        elif isinstance(event, PhaseStarted):
+            turns = event.turn
+        elif isinstance(event, GameEnded):
+            winner = TEAM_CODES.code(event.team)
+    return player_count, turns, winner
+
+
+def index_path_for(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+class GameLogWriter:
+    """
+    ゲームログを圧縮ブロック単位でファイルに追記するライター。
+    block_size ゲームごとに1ブロックを圧縮して書き、ゲームごとの索引を別ファイル (path + ".idx") に書く。
+    既存のファイルを開いた場合は末尾に追記する。
+    """
+    def __init__(self, path: str, block_size: int = DEFAULT_BLOCK_SIZE, compression: str = "zlib",
+                 level: Optional[int] = None):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"未対応の圧縮方式です: {compression}")
+        self.path = path
+        self.index_path = index_path_for(path)
+        self.block_size = block_size
+        self.compression = compression
+        self.level = level
+        self._pending: List[Tuple[bytes, Tuple[int, int, int]]] = []
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                header = f.read(len(DATA_MAGIC) + 1)
+            if header[:len(DATA_MAGIC)] != DATA_MAGIC:
+                raise ValueError(f"ゲームログのファイルではありません: {path}")
+            if header[len(DATA_MAGIC)] != COMPRESSIONS[compression]:
+                raise ValueError(f"既存のファイルと圧縮方式が異なります: {path}")
+            self._data = open(path, "ab")
+            self._index = open(self.index_path, "r+b" if os.path.exists(self.index_path) else "w+b")
+            self._repair_index()
+        else:
+            self._data = open(path, "wb")
+            self._data.write(DATA_MAGIC + bytes([COMPRESSIONS[compression]]))
+            self._index = open(self.index_path, "wb")
+            self._index.write(INDEX_MAGIC)
+        self._data.flush()
+        self._index.flush()
+
+    def _repair_index(self):
+        """書き込み途中で止まった場合に残る、半端な索引レコードを切り詰める"""
+        size = self._index.seek(0, io.SEEK_END)
+        if size < len(INDEX_MAGIC):
+            self._index.seek(0)
+            self._index.truncate()
+            self._index.write(INDEX_MAGIC)
+            return
+        whole = len(INDEX_MAGIC) + (size - len(INDEX_MAGIC)) // INDEX_DTYPE.itemsize * INDEX_DTYPE.itemsize
+        if whole != size:
+            self._index.truncate(whole)
+        self._index.seek(whole)
+
+    def append(self, game_id: str, events: List[Event]):
+        """1ゲームを追加する (block_size ゲーム溜まると書き出す)"""
+        self._pending.append((encode_game(game_id, events), game_header(events)))
+        if len(self._pending) >= self.block_size:
+            self.flush()
+
+    def flush(self):
+        """溜まっているゲームを1ブロックとして書き出す"""
+        if not self._pending:
+            return
+        raw = b"".join(data for data, _ in self._pending)
+        if self.compression == "zlib":
+            block = zlib.compress(raw, 6 if self.level is None else self.level)
+        else:
+            block = lzma.compress(raw, preset=6 if self.level is None else self.level)
+        # ブロックの前に長さを書いておくと、索引が失われてもデータファイルから作り直せる
+        self._data.write(struct.pack("<I", len(block)))
+        block_offset = self._data.tell()
+        self._data.write(block)
+        self._data.flush()
+
+        records = np.zeros(len(self._pending), dtype=INDEX_DTYPE)
+        offset = 0
+        for i, (data, (player_count, turns, winner)) in enumerate(self._pending):
+            records[i] = (block_offset, len(block), offset, len(data), player_count, turns, winner)
+            offset += len(data)
+        # 索引はブロック本体の後に書く (途中で止まっても索引が存在しないブロックを指すことはない)
+        self._index.write(records.tobytes())
+        self._index.flush()
+        self._pending = []
+
+    def close(self):
+        if not self._data.closed:
+            self.flush()
+            self._data.close()
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class GameLogReader:
+    """
+    ゲームログを mmap で開いて読むリーダー。
+    ゲーム k だけを読む場合は、そのゲームを含むブロックだけを展開する。
+    ヘッダー (プレイヤー数・ターン数・勝利陣営) での絞り込みは索引だけで行い、ブロックは展開しない。
+    """
+    def __init__(self, path: str, cache_blocks: int = 8):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(DATA_MAGIC)] != DATA_MAGIC:
+            raise ValueError(f"ゲームログのファイルではありません: {path}")
+        codes = {code: name for name, code in COMPRESSIONS.items()}
+        self.compression = codes[self._mmap[len(DATA_MAGIC)]]
+        with open(index_path_for(path), "rb") as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f"ゲームログの索引ではありません: {index_path_for(path)}")
+            raw = f.read()
+        # 半端なレコード (書き込み途中) と、データファイルに存在しないブロックを指すレコードは無視する
+        index = np.frombuffer(raw[:len(raw) // INDEX_DTYPE.itemsize * INDEX_DTYPE.itemsize], dtype=INDEX_DTYPE)
+        valid = index["block_offset"] + index["block_length"] <= len(self._mmap)
+        self.index = index if valid.all() else index[:int(np.argmin(valid))]
+        self._cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self._cache_blocks = cache_blocks
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _block(self, block_offset: int, block_length: int) -> bytes:
+        block = self._cache.get(block_offset)
+        if block is not None:
+            self._cache.move_to_end(block_offset)
+            return block
+        compressed = self._mmap[block_offset:block_offset + block_length]
+        block = zlib.decompress(compressed) if self.compression == "zlib" else lzma.decompress(compressed)
+        self._cache[block_offset] = block
+        if len(self._cache) > self._cache_blocks:
+            self._cache.popitem(last=False)
+        return block
+
+    def read(self, k: int) -> Tuple[str, List[Event]]:
+        """ゲーム k の (ゲームID, イベント列)"""
+        record = self.index[k]
+        block = self._block(int(record["block_offset"]), int(record["block_length"]))
+        offset = int(record["offset"])
+        return decode_game(memoryview(block)[offset:offset + int(record["length"])])
+
+    def filter(self, player_count: Optional[int] = None, winner: Optional[str] = None,
+               min_turns: Optional[int] = None, max_turns: Optional[int] = None) -> np.ndarray:
+        """条件に合うゲームの番号 (索引だけで絞り込む)"""
+        selected = np.ones(len(self.index), dtype=bool)
+        if player_count is not None:
+            selected &= self.index["player_count"] == player_count
+        if winner is not None:
+            selected &= self.index["winner"] == TEAM_CODES.codes.get(winner, -1)
+        if min_turns is not None:
+            selected &= self.index["turns"] >= min_turns
+        if max_turns is not None:
+            selected &= self.index["turns"] <= max_turns
+        return np.flatnonzero(selected)
+
+    def iter_games(self, indices: Optional[Iterable[int]] = None) -> Iterator[Tuple[str, List[Event]]]:
+        """indices (省略時は全ゲーム) の順にゲームを読む"""
+        for k in (range(len(self)) if indices is None else indices):
+            yield self.read(int(k))
+
+
+def export_results_db(db_path: str, path: str, **writer_options) -> int:
+    """結果データベースに保存されたゲームの進行イベントをゲームログに書き出し、件数を返す"""
+    from .results_store import ResultsStore
+
+    store = ResultsStore(db_path)
+    count = 0
+    try:
+        with GameLogWriter(path, **writer_options) as writer:
+            rows = store.conn.execute(
+                "SELECT game_id, events FROM games WHERE events IS NOT NULL ORDER BY played_at")
+            for row in rows:
+                writer.append(row["game_id"], [event_from_dict(e) for e in json.loads(row["events"])])
+                count += 1
+    finally:
+        store.close()
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="ゲームログ (圧縮バイナリ形式) の作成と確認")
+    sub = parser.add_subparsers(dest="command", required=True)
+    simulate = sub.add_parser("simulate", help="ボット同士のゲームを生成してゲームログに書く")
+    simulate.add_argument("path")
+    simulate.add_argument("--games", type=int, default=1000)
+    simulate.add_argument("--seed", type=int, default=0)
+    simulate.add_argument("--strategy", default="team_aware")
+    simulate.add_argument("--compression", choices=list(COMPRESSIONS), default="zlib")
+    export = sub.add_parser("export", help="結果データベースのゲームをゲームログに書き出す")
+    export.add_argument("path")
+    export.add_argument("--db", default="result/results.db")
+    export.add_argument("--compression", choices=list(COMPRESSIONS), default="zlib")
+    info = sub.add_parser("info", help="ゲームログの件数とサイズを表示する")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "simulate":
+        from config import settings
+        from .simulator import run_bot_game
+
+        roles = [name for name, count in settings.DEFAULT_ROLE_COUNTS.items() for _ in range(count)]
+        names = [f"P{i}" for i in range(len(roles))]
+        started = time.perf_counter()
+        with GameLogWriter(args.path, compression=args.compression) as writer:
+            for i in range(args.games):
+                result = run_bot_game(names, roles, [args.strategy] * len(names), seed=args.seed + i,
+                                      record_events=True)
+                writer.append(f"sim-{args.seed + i}", result["events"])
+        print(f"{args.games} ゲームを書き込みました ({time.perf_counter() - started:.1f} 秒)")
+    elif args.command == "export":
+        print(f"{export_results_db(args.db, args.path, compression=args.compression)} ゲームを書き出しました")
+    else:
+        with GameLogReader(args.path) as reader:
+            size = os.path.getsize(args.path) + os.path.getsize(index_path_for(args.path))
+            print(f"{len(reader)} ゲーム / {size} バイト ({size / max(len(reader), 1):.1f} バイト/ゲーム, "
+                  f"{reader.compression})")
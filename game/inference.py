@@ -0,0 +1,193 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import List, Optional, Dict, Any
+
+import numpy as np
+
+# 候補ごとの特徴量 (ScoringBot が作成する)
+FEATURE_NAMES = [
+    "bias",          # 常に 1
+    "seer_wolf",     # 占いで人狼判定
+    "seer_human",    # 占いで村人判定
+    "votes",         # 本日の得票率
+    "wolf_partner",  # 仲間の人狼 (人狼から見た場合のみ)
+    "voted_me",      # 本日、自分に投票した
+]
+NUM_FEATURES = len(FEATURE_NAMES)
+
+# 人狼らしさ (信念) のロジットを求める重み
+BELIEF_WEIGHTS = np.array([-1.0, 6.0, -6.0, 1.5, -6.0, 1.0])
+
+# 行動の種類 -> スコア計算の番号
+ACTION_INDEX: Dict[str, int] = {"vote": 0, "attack": 1, "seer": 2, "guard": 3}
+
+
+def evaluate_batch(features: np.ndarray, mask: np.ndarray, actions: np.ndarray, noise: np.ndarray) -> np.ndarray:
+    """
+    複数の意思決定をまとめて評価し、それぞれの選択肢の番号を返す。
+
+    Args:
+        features: (B, N, NUM_FEATURES) 候補ごとの特徴量 (N は最大候補数、余りは mask で無効化)
+        mask: (B, N) 有効な候補
+        actions: (B,) ACTION_INDEX の値
+        noise: (B, N) 同点を崩すための小さな乱数
+
+    Returns:
+        (B,) 選ばれた候補の番号
+    """
+    # 信念の更新: 観測した証拠から各候補が人狼である確率を求める
+    belief = 1.0 / (1.0 + np.exp(-(features @ BELIEF_WEIGHTS)))
+    # 行動ごとのスコア
+    scores = np.empty((len(ACTION_INDEX),) + belief.shape)
+    scores[0] = belief                                   # 投票: 最も怪しい相手
+    scores[1] = (1.0 - belief) - features[..., 3]        # 襲撃: 信頼されている (票の少ない) 相手
+    scores[2] = belief * (1.0 - belief)                  # 占い: 最も判断のつかない相手
+    scores[3] = 1.0 - belief                             # 護衛: 最も村人らしい相手
+    chosen = scores[actions, np.arange(len(actions))] + noise
+    chosen[~mask] = -np.inf
+    return chosen.argmax(axis=1)
+
+
+class _Request:
+    __slots__ = ("features", "action", "noise", "future", "submitted")
+
+    def __init__(self, features, action, noise):
+        self.features = features
+        self.action = action
+        self.noise = noise
+        self.future: Future = Future()
+        self.submitted = time.monotonic()
+
+
+class InferenceService:
+    """
+    サーバープロセス内で共有するボット推論サービス。
+    各部屋 (セッション) からの意思決定を最大 max_wait_ms だけ待って集め、
+    evaluate_batch の1回の呼び出しでまとめて評価する。
+    """
+    def __init__(self, max_batch: int = 256, max_wait_ms: float = 2.0):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.decisions = 0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="bot-inference", daemon=True)
+        self._thread.start()
+
+    def submit(self, features: np.ndarray, action: str, noise: Optional[np.ndarray] = None) -> Future:
+        """
+        1つの意思決定を登録し、選ばれた候補の番号を返す Future を返す。
+        features: (候補数, NUM_FEATURES)
+        """
+        if self._closed:
+            raise RuntimeError("推論サービスは停止しています。")
+        if noise is None:
+            noise = np.zeros(len(features))
+        request = _Request(features, ACTION_INDEX[action], noise)
+        self._queue.put(request)
+        return request.future
+
+    def decide(self, features: np.ndarray, action: str, noise: Optional[np.ndarray] = None,
+               timeout: Optional[float] = 5.0) -> int:
+        """submit して結果を待つ"""
+        return self.submit(features, action, noise).result(timeout)
+
+    def close(self):
+        """サービスを停止する (登録済みの意思決定は処理してから止まる)"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "decisions": self.decisions,
+                "mean_batch_size": self.decisions / self.batches if self.batches else 0.0,
+                "mean_latency_ms": 1000 * self._total_latency / self.decisions if self.decisions else 0.0,
+                "max_latency_ms": 1000 * self.max_latency,
+            }
+
+    def _loop(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._process(batch)
+
+    def _process(self, batch: List[_Request]):
+        size = len(batch)
+        width = max(len(request.features) for request in batch)
+        features = np.zeros((size, width, NUM_FEATURES))
+        mask = np.zeros((size, width), dtype=bool)
+        noise = np.zeros((size, width))
+        actions = np.empty(size, dtype=np.int64)
+        for i, request in enumerate(batch):
+            count = len(request.features)
+            features[i, :count] = request.features
+            mask[i, :count] = True
+            noise[i, :count] = request.noise
+            actions[i] = request.action
+        try:
+            choices = evaluate_batch(features, mask, actions, noise)
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        now = time.monotonic()
+        for request, choice in zip(batch, choices):
+            request.future.set_result(int(choice))
+        with self._stats_lock:
+            self.batches += 1
+            self.decisions += size
+            for request in batch:
+                latency = now - request.submitted
+                self._total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+
+
+# --- プロセス共有のサービス ---
+_default_service: Optional[InferenceService] = None
+_default_lock = threading.Lock()
+
+
+def start_default_service(max_batch: int = 256, max_wait_ms: float = 2.0) -> InferenceService:
+    """プロセスで共有する推論サービスを起動する (起動済みならそれを返す)"""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            _default_service = InferenceService(max_batch, max_wait_ms)
+        return _default_service
+
+
+def default_service() -> Optional[InferenceService]:
+    """起動済みの共有サービス。起動していなければ None (その場合ボットは単独で評価する)"""
+    return _default_service
+
+
+def stop_default_service():
+    global _default_service
+    with _default_lock:
+        if _default_service is not None:
+            _default_service.close()
+            _default_service = None
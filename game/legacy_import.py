@@ -0,0 +1,206 @@
+import os
+import re
+import json
+import time
+import hashlib
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from .results_store import ResultsStore, PLAYED_AT_FORMAT, DEFAULT_DB_PATH
+
+# render_game_over が保存していたファイル名 (YYYYmmdd_HHMMSS.json)
+LEGACY_FILENAME = re.compile(r"^(\d{8}_\d{6})\.json$")
+
+# 同じ内容のファイルがこの時間内に続いていれば、同じゲームの再保存とみなす
+DUPLICATE_WINDOW = timedelta(hours=1)
+
+_IMPORTED_FILES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS imported_files (
+    path         TEXT PRIMARY KEY,
+    size         INTEGER NOT NULL,
+    mtime        REAL NOT NULL,
+    content_hash TEXT,
+    game_id      TEXT,
+    played_at    TEXT,
+    error        TEXT
+)
+"""
+
+
+def scan_legacy_files(directory: str) -> List[Tuple[str, int, float]]:
+    """ディレクトリ内の旧形式の結果ファイルを (パス, サイズ, 更新時刻) のリストで返す (日時順)"""
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_file() and LEGACY_FILENAME.match(entry.name):
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+    entries.sort(key=lambda e: os.path.basename(e[0]))
+    return entries
+
+
+def parse_legacy_file(path: str) -> Dict[str, Any]:
+    """
+    旧形式の結果ファイルを1つ読み込む (ワーカープロセスで実行される)。
+    内容のハッシュは、再表示のたびに保存された同じゲームを見分けるために使う。
+    """
+    played_at = datetime.strptime(LEGACY_FILENAME.match(os.path.basename(path)).group(1), "%Y%m%d_%H%M%S")
+    try:
+        with open(path, encoding="utf-8") as f:
+            results = json.load(f)
+        canonical = json.dumps(results, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        winners = {row["陣営"] for row in results if row.get("勝利")}
+        turns = [int(m.group(1)) for row in results for m in [re.match(r"^(\d+)日目", row.get("生死", ""))] if m]
+        return {
+            "path": path,
+            "played_at": played_at.strftime(PLAYED_AT_FORMAT),
+            "content_hash": hashlib.sha1(canonical.encode("utf-8")).hexdigest(),
+            "results": results,
+            "winner": winners.pop() if len(winners) == 1 else None,
+            "turns": max(turns) if turns else None,
+            "error": None,
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        return {"path": path, "played_at": played_at.strftime(PLAYED_AT_FORMAT), "error": f"{type(e).__name__}: {e}"}
+
+
+def _parse_chunk(paths: List[str]) -> List[Dict[str, Any]]:
+    return [parse_legacy_file(path) for path in paths]
+
+
+class LegacyImporter:
+    """
+    旧形式の result/*.json を結果ストアに一括で取り込む。
+    - ファイルの解析はプロセスプールで並列に行う
+    - 同じ内容のファイルが DUPLICATE_WINDOW 以内に続く場合は同じゲームとして1件にまとめる
+    - batch_size 件ごとに1トランザクションで書き込み、取り込んだファイルを imported_files に記録する
+      (中断しても再実行すれば続きから取り込める)
+    """
+    def __init__(self, store: ResultsStore, workers: Optional[int] = None, batch_size: int = 5000,
+                 chunk_size: int = 200):
+        self.store = store
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self._file_stats: Dict[str, Tuple[int, float]] = {}
+        store.conn.execute(_IMPORTED_FILES_SCHEMA)
+        # 既に取り込んだ内容ハッシュ -> (最後に見た日時, ゲームID)
+        self._last_seen: Dict[str, Tuple[str, str]] = {}
+        for row in store.conn.execute(
+                "SELECT content_hash, played_at, game_id FROM imported_files "
+                "WHERE content_hash IS NOT NULL ORDER BY played_at"):
+            self._last_seen[row[0]] = (row[1], row[2])
+
+    def pending_files(self, directory: str) -> List[Tuple[str, int, float]]:
+        """まだ取り込んでいない (または取り込み後に変更された) ファイルの (パス, サイズ, 更新時刻)"""
+        done = {row[0]: (row[1], row[2]) for row in self.store.conn.execute("SELECT path, size, mtime FROM imported_files")}
+        return [entry for entry in scan_legacy_files(directory) if done.get(entry[0]) != (entry[1], entry[2])]
+
+    def run(self, directory: str, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        取り込みを実行し、集計を返す。
+        progress には {"files", "total", "games", "duplicates", "errors", "files_per_sec"} が渡される。
+        """
+        pending = self.pending_files(directory)
+        self._file_stats = {path: (size, mtime) for path, size, mtime in pending}
+        paths = [path for path, _, _ in pending]
+        stats = {"files": 0, "total": len(paths), "games": 0, "duplicates": 0, "errors": 0, "files_per_sec": 0.0}
+        started = time.monotonic()
+        chunks = [paths[i:i + self.chunk_size] for i in range(0, len(paths), self.chunk_size)]
+        batch: List[Dict[str, Any]] = []
+
+        def report():
+            elapsed = time.monotonic() - started
+            stats["files_per_sec"] = stats["files"] / elapsed if elapsed > 0 else 0.0
+            if progress:
+                progress(dict(stats))
+
+        if self.workers <= 1:
+            parsed_chunks = map(_parse_chunk, chunks)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(max_workers=self.workers)
+            parsed_chunks = pool.map(_parse_chunk, chunks) # 順序を保ったまま並列に解析する
+        try:
+            for parsed in parsed_chunks:
+                batch.extend(parsed)
+                if len(batch) >= self.batch_size:
+                    self._write_batch(batch, stats)
+                    batch = []
+                    report()
+            self._write_batch(batch, stats)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        report()
+        return stats
+
+    def _write_batch(self, batch: List[Dict[str, Any]], stats: Dict[str, Any]):
+        if not batch:
+            return
+        # このバッチで見た内容ハッシュは、トランザクションが確定してから _last_seen に反映する
+        seen: Dict[str, Tuple[str, str]] = {}
+        with self.store.transaction() as conn:
+            for item in batch:
+                game_id = None
+                if item["error"]:
+                    stats["errors"] += 1
+                else:
+                    game_id = self._assign_game_id(item, seen)
+                    inserted = self.store.insert_game({
+                        "game_id": game_id,
+                        "played_at": item["played_at"],
+                        "winner": item["winner"],
+                        "player_count": len(item["results"]),
+                        "turns": item["turns"],
+                        "results": item["results"],
+                    })
+                    if inserted:
+                        stats["games"] += 1
+                    else:
+                        stats["duplicates"] += 1
+                size, mtime = self._file_stats[item["path"]]
+                conn.execute(
+                    "INSERT OR REPLACE INTO imported_files (path, size, mtime, content_hash, game_id, played_at, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (item["path"], size, mtime, item.get("content_hash"), game_id,
+                     item["played_at"], item["error"]),
+                )
+                stats["files"] += 1
+        self._last_seen.update(seen)
+
+    def _assign_game_id(self, item: Dict[str, Any], seen: Dict[str, Tuple[str, str]]) -> str:
+        """
+        内容ハッシュと日時からゲームIDを決める (最後に見た同じ内容のファイルと前後 DUPLICATE_WINDOW 以内なら同じID)。
+        再実行では前回より古いファイルも来るため、日時の差は絶対値で比べる。seen にはこのバッチで見た最新の日時を記録する。
+        """
+        content_hash = item["content_hash"]
+        played_at = datetime.strptime(item["played_at"], PLAYED_AT_FORMAT)
+        last = seen.get(content_hash) or self._last_seen.get(content_hash)
+        last_played_at = datetime.strptime(last[0], PLAYED_AT_FORMAT) if last else None
+        if last and abs(played_at - last_played_at) <= DUPLICATE_WINDOW:
+            game_id = last[1]
+        else:
+            game_id = f"legacy-{content_hash[:16]}-{played_at.strftime('%Y%m%d%H%M%S')}"
+        if last is None or played_at >= last_played_at:
+            seen[content_hash] = (item["played_at"], game_id)
+        return game_id
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="旧形式の結果ファイル (result/*.json) を結果データベースに取り込みます")
+    parser.add_argument("directory", nargs="?", default="result")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    importer = LegacyImporter(store, workers=args.workers, batch_size=args.batch_size)
+    result = importer.run(args.directory, progress=lambda s: print(
+        f"\r{s['files']}/{s['total']} ファイル ({s['files_per_sec']:.0f} ファイル/秒)", end="", flush=True))
+    print()
+    print(f"追加 {result['games']} ゲーム / 重複 {result['duplicates']} / エラー {result['errors']}")
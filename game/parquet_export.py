@@ -0,0 +1,236 @@
+import os
+import json
+from typing import List, Dict, Any, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .results_store import ResultsStore, PLAYED_AT_FORMAT
+
+DEFAULT_PARQUET_DIR = "result/parquet"
+STATE_NAME = "_export_state.json"
+DEFAULT_BATCH_GAMES = 10000 # 1回の書き出しで読むゲーム数 (メモリ上にはこのぶんだけ持つ)
+
+# データセットの名前 (出力ディレクトリ直下のサブディレクトリ)
+GAMES = "games"
+PLAYERS = "players"
+EVENTS = "events"
+
+# 日付・プレイヤー数で分割する (date=YYYY-MM-DD/player_count=N/...)
+PARTITION_SCHEMA = pa.schema([("date", pa.string()), ("player_count", pa.int8())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+
+_STRING_DICT = pa.dictionary(pa.int32(), pa.string())
+
+# 分割キー (date, player_count) を除いた列。役職・陣営などの値の種類が少ない列は辞書符号化する
+SCHEMAS = {
+    GAMES: pa.schema([
+        ("game_id", pa.string()),
+        ("played_at", pa.timestamp("s")),
+        ("winner", _STRING_DICT),
+        ("turns", pa.int16()),
+    ]),
+    PLAYERS: pa.schema([
+        ("game_id", pa.string()),
+        ("played_at", pa.timestamp("s")),
+        ("seat", pa.int8()),
+        ("name", pa.string()),
+        ("role", _STRING_DICT),
+        ("team", _STRING_DICT),
+        ("status", _STRING_DICT),
+        ("is_winner", pa.bool_()),
+    ]),
+    # 進行イベントは種類によらず共通の列に平らにする (役職の割り当ては players に含まれるため除く)
+    #   player: 行動・投票・占い・死亡したプレイヤー / target: 対象・処刑されたプレイヤー
+    #   detail: 行動の種類・占い結果・死因・勝利陣営
+    EVENTS: pa.schema([
+        ("game_id", pa.string()),
+        ("seq", pa.int32()),
+        ("type", _STRING_DICT),
+        ("turn", pa.int16()),
+        ("phase", _STRING_DICT),
+        ("player", pa.string()),
+        ("target", pa.string()),
+        ("detail", _STRING_DICT),
+    ]),
+}
+
+_EVENT_PLAYER_FIELDS = ("actor", "voter", "seer", "player")
+_EVENT_TARGET_FIELDS = ("target", "executed")
+_EVENT_DETAIL_FIELDS = ("action", "result", "reason", "team")
+
+
+def load_state(output_dir: str) -> Dict[str, Any]:
+    """書き出しの進み具合 (結果データベースのどの行まで書き出したか)"""
+    try:
+        with open(os.path.join(output_dir, STATE_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"last_rowid": 0, "batches": 0, "games": 0, "events": False}
+
+
+def _save_state(output_dir: str, state: Dict[str, Any]):
+    path = os.path.join(output_dir, STATE_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _partition_columns(played_at: List[str], player_count: List[int]) -> Dict[str, pa.Array]:
+    played = pa.array(played_at, pa.string())
+    return {
+        "played_at": pc.strptime(played, format=PLAYED_AT_FORMAT, unit="s"),
+        "date": pc.utf8_slice_codeunits(played, 0, 10),
+        "player_count": pa.array(player_count, pa.int8()),
+    }
+
+
+def _table(name: str, columns: Dict[str, Any]) -> pa.Table:
+    schema = SCHEMAS[name]
+    arrays = [columns[field.name] if isinstance(columns[field.name], pa.Array)
+              else pa.array(columns[field.name], field.type) for field in schema]
+    arrays += [columns["date"], columns["player_count"]]
+    return pa.Table.from_arrays(arrays, schema=pa.schema(list(schema) + list(PARTITION_SCHEMA)))
+
+
+def _games_table(rows: List[Dict[str, Any]]) -> pa.Table:
+    columns = _partition_columns([r["played_at"] for r in rows], [r["player_count"] for r in rows])
+    columns.update({
+        "game_id": [r["game_id"] for r in rows],
+        "winner": [r["winner"] for r in rows],
+        "turns": [r["turns"] for r in rows],
+    })
+    return _table(GAMES, columns)
+
+
+def _players_table(rows: List[Dict[str, Any]]) -> pa.Table:
+    columns = _partition_columns([r["played_at"] for r in rows], [r["player_count"] for r in rows])
+    columns.update({
+        "game_id": [r["game_id"] for r in rows],
+        "seat": [r["seat"] for r in rows],
+        "name": [r["name"] for r in rows],
+        "role": [r["role"] for r in rows],
+        "team": [r["team"] for r in rows],
+        "status": [r["status"] for r in rows],
+        "is_winner": [bool(r["is_winner"]) for r in rows],
+    })
+    return _table(PLAYERS, columns)
+
+
+def _events_table(rows: List[Dict[str, Any]]) -> pa.Table:
+    columns: Dict[str, list] = {field.name: [] for field in SCHEMAS[EVENTS]}
+    played_at, player_count = [], []
+    for r in rows:
+        if not r["events"]:
+            continue
+        turn, phase = 0, None
+        for seq, event in enumerate(json.loads(r["events"])):
+            if event["type"] == "roles_assigned":
+                continue
+            turn = event.get("turn", turn)
+            if event["type"] == "phase_started":
+                phase = event["phase"]
+            columns["game_id"].append(r["game_id"])
+            columns["seq"].append(seq)
+            columns["type"].append(event["type"])
+            columns["turn"].append(turn)
+            columns["phase"].append(phase)
+            columns["player"].append(next((event[k] for k in _EVENT_PLAYER_FIELDS if k in event), None))
+            columns["target"].append(next((event[k] for k in _EVENT_TARGET_FIELDS if k in event), None))
+            columns["detail"].append(next((event[k] for k in _EVENT_DETAIL_FIELDS if k in event), None))
+            played_at.append(r["played_at"])
+            player_count.append(r["player_count"])
+    columns.update(_partition_columns(played_at, player_count))
+    return _table(EVENTS, columns)
+
+
+def _write(output_dir: str, name: str, table: pa.Table, batch: int):
+    """1回の書き出しぶんを追加する。ファイル名に書き出しの番号を入れ、既存のファイルには触れない"""
+    if table.num_rows == 0:
+        return
+    ds.write_dataset(
+        table, os.path.join(output_dir, name), format="parquet", partitioning=PARTITIONING,
+        basename_template=f"part-{batch:06d}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def export_parquet(db_path: str, output_dir: str = DEFAULT_PARQUET_DIR, include_events: bool = False,
+                   batch_games: int = DEFAULT_BATCH_GAMES) -> int:
+    """
+    結果データベースのゲームを Parquet のデータセット (games / players / events) に書き出し、
+    新しく書き出したゲーム数を返す。
+    前回の書き出し以降に保存されたゲームだけを新しいファイルとして追加するため、何度実行してもよい。
+    書き出しの途中で止まった場合は、次の実行で同じファイル名に書き直されるので重複しない。
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    state = load_state(output_dir)
+    if state["games"] and state["events"] != include_events:
+        raise ValueError("既存のデータセットと進行イベントの書き出し設定が異なります。")
+    state["events"] = include_events
+    store = ResultsStore(db_path)
+    exported = 0
+    try:
+        while True:
+            # rowid は追加順に増えるため、前回の続きから読める
+            games = [dict(row) for row in store.conn.execute(
+                "SELECT rowid, game_id, played_at, winner, player_count, turns"
+                + (", events" if include_events else "")
+                + " FROM games WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (state["last_rowid"], batch_games))]
+            if not games:
+                break
+            last_rowid = games[-1]["rowid"]
+            players = [dict(row) for row in store.conn.execute(
+                "SELECT g.game_id, g.played_at, g.player_count, p.seat, p.name, p.role, p.team, p.status, "
+                "p.is_winner FROM games g JOIN game_players p ON p.game_id = g.game_id "
+                "WHERE g.rowid > ? AND g.rowid <= ? ORDER BY g.rowid, p.seat",
+                (state["last_rowid"], last_rowid))]
+            batch = state["batches"]
+            _write(output_dir, GAMES, _games_table(games), batch)
+            _write(output_dir, PLAYERS, _players_table(players), batch)
+            if include_events:
+                _write(output_dir, EVENTS, _events_table(games), batch)
+            state.update(last_rowid=last_rowid, batches=batch + 1, games=state["games"] + len(games))
+            _save_state(output_dir, state)
+            exported += len(games)
+    finally:
+        store.close()
+    return exported
+
+
+def load_table(output_dir: str = DEFAULT_PARQUET_DIR, name: str = GAMES, columns: Optional[List[str]] = None,
+               filter: Optional[ds.Expression] = None) -> pa.Table:
+    """
+    書き出したデータセットを Arrow のテーブルとして読む。
+    filter に分割キー (ds.field("date"), ds.field("player_count")) の条件を渡すと、該当するファイルだけを読む。
+    """
+    dataset = ds.dataset(os.path.join(output_dir, name), format="parquet", partitioning=PARTITIONING)
+    return dataset.to_table(columns=columns, filter=filter)
+
+
+def load_dataframe(output_dir: str = DEFAULT_PARQUET_DIR, name: str = GAMES, columns: Optional[List[str]] = None,
+                   filter: Optional[ds.Expression] = None):
+    """
+    load_table の結果を pandas の DataFrame にする。
+    列は Arrow の配列をそのまま使う型 (pd.ArrowDtype) になるため、変換時にデータの複製は発生しない。
+    """
+    import pandas as pd
+
+    return load_table(output_dir, name, columns, filter).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="結果データベースのゲームを Parquet のデータセットに書き出します")
+    parser.add_argument("output_dir", nargs="?", default=DEFAULT_PARQUET_DIR)
+    parser.add_argument("--db", default="result/results.db")
+    parser.add_argument("--events", action="store_true", help="進行イベントも書き出す")
+    parser.add_argument("--batch-games", type=int, default=DEFAULT_BATCH_GAMES)
+    args = parser.parse_args()
+
+    count = export_parquet(args.db, args.output_dir, include_events=args.events, batch_games=args.batch_games)
+    print(f"{count} ゲームを書き出しました (合計 {load_state(args.output_dir)['games']} ゲーム)")
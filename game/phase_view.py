@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Tuple, Mapping, Optional, TYPE_CHECKING
+
+from .player import Player
+
+if TYPE_CHECKING:
+    from .game_manager import GameManager
+
+
+@dataclass(frozen=True)
+class PhaseView:
+    """
+    夜・昼の画面が描画のたびに使う、フェーズごとの表示用データ (生存者の並び・夜アクションの対象・表示文字列)。
+    フェーズの開始時に1回だけ作り、死亡が出るかフェーズが変わるまで使い回す (GameManager.phase_view)。
+    書き換えない (辞書は読み取り専用の MappingProxyType)。
+    """
+    turn: int
+    phase: Optional[str]
+    alive: Tuple[Player, ...]                      # 生存者 (席順)
+    alive_names: Tuple[str, ...]
+    alive_summary: str                             # 「N 人: 名前, ...」
+    action_types: Mapping[str, str]                # 生存者の名前 -> 夜アクション種別
+    night_targets: Mapping[str, Tuple[str, ...]]   # 生存者の名前 -> 夜アクションで選べる対象 (対象を選ばない役職は空)
+    display_roles: Mapping[str, str]               # 本人に見せる役職名 (偽占い師は占い師と表示する)
+    action_labels: Mapping[str, str]               # 対象を選ぶ欄の見出し
+
+    @classmethod
+    def build(cls, gm: "GameManager") -> "PhaseView":
+        alive = tuple(gm.get_alive_players())
+        alive_names = tuple(p.name for p in alive)
+        action_types = {p.name: gm.get_night_action_type(p) for p in alive}
+        # 対象の規則は GameManager.get_night_target_options にある (シミュレーター・強化学習環境と共通)
+        night_targets = {p.name: tuple(gm.get_night_target_options(p, list(alive))) for p in alive}
+        return cls(
+            turn=gm.turn,
+            phase=gm.phase,
+            alive=alive,
+            alive_names=alive_names,
+            alive_summary=f"{len(alive_names)} 人: {', '.join(alive_names)}",
+            action_types=MappingProxyType(action_types),
+            night_targets=MappingProxyType(night_targets),
+            display_roles=MappingProxyType({p.name: "占い師" if p.role.name == "偽占い師" else p.role.name
+                                            for p in alive}),
+            action_labels=MappingProxyType({p.name: p.role.action_description() + "を選んでください:"
+                                            for p in alive}),
+        )
+
+    def player(self, name: str) -> Optional[Player]:
+        """生存者を名前で探す (死亡していれば None)"""
+        if name not in self.action_types:
+            return None
+        return self.alive[self.alive_names.index(name)]
@@ -0,0 +1,113 @@
+import json
+import sqlite3
+from typing import List, Dict, Any, Optional
+
+from .rating import Rating, update_team_game
+
+# レーティングの計算方法のバージョン。計算方法を変えたら上げること
+# (データベースに記録されたバージョンと異なる場合のみ、保存済みの全ゲームから作り直す)
+RATING_VERSION = 1
+
+# 全体のレーティングの scope。陣営別のレーティングは scope に陣営名を入れる
+OVERALL = ""
+
+RATINGS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_ratings (
+    scope TEXT NOT NULL,
+    name  TEXT NOT NULL,
+    mu    REAL NOT NULL,
+    rd    REAL NOT NULL,
+    games INTEGER NOT NULL,
+    wins  REAL NOT NULL,
+    PRIMARY KEY (scope, name)
+);
+CREATE TABLE IF NOT EXISTS rating_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+)
+"""
+
+
+def create_ratings_schema(conn: sqlite3.Connection):
+    """
+    レーティングのテーブルを作る (ResultsStore がトランザクションの中で呼ぶ)。
+    記録されたバージョンが RATING_VERSION と異なれば (テーブルを新しく作った場合を含む) 作り直す。
+    """
+    for statement in RATINGS_SCHEMA.strip().split(";"):
+        if statement.strip():
+            conn.execute(statement)
+    row = conn.execute("SELECT value FROM rating_meta WHERE key = 'version'").fetchone()
+    if row is None or int(row[0]) != RATING_VERSION:
+        rebuild_ratings(conn)
+
+
+def rebuild_ratings(conn: sqlite3.Connection):
+    """レーティングを保存済みの全ゲームから保存順に計算し直す (トランザクションの中で呼ぶこと)"""
+    conn.execute("DELETE FROM player_ratings")
+    for winner, results in conn.execute("SELECT winner, results FROM games ORDER BY rowid").fetchall():
+        add_game_ratings(conn, {"winner": winner, "results": json.loads(results)})
+    conn.execute("INSERT OR REPLACE INTO rating_meta (key, value) VALUES ('version', ?)", (str(RATING_VERSION),))
+
+
+def _update(conn: sqlite3.Connection, seats: List[tuple]):
+    """seats: ((scope, 名前), 陣営, 勝利したか)。該当する行だけを読み、update_team_game で更新して書き戻す"""
+    keys = sorted({key for key, _, _ in seats})
+    condition = " OR ".join(["(scope = ? AND name = ?)"] * len(keys))
+    ratings = {(row[0], row[1]): Rating(row[2], row[3], row[4], row[5]) for row in conn.execute(
+        f"SELECT scope, name, mu, rd, games, wins FROM player_ratings WHERE {condition}",
+        [value for key in keys for value in key])}
+    update_team_game(ratings, seats)
+    conn.executemany(
+        "INSERT OR REPLACE INTO player_ratings (scope, name, mu, rd, games, wins) VALUES (?, ?, ?, ?, ?, ?)",
+        [(scope, name, r.mu, r.rd, r.games, r.wins) for (scope, name), r in ratings.items()],
+    )
+
+
+def add_game_ratings(conn: sqlite3.Connection, record: Dict[str, Any]):
+    """
+    1ゲームぶんの結果 (get_game_results の行) でプレイヤーのレーティングを更新する
+    (ゲームを追加したのと同じトランザクションの中で呼ぶこと)。
+    読み書きするのはこのゲームのプレイヤーの行だけ。勝敗がつかなかったゲームは数えない。
+    全体のレーティングは他陣営の座席の全体のレーティング、
+    陣営別のレーティングは他陣営の座席の陣営別のレーティングを相手として勝敗を付ける。
+    """
+    if not record.get("winner"):
+        return
+    seats = [(row["名前"], row["陣営"], bool(row["勝利"])) for row in record["results"]]
+    _update(conn, [((OVERALL, name), team, won) for name, team, won in seats])
+    _update(conn, [((team, name), team, won) for name, team, won in seats])
+
+
+class PlayerRatings:
+    """プレイヤー (設定画面で入力した名前) ごとのレーティングの問い合わせ"""
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def get(self, name: str, team: Optional[str] = None) -> Optional[Rating]:
+        """プレイヤーの全体 (team を指定するとその陣営) のレーティング。まだなければ None"""
+        row = self.conn.execute("SELECT mu, rd, games, wins FROM player_ratings WHERE scope = ? AND name = ?",
+                                (team or OVERALL, name)).fetchone()
+        return Rating(*row) if row else None
+
+    def teams(self) -> List[str]:
+        """陣営別のレーティングがある陣営"""
+        return [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT scope FROM player_ratings WHERE scope != ? ORDER BY scope", (OVERALL,))]
+
+    def leaderboard(self, team: Optional[str] = None, min_games: int = 1, limit: int = 100) -> List[Dict[str, Any]]:
+        """リーダーボード (レートの高い順、95% 信頼区間付き)。team を指定するとその陣営のレーティング"""
+        rows = self.conn.execute(
+            "SELECT name, mu, rd, games, wins FROM player_ratings WHERE scope = ? AND games >= ? "
+            "ORDER BY mu DESC, name LIMIT ?", (team or OVERALL, min_games, limit))
+        board = []
+        for name, mu, rd, games, wins in rows:
+            rating = Rating(mu, rd, games, wins)
+            board.append({
+                "プレイヤー": name,
+                "レート": round(rating.mu, 1),
+                "下限": round(rating.lower(), 1),
+                "上限": round(rating.upper(), 1),
+                "試合数": rating.games,
+                "勝率": round(rating.wins / rating.games, 3) if rating.games else 0.0,
+            })
+        return board
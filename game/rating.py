@@ -0,0 +1,102 @@
+import math
+from typing import List, Tuple, Dict, Any
+
+# Glicko レーティングの定数
+INITIAL_RATING = 1500.0
+INITIAL_RD = 350.0
+MIN_RD = 30.0 # RD の下限 (レートが固まりきらないようにする)
+_Q = math.log(10) / 400
+
+
+class Rating:
+    """
+    Glicko 形式のレーティング。
+    mu がレート、rd がレーティング偏差 (不確かさ) を表し、rd から信頼区間を求められる。
+    """
+    def __init__(self, mu: float = INITIAL_RATING, rd: float = INITIAL_RD, games: int = 0, wins: float = 0.0):
+        self.mu = mu
+        self.rd = rd
+        self.games = games
+        self.wins = wins
+
+    def lower(self, z: float = 1.96) -> float:
+        """信頼区間の下限 (既定は 95%)"""
+        return self.mu - z * self.rd
+
+    def upper(self, z: float = 1.96) -> float:
+        """信頼区間の上限 (既定は 95%)"""
+        return self.mu + z * self.rd
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"mu": self.mu, "rd": self.rd, "games": self.games, "wins": self.wins}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Rating":
+        return cls(data["mu"], data["rd"], data["games"], data["wins"])
+
+    def __repr__(self):
+        return f"Rating(mu={self.mu:.1f}, rd={self.rd:.1f}, games={self.games})"
+
+
+def _g(rd: float) -> float:
+    return 1 / math.sqrt(1 + 3 * (_Q ** 2) * (rd ** 2) / (math.pi ** 2))
+
+
+def expected_score(rating: Rating, opponent_mu: float, opponent_rd: float) -> float:
+    """opponent に対する期待スコア (勝率の推定値)"""
+    return 1 / (1 + 10 ** (-_g(opponent_rd) * (rating.mu - opponent_mu) / 400))
+
+
+def update_rating(rating: Rating, results: List[Tuple[float, float, float]]) -> Rating:
+    """
+    1レーティング期間ぶんの結果でレーティングを更新した新しい Rating を返す (Glicko-1)。
+
+    Args:
+        rating: 更新前のレーティング
+        results: (相手のレート, 相手の RD, スコア) のリスト。スコアは勝ち 1 / 引き分け 0.5 / 負け 0
+    """
+    if not results:
+        return rating
+    d_inv = 0.0
+    delta = 0.0
+    for opponent_mu, opponent_rd, score in results:
+        g = _g(opponent_rd)
+        e = expected_score(rating, opponent_mu, opponent_rd)
+        d_inv += (g ** 2) * e * (1 - e)
+        delta += g * (score - e)
+    d_inv *= _Q ** 2
+    denominator = 1 / (rating.rd ** 2) + d_inv
+    new_mu = rating.mu + (_Q / denominator) * delta
+    new_rd = max(math.sqrt(1 / denominator), MIN_RD)
+    wins = rating.wins + sum(score for _, _, score in results)
+    return Rating(new_mu, new_rd, rating.games + len(results), wins)
+
+
+def update_team_game(ratings: Dict[str, Rating], seats: List[Tuple[str, str, bool]]) -> Dict[str, Rating]:
+    """
+    陣営戦1ゲームの結果で、座席ごとのキーのレーティングをまとめて更新する。
+    各座席は「自分と異なる陣営の座席の平均レート」を相手として勝敗を付ける。
+    同じキーが複数の座席にいる場合は、その全結果を1期間として更新する。
+
+    Args:
+        ratings: キー -> Rating。未登録のキーは初期値で追加される (この辞書自体を更新する)
+        seats: (レーティングのキー, 陣営, 勝利したか) のリスト
+
+    Returns:
+        更新された ratings
+    """
+    for key, _, _ in seats:
+        ratings.setdefault(key, Rating())
+    # 更新前のレートを基準にする (座席の処理順に依存しないように)
+    before = {key: ratings[key] for key, _, _ in seats}
+    results: Dict[str, List[Tuple[float, float, float]]] = {}
+    for key, team, won in seats:
+        opponents = [before[other_key] for other_key, other_team, _ in seats if other_team != team]
+        if not opponents:
+            continue
+        opponent_mu = sum(r.mu for r in opponents) / len(opponents)
+        opponent_rd = math.sqrt(sum(r.rd ** 2 for r in opponents) / len(opponents))
+        results.setdefault(key, []).append((opponent_mu, opponent_rd, 1.0 if won else 0.0))
+    for key, key_results in results.items():
+        ratings[key] = update_rating(before[key], key_results)
+    return ratings
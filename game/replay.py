@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+
+from .events import Event, GameState, PhaseStarted, PlayerKilled, VoteResolved, GameEnded, apply_event
+
+DEFAULT_KEYFRAME_INTERVAL = 16 # キーフレームの間隔 (イベント数)
+
+
+def copy_state(state: GameState) -> GameState:
+    """GameState の複製 (キーフレームから再生するときに元を書き換えないため)"""
+    return GameState(
+        players=list(state.players),
+        roles=dict(state.roles),
+        alive=dict(state.alive),
+        death_info={name: dict(info) for name, info in state.death_info.items()},
+        turn=state.turn,
+        phase=state.phase,
+        night_actions={turn: {name: dict(a) for name, a in actions.items()}
+                       for turn, actions in state.night_actions.items()},
+        seer_results={turn: {name: dict(r) for name, r in results.items()}
+                      for turn, results in state.seer_results.items()},
+        votes={turn: dict(votes) for turn, votes in state.votes.items()},
+        last_night_victims=list(state.last_night_victims),
+        last_executed=state.last_executed,
+        victory_team=state.victory_team,
+        victory_message=state.victory_message,
+    )
+
+
+@dataclass(frozen=True)
+class ReplayStep:
+    """リプレイの1コマ (1フェーズ)。events[start:end] がこのフェーズのイベント"""
+    turn: int
+    phase: Optional[str]
+    start: int
+    end: int
+
+    @property
+    def label(self) -> str:
+        if self.phase == "night":
+            return f"{self.turn}日目 夜"
+        if self.phase == "day":
+            return f"{self.turn}日目 昼"
+        return "開始前"
+
+
+class Replay:
+    """
+    ゲームの進行イベントからリプレイを作る。
+    keyframe_interval イベントごとに状態のスナップショット (キーフレーム) を取っておき、
+    任意の位置の状態は直前のキーフレームから高々 keyframe_interval 個のイベントを再生して求める。
+    """
+    def __init__(self, events: List[Event], keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        self.events = list(events)
+        self.keyframe_interval = keyframe_interval
+        # keyframes[i] は events[:i * keyframe_interval] を畳み込んだ状態
+        self.keyframes: List[GameState] = []
+        self.steps: List[ReplayStep] = []
+        state = GameState()
+        step_start, step_turn, step_phase = 0, 1, None
+        for i, event in enumerate(self.events):
+            if i % keyframe_interval == 0:
+                self.keyframes.append(copy_state(state))
+            if isinstance(event, PhaseStarted):
+                if i > step_start:
+                    self.steps.append(ReplayStep(step_turn, step_phase, step_start, i))
+                step_start, step_turn, step_phase = i, event.turn, event.phase
+            apply_event(state, event)
+        if len(self.events) % keyframe_interval == 0:
+            self.keyframes.append(copy_state(state))
+        self.steps.append(ReplayStep(step_turn, step_phase, step_start, len(self.events)))
+        # 勝敗が決まった後に始まっただけのフェーズ (イベントがフェーズ開始のみ) は表示しない
+        last = self.steps[-1]
+        ended = any(isinstance(e, GameEnded) for e in self.events[:last.start])
+        if ended and len(self.steps) > 1 and last.end - last.start == 1:
+            self.steps.pop()
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def state_at(self, position: int) -> GameState:
+        """events[:position] を畳み込んだ状態 (直前のキーフレームから再生する)"""
+        position = max(0, min(position, len(self.events)))
+        base = position // self.keyframe_interval
+        state = copy_state(self.keyframes[base])
+        for event in self.events[base * self.keyframe_interval:position]:
+            apply_event(state, event)
+        return state
+
+    def step_view(self, index: int) -> Dict[str, Any]:
+        """
+        コマ index の表示用の情報。
+        {
+            "label", "turn", "phase",
+            "alive": フェーズ開始時の生存者,
+            "actions": 夜アクション (夜のみ), "seer_results": 占い結果 (夜のみ),
+            "votes": 投票 (昼のみ), "executed": 処刑されたプレイヤー (昼のみ),
+            "deaths": [(名前, 死因), ...] このフェーズの死亡,
+            "victory": 勝敗が決まった場合のメッセージ,
+            "roles": 全員の役職,
+        }
+        """
+        step = self.steps[index]
+        before = self.state_at(step.start)
+        after = self.state_at(step.end)
+        phase_events = self.events[step.start:step.end]
+        executed = next((e.executed for e in phase_events if isinstance(e, VoteResolved)), None)
+        victory = next((e.message for e in phase_events if isinstance(e, GameEnded)), None)
+        return {
+            "label": step.label,
+            "turn": step.turn,
+            "phase": step.phase,
+            "alive": before.alive_players() if step.phase else after.alive_players(),
+            "actions": after.night_actions.get(step.turn, {}) if step.phase == "night" else {},
+            "seer_results": after.seer_results.get(step.turn, {}) if step.phase == "night" else {},
+            "votes": after.votes.get(step.turn, {}) if step.phase == "day" else {},
+            "executed": executed,
+            "deaths": [(e.player, e.reason) for e in phase_events if isinstance(e, PlayerKilled)],
+            "victory": victory,
+            "roles": dict(after.roles),
+        }
@@ -0,0 +1,401 @@
+import os
+import json
+import time
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from concurrent.futures import Future
+from urllib.request import pathname2url
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+from .events import event_to_dict
+from .stats import GameStats, create_stats_schema, add_game_stats
+from . import player_ratings
+from .player_ratings import PlayerRatings, create_ratings_schema, add_game_ratings
+
+DEFAULT_DB_PATH = "result/results.db"
+
+# 日時は文字列で保存する (辞書順 = 時刻順になる形式)
+PLAYED_AT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id      TEXT PRIMARY KEY,
+    played_at    TEXT NOT NULL,
+    winner       TEXT,
+    player_count INTEGER NOT NULL,
+    turns        INTEGER,
+    results      TEXT NOT NULL,
+    events       TEXT
+);
+CREATE TABLE IF NOT EXISTS game_players (
+    game_id   TEXT NOT NULL REFERENCES games(game_id),
+    seat      INTEGER NOT NULL,
+    name      TEXT NOT NULL,
+    role      TEXT NOT NULL,
+    team      TEXT NOT NULL,
+    status    TEXT NOT NULL,
+    is_winner INTEGER NOT NULL,
+    PRIMARY KEY (game_id, seat)
+);
+CREATE INDEX IF NOT EXISTS idx_games_played_at ON games(played_at);
+CREATE INDEX IF NOT EXISTS idx_games_played_at_id ON games(played_at, game_id);
+CREATE INDEX IF NOT EXISTS idx_games_winner ON games(winner, played_at);
+CREATE INDEX IF NOT EXISTS idx_game_players_role ON game_players(role);
+CREATE INDEX IF NOT EXISTS idx_game_players_name ON game_players(name);
+"""
+# ゲームが追加されるたびに増える値 (一覧のキャッシュの無効化に使う)
+_DATA_VERSION_SQL = "SELECT COALESCE(MAX(rowid), 0) FROM games"
+
+# このプロセスでスキーマを作成・確認したデータベース -> その時点の (PRAGMA schema_version, レーティングの計算方法のバージョン)
+# (接続のたびにスキーマの確認で書き込みのロックを取らないため。他から表が変更・削除されれば schema_version が変わる)
+_schema_versions: Dict[str, Tuple[int, int]] = {}
+
+
+def read_data_version(path: str = DEFAULT_DB_PATH) -> int:
+    """
+    ResultsStore.data_version を読み取り専用の接続で読む (描画のたびに呼ぶため、スキーマの作成や書き込みのロックをしない)。
+    データベースがまだなければ 0。
+    """
+    if not os.path.exists(path):
+        return 0
+    conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True)
+    try:
+        return conn.execute(_DATA_VERSION_SQL).fetchone()[0]
+    except sqlite3.OperationalError: # テーブルがまだない
+        return 0
+    finally:
+        conn.close()
+
+
+def build_game_record(gm, played_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """GameManager から結果ストアに保存する1ゲームぶんのレコードを作る"""
+    return {
+        "game_id": gm.game_id,
+        "played_at": (played_at or datetime.now()).strftime(PLAYED_AT_FORMAT),
+        "winner": gm.victory_team,
+        "player_count": len(gm.players),
+        "turns": gm.turn,
+        "results": gm.get_game_results(),
+        "events": [event_to_dict(event) for event in gm.events],
+    }
+
+
+class ResultsStore:
+    """
+    ゲーム結果を SQLite (WAL モード) に保存するストア。
+    - ゲームIDごとに1レコードで、同じゲームを何度保存しても1件のまま (冪等)
+    - 日付・勝利陣営・役職・プレイヤー名にインデックスを持つ
+    - 複数のサーバープロセスから同時に書き込めるよう、書き込みは BEGIN IMMEDIATE で直列化する
+    接続はスレッドごとに1つのインスタンスを使うこと。
+    """
+    def __init__(self, path: str = DEFAULT_DB_PATH, timeout: float = 30.0):
+        self.path = path
+        if path != ":memory:":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+        key = os.path.abspath(path)
+        if path == ":memory:" or _schema_versions.get(key) != self._schema_version():
+            self._create_schema()
+            _schema_versions[key] = self._schema_version()
+
+    def _schema_version(self) -> Tuple[int, int]:
+        return self.conn.execute("PRAGMA schema_version").fetchone()[0], player_ratings.RATING_VERSION
+
+    def _create_schema(self):
+        with self.transaction():
+            for statement in _SCHEMA.strip().split(";"):
+                if statement.strip():
+                    self.conn.execute(statement)
+            # 進行イベントの列がない古いデータベースには列を追加する
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(games)")}
+            if "events" not in columns:
+                self.conn.execute("ALTER TABLE games ADD COLUMN events TEXT")
+            create_stats_schema(self.conn)
+            create_ratings_schema(self.conn)
+
+    def transaction(self):
+        """書き込みトランザクション (BEGIN IMMEDIATE ... COMMIT / ROLLBACK)"""
+        return _Transaction(self.conn)
+
+    def close(self):
+        self.conn.close()
+
+    # --- 書き込み ---
+    def save_game(self, record: Dict[str, Any]) -> bool:
+        """1ゲームを保存する。新しく追加された場合 True、既に保存済みなら False"""
+        return self.save_games([record]) == 1
+
+    def save_games(self, records: Iterable[Dict[str, Any]]) -> int:
+        """複数ゲームを1トランザクションで保存し、新しく追加された件数を返す"""
+        inserted = 0
+        with self.transaction():
+            for record in records:
+                if self.insert_game(record):
+                    inserted += 1
+        return inserted
+
+    def insert_game(self, record: Dict[str, Any]) -> bool:
+        """
+        1ゲームを追加する (transaction() の中で呼ぶこと)。
+        新しく追加された場合 True、既に同じゲームIDがあれば何もせず False。
+        """
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO games (game_id, played_at, winner, player_count, turns, results, events) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (record["game_id"], record["played_at"], record.get("winner"), record["player_count"],
+             record.get("turns"), json.dumps(record["results"], ensure_ascii=False),
+             json.dumps(record["events"], ensure_ascii=False) if record.get("events") is not None else None),
+        )
+        if cursor.rowcount == 0:
+            return False
+        self.conn.executemany(
+            "INSERT INTO game_players (game_id, seat, name, role, team, status, is_winner) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(record["game_id"], seat, row["名前"], row["役職"], row["陣営"], row["生死"], 1 if row["勝利"] else 0)
+             for seat, row in enumerate(record["results"])],
+        )
+        add_game_stats(self.conn, record)
+        add_game_ratings(self.conn, record)
+        return True
+
+    # --- 読み込み ---
+    def get_game(self, game_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT * FROM games WHERE game_id = ?", (game_id,)).fetchone()
+        return _row_to_record(row) if row else None
+
+    def count_games(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def data_version(self) -> int:
+        """ゲームが追加されるたびに増える値 (一覧のキャッシュの無効化に使う)"""
+        return self.conn.execute(_DATA_VERSION_SQL).fetchone()[0]
+
+    def list_games(self, since: Optional[str] = None, until: Optional[str] = None, winner: Optional[str] = None,
+                   player: Optional[str] = None, roles: Iterable[str] = (), player_count: Optional[int] = None,
+                   after: Optional[Tuple[str, str]] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        条件に合うゲームの概要 (結果・進行イベントを除く) を新しい順に最大 limit 件返す。
+        since / until は日付 ("YYYY-MM-DD"、両端を含む)、roles はすべての役職を含むゲームに絞る。
+        after に前のページの最後のゲームの (played_at, game_id) を渡すと、その続きを返す (キーセット方式のため、
+        何ページ目でもインデックスをたどるだけで済む)。各要素の "players" はプレイヤー名のリスト (座席順)。
+        """
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("g.played_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("g.played_at <= ?")
+            params.append(until + " 23:59:59")
+        if winner is not None:
+            clauses.append("g.winner = ?")
+            params.append(winner)
+        if player_count is not None:
+            clauses.append("g.player_count = ?")
+            params.append(player_count)
+        # 名前・役職の条件は、新しい順にたどったゲームの座席を主キーで引いて確かめる
+        # (+ は名前・役職のインデックスを使わせないため。使うと該当する全座席を毎回走査してしまう)
+        if player is not None:
+            clauses.append("EXISTS (SELECT 1 FROM game_players p WHERE p.game_id = g.game_id AND +p.name = ?)")
+            params.append(player)
+        for role in roles:
+            clauses.append("EXISTS (SELECT 1 FROM game_players p WHERE p.game_id = g.game_id AND +p.role = ?)")
+            params.append(role)
+        if after is not None:
+            clauses.append("(g.played_at, g.game_id) < (?, ?)")
+            params.extend(after)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        rows = self.conn.execute(
+            "SELECT g.game_id, g.played_at, g.winner, g.player_count, g.turns, "
+            "(SELECT group_concat(name, char(31)) FROM "
+            "(SELECT name FROM game_players p WHERE p.game_id = g.game_id ORDER BY seat)) AS players "
+            f"FROM games g{where} ORDER BY g.played_at DESC, g.game_id DESC LIMIT ?",
+            params + [limit])
+        games = []
+        for row in rows:
+            game = dict(row)
+            game["players"] = game["players"].split("\x1f") if game["players"] else []
+            games.append(game)
+        return games
+
+    def recent_rosters(self, limit: int = 10, scan: int = 200) -> List[Dict[str, Any]]:
+        """
+        最近のゲームの名簿 (played_at と players: 座席順のプレイヤー名) を新しい順に最大 limit 件返す。
+        同じ顔ぶれ・並びの名簿は最も新しいものだけを残す。直近 scan 件のゲームから探す。
+        """
+        rosters, seen = [], set()
+        for game in self.list_games(limit=scan):
+            players = tuple(game["players"])
+            if not players or players in seen:
+                continue
+            seen.add(players)
+            rosters.append({"played_at": game["played_at"], "players": list(players)})
+            if len(rosters) >= limit:
+                break
+        return rosters
+
+    def stats(self) -> GameStats:
+        """役職・陣営・人数・月ごとの統計 (ゲームの保存時に更新される集計テーブルから答える)"""
+        return GameStats(self.conn)
+
+    def ratings(self) -> PlayerRatings:
+        """プレイヤーごとのレーティング (ゲームの保存時に、そのゲームのプレイヤーの分だけ更新される)"""
+        return PlayerRatings(self.conn)
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
+
+
+def _row_to_record(row: sqlite3.Row) -> Dict[str, Any]:
+    record = dict(row)
+    record["results"] = json.loads(record["results"])
+    record["events"] = json.loads(record["events"]) if record.get("events") else None
+    return record
+
+
+class WriteBehindWriter:
+    """
+    結果の書き込みをバックグラウンドのスレッドで行うライター。
+    submit はキューに積むだけなので、画面の描画がディスク I/O を待つことはない。
+    キューに溜まったレコードはまとめて1トランザクションで書き込む。
+    書き込めなかったレコードは捨てずに退避ファイル (dead_letter_path、1行1レコードの JSON) に追記する。
+    """
+    def __init__(self, path: str = DEFAULT_DB_PATH, max_batch: int = 100, retry_interval: float = 0.5,
+                 max_retries: int = 20, dead_letter_path: Optional[str] = None):
+        self.path = path
+        self.max_batch = max_batch
+        self.retry_interval = retry_interval
+        self.max_retries = max_retries
+        self.dead_letter_path = dead_letter_path or path + ".failed.jsonl"
+        self.last_error: Optional[BaseException] = None
+        self.written = 0
+        self.failed = 0 # 退避ファイルに回したレコードの数
+        # キューの要素は (レコード, Future)、flush の Event、停止の None
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="results-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: Dict[str, Any]) -> Future:
+        """
+        レコードを書き込みキューに積む (すぐに戻る)。
+        Future は書き込めたら True になり、書き込めずに退避ファイルに回したらその例外で終わる。
+        """
+        if self._closed:
+            raise RuntimeError("ライターは停止しています。")
+        future: Future = Future()
+        self._queue.put((record, future))
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """キューに積まれたレコードがすべて処理される (書き込むか退避する) まで待つ"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+
+    def _loop(self):
+        store: Optional[ResultsStore] = None
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                batch: List[Tuple[Dict[str, Any], Future]] = []
+                flushes: List[threading.Event] = []
+                while True:
+                    if item is None:
+                        stopping = True
+                    elif isinstance(item, threading.Event):
+                        flushes.append(item)
+                    else:
+                        batch.append(item)
+                    if stopping or len(batch) >= self.max_batch:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                try:
+                    if batch:
+                        if store is None:
+                            store = ResultsStore(self.path) # 開けなければ次のまとまりでまた開き直す
+                        self._write(store, batch)
+                except Exception as e:
+                    self.last_error = e
+                    self._dead_letter(batch, e)
+                finally:
+                    # 書き込みに失敗しても flush を待っている側を止めない
+                    for done in flushes:
+                        done.set()
+        finally:
+            if store is not None:
+                store.close()
+
+    def _write(self, store: ResultsStore, batch: List[Tuple[Dict[str, Any], Future]]):
+        try:
+            self._save_with_retry(store, [record for record, _ in batch])
+        except sqlite3.OperationalError as e:
+            # 再試行してもロックが取れない・ディスクに書けない: 1件ずつ試しても同じなので、まとめて退避する
+            self.last_error = e
+            self._dead_letter(batch, e)
+            return
+        except Exception as e:
+            # 壊れたレコードが混ざっている: 1件ずつ書き込み、書き込めないレコードだけを退避する
+            self.last_error = e
+            if len(batch) == 1:
+                self._dead_letter(batch, e)
+            else:
+                for item in batch:
+                    self._write(store, [item])
+            return
+        self.written += len(batch)
+        for _, future in batch:
+            future.set_result(True)
+
+    def _save_with_retry(self, store: ResultsStore, records: List[Dict[str, Any]]):
+        for attempt in range(self.max_retries):
+            try:
+                store.save_games(records)
+                return
+            except sqlite3.OperationalError:
+                # 他のプロセスがロックを保持している場合などは少し待って再試行する
+                if attempt == self.max_retries - 1:
+                    raise
+                time.sleep(self.retry_interval)
+
+    def _dead_letter(self, batch: List[Tuple[Dict[str, Any], Future]], error: BaseException):
+        """書き込めなかったレコードを退避ファイルに追記し、Future をエラーで終える"""
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                for record, _ in batch:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except Exception as e:
+            self.last_error = e
+        self.failed += len(batch)
+        for _, future in batch:
+            future.set_exception(error)
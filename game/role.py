@@ -67,8 +67,8 @@ class 偽占い師(Role):
     def has_night_action(self, turn: int) -> bool:
         return True
 
-    def fake_seer_result(self) -> str:
-        return random.choice(["人狼", "人狼ではない"])
+    def fake_seer_result(self, rng: random.Random = None) -> str:
+        return (rng or random).choice(["人狼", "人狼ではない"])
 
 class 霊媒師(Role):
     def __init__(self, id: int):
@@ -0,0 +1,268 @@
+import sys
+import time
+import random
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator
+
+from .game_manager import GameManager
+from .checkpoint import CheckpointStore, encode_checkpoint
+
+# ルームコード (読み間違えやすい 0/O, 1/I は使わない)
+ROOM_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+ROOM_CODE_LENGTH = 5
+
+DEFAULT_MAX_LOADED_ROOMS = 200
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_IDLE_TTL = 30 * 60 # 秒
+
+# 退避したルームのチェックポイントのID (ルームコードに付ける)
+ROOM_CHECKPOINT_PREFIX = "room-"
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    オブジェクトが参照しているもの全体のおおよそのメモリ使用量 (バイト)。
+    辞書・リスト・インスタンスの属性をたどって sys.getsizeof を合計する (同じオブジェクトは1回だけ数える)。
+    クラス・関数・モジュールは共有されているため数えない。
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, (type, type(sys), type(estimate_size))):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif hasattr(current, "__dict__"):
+            stack.append(vars(current))
+        elif hasattr(current, "__slots__"):
+            stack.extend(getattr(current, name) for name in current.__slots__ if hasattr(current, name))
+    return total
+
+
+class Room:
+    """
+    1つのゲーム卓。ゲーム (GameManager) と、卓で共有する画面の状態 (夜の手番・投票など) を持つ。
+    退避中 (gm が None) のルームは、チェックポイントから復元されるまでメモリをほとんど使わない。
+    """
+    def __init__(self, code: str, gm: Optional[GameManager], session: Dict[str, Any], stage: str):
+        self.code = code
+        self.gm = gm
+        self.session = session
+        self.stage = stage
+        self.lock = threading.Lock()
+        self.size = 0
+        self.last_access = 0.0
+        self.closed = False # 削除済み (使用中に削除された場合は、ロックを放すときに片付ける)
+
+    @property
+    def loaded(self) -> bool:
+        return self.gm is not None
+
+
+class RoomRegistry:
+    """
+    サーバープロセス内のルームの一覧。
+    - ルームコードで参加し、ルームごとのロックで同じ卓の同時操作を直列化する
+    - ルームごとにメモリ使用量を見積もり、メモリ上のルーム数・合計サイズの上限と、放置時間 (TTL) を超えたら
+      最後に使われたのが古い順 (LRU) にチェックポイントへ書き出してメモリから外す
+    - 外したルームは次に開いたときにチェックポイントから復元する (サーバーの再起動後も同じコードで参加できる)
+    """
+    def __init__(self, store: CheckpointStore, max_loaded_rooms: int = DEFAULT_MAX_LOADED_ROOMS,
+                 max_bytes: int = DEFAULT_MAX_BYTES, idle_ttl: float = DEFAULT_IDLE_TTL, clock=time.monotonic,
+                 rng: Optional[random.Random] = None):
+        self.store = store
+        self.max_loaded_rooms = max_loaded_rooms
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self.rng = rng or random.SystemRandom()
+        self.evictions = 0
+        self.restores = 0
+        self._rooms: Dict[str, Room] = {}
+        self._lru: "OrderedDict[str, None]" = OrderedDict() # メモリ上のルーム (古い順)
+        self._lock = threading.Lock() # ルームの一覧と LRU を守る (ルームごとのロックより先には取らない)
+
+    @staticmethod
+    def checkpoint_id(code: str) -> str:
+        return ROOM_CHECKPOINT_PREFIX + code
+
+    def _new_code(self) -> str:
+        while True:
+            code = "".join(self.rng.choice(ROOM_CODE_ALPHABET) for _ in range(ROOM_CODE_LENGTH))
+            if code not in self._rooms and self.store.header(self.checkpoint_id(code)) is None:
+                return code
+
+    # --- 作成・参加 ---
+    def create(self, gm: GameManager, session: Dict[str, Any], stage: str) -> Room:
+        """ゲームを新しいルームに登録し、ルームを返す"""
+        with self._lock:
+            room = Room(self._new_code(), gm, session, stage)
+            room.size = estimate_size((gm, session))
+            room.last_access = self.clock()
+            self._rooms[room.code] = room
+            self._lru[room.code] = None
+        self.enforce_limits()
+        return room
+
+    def exists(self, code: str) -> bool:
+        """ルームがあるか (退避中・再起動前のルームを含む)"""
+        code = code.upper()
+        with self._lock:
+            if code in self._rooms:
+                return True
+        return self.store.header(self.checkpoint_id(code)) is not None
+
+    def acquire(self, code: str) -> Room:
+        """
+        ルームのロックを取って返す (退避中なら復元する)。使い終わったら必ず release すること。
+        ルームがなければ KeyError。
+        """
+        code = code.upper()
+        with self._lock:
+            room = self._rooms.get(code)
+            if room is None:
+                # 再起動前のルーム: チェックポイントがあれば一覧に戻す
+                if self.store.header(self.checkpoint_id(code)) is None:
+                    raise KeyError(code)
+                room = self._rooms[code] = Room(code, None, {}, "")
+        room.lock.acquire()
+        if room.closed: # ロックを待っている間に削除された
+            room.lock.release()
+            raise KeyError(code)
+        if not room.loaded:
+            try:
+                self._restore(room)
+            except KeyError:
+                room.lock.release()
+                with self._lock:
+                    self._rooms.pop(code, None)
+                raise
+        with self._lock:
+            self._lru[code] = None
+            self._lru.move_to_end(code)
+        return room
+
+    def release(self, room: Room):
+        """ルームのメモリ使用量を更新してロックを放し、上限を超えていれば他のルームを退避する"""
+        if not room.closed:
+            room.size = estimate_size((room.gm, room.session))
+            room.last_access = self.clock()
+        self._unlock(room)
+        self.enforce_limits()
+
+    def _unlock(self, room: Room):
+        """ルームのロックを放す。使用中に削除されていれば、ここでゲームとチェックポイントを片付ける"""
+        try:
+            if room.closed:
+                room.gm = None
+                room.session = {}
+                room.size = 0
+                self.store.delete(self.checkpoint_id(room.code)) # 削除の前に退避で書かれていれば消す
+        finally:
+            room.lock.release()
+
+    @contextmanager
+    def open(self, code: str) -> Iterator[Room]:
+        """acquire / release の with 版"""
+        room = self.acquire(code)
+        try:
+            yield room
+        finally:
+            self.release(room)
+
+    def close(self, code: str):
+        """
+        ルームを削除する (ゲーム終了時)。チェックポイントも消す。
+        ルームを使用中 (open の中から閉じた場合を含む) ならロックを待たず、ロックを放すときに片付ける。
+        """
+        code = code.upper()
+        with self._lock:
+            room = self._rooms.pop(code, None)
+            self._lru.pop(code, None)
+        self.store.delete(self.checkpoint_id(code))
+        if room is not None:
+            room.closed = True
+            if room.lock.acquire(blocking=False):
+                self._unlock(room)
+
+    def peek(self, code: str, key: str, default: Any = None) -> Any:
+        """
+        ルームの画面の状態の値を、ルームのロックを取らずに読む (他の端末での変更を定期的に確かめる用)。
+        画面の状態の値は書き換えずに置き換える約束なので、読んだ値はそのまま使える。退避中・ないルームなら default。
+        """
+        with self._lock:
+            room = self._rooms.get(code.upper())
+        if room is None or not room.loaded or room.closed:
+            return default
+        return room.session.get(key, default)
+
+    # --- 退避・復元 ---
+    def _restore(self, room: Room):
+        loaded = self.store.load(self.checkpoint_id(room.code))
+        if loaded is None:
+            raise KeyError(room.code)
+        room.gm, header = loaded
+        room.session = header["session"]
+        room.stage = header["stage"]
+        self.restores += 1
+
+    def _evict(self, room: Room) -> bool:
+        """ルームをチェックポイントに書き出してメモリから外す。使用中 (ロック中) なら何もせず False"""
+        if not room.lock.acquire(blocking=False):
+            return False
+        try:
+            if not room.loaded or room.closed:
+                return False
+            self.store.save(self.checkpoint_id(room.code), encode_checkpoint(room.gm, room.session, room.stage))
+            room.gm = None
+            room.session = {}
+            room.size = 0
+            self.evictions += 1
+        finally:
+            self._unlock(room)
+        with self._lock:
+            self._lru.pop(room.code, None)
+        return True
+
+    def enforce_limits(self):
+        """放置時間を超えたルームと、上限 (ルーム数・合計サイズ) を超えたぶんの古いルームを退避する"""
+        now = self.clock()
+        with self._lock:
+            candidates = [self._rooms[code] for code in self._lru] # 古い順
+            loaded = len(candidates)
+            total = sum(room.size for room in candidates)
+        for room in candidates:
+            idle = now - room.last_access >= self.idle_ttl
+            if not idle and loaded <= self.max_loaded_rooms and total <= self.max_bytes:
+                break
+            size = room.size
+            if self._evict(room):
+                loaded -= 1
+                total -= size
+
+    # --- 状況 ---
+    def stats(self) -> Dict[str, Any]:
+        """ルーム数・メモリ上のルーム数・見積もりの合計サイズ・退避と復元の回数"""
+        with self._lock:
+            loaded = [self._rooms[code] for code in self._lru]
+            return {
+                "rooms": len(self._rooms),
+                "loaded": len(loaded),
+                "bytes": sum(room.size for room in loaded),
+                "evictions": self.evictions,
+                "restores": self.restores,
+            }
+
+    def loaded_codes(self) -> List[str]:
+        """メモリ上のルームのコード (最後に使われたのが古い順)"""
+        with self._lock:
+            return list(self._lru)
@@ -0,0 +1,68 @@
+import io
+import csv
+import re
+from typing import List, Optional
+
+# 貼り付けた名簿の区切り (改行のほか、カンマ・読点・タブ)
+_SEPARATORS = re.compile(r"[,、\t]")
+# CSV の見出しとして扱う列名
+NAME_HEADERS = ("name", "名前", "プレイヤー名", "プレイヤー")
+
+
+def parse_roster(text: str) -> List[str]:
+    """
+    貼り付けた名簿からプレイヤー名を取り出す (1行に1人、またはカンマ・読点・タブ区切り)。
+    空行は無視するが、区切りの間の空欄は空の名前として残す (validate_roster で指摘するため)。
+    """
+    names = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        names.extend(name.strip() for name in _SEPARATORS.split(line))
+    return names
+
+
+def parse_roster_csv(data: bytes) -> List[str]:
+    """
+    CSV の名簿からプレイヤー名を取り出す。見出しに名前の列 (NAME_HEADERS) があればその列、なければ1列目を使う。
+    UTF-8 (BOM 付きも可) で読めなければ Shift_JIS として読む。
+    """
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = data.decode("cp932")
+    rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+    column = 0
+    header = [cell.strip().lower() for cell in rows[0]]
+    for name in NAME_HEADERS:
+        if name in header:
+            column = header.index(name)
+            rows = rows[1:]
+            break
+    return [row[column].strip() if column < len(row) else "" for row in rows]
+
+
+def validate_roster(names: List[str], min_players: int = 0, max_players: Optional[int] = None) -> List[str]:
+    """名簿の問題 (人数・空の名前・重複) を1回の走査で調べ、エラーメッセージのリストを返す (問題がなければ空)"""
+    empty = []
+    seen = {}
+    duplicates = {}
+    for position, name in enumerate(names, start=1):
+        if not name:
+            empty.append(position)
+        elif name in seen:
+            duplicates.setdefault(name, [seen[name]]).append(position)
+        else:
+            seen[name] = position
+    errors = []
+    if len(names) < min_players:
+        errors.append(f"プレイヤーは {min_players} 人以上必要です (現在 {len(names)} 人)。")
+    if max_players is not None and len(names) > max_players:
+        errors.append(f"プレイヤーは {max_players} 人までです (現在 {len(names)} 人)。")
+    if empty:
+        errors.append(f"名前が空です: {', '.join(f'{position} 人目' for position in empty)}")
+    for name, positions in duplicates.items():
+        errors.append(f"名前が重複しています: {name} ({', '.join(f'{position} 人目' for position in positions)})")
+    return errors
@@ -0,0 +1,169 @@
+import random
+import threading
+from typing import List, Dict, Any, Optional
+from collections import Counter
+
+from .game_manager import GameManager, TARGETED_ACTION_TYPES
+from .bot import bot_dict
+
+# 勝敗が付かない場合に打ち切るターン数
+MAX_TURNS = 50
+
+
+def run_bot_game(player_names: List[str], roles: List[str], strategies: List[str],
+                 seed: int, max_turns: int = MAX_TURNS, record_log: bool = False,
+                 record_events: bool = False) -> Dict[str, Any]:
+    """
+    ボットのみで1ゲームを最後まで進行し、結果を辞書で返す。
+    審判は GameManager が行い、UI と同じ順序 (夜 -> 勝利判定 -> 昼 -> 勝利判定) で進める。
+
+    Args:
+        player_names: 座席順のプレイヤー名
+        roles: 役職名のリスト (GameManager.assign_roles でシャッフルされる)
+        strategies: 座席ごとのボット戦略名 (bot_dict のキー)
+        seed: 乱数シード。同じ引数とシードなら同じゲームが再現される
+        record_log: True の場合、フェーズごとの進行記録を "log" に含める (観戦モード用)
+        record_events: True の場合、GameManager の進行イベントを "events" に含める
+
+    Returns:
+        {
+            "seed": シード,
+            "victory_team": 勝利陣営 (打ち切り時は None),
+            "turns": 終了時のターン数,
+            "players": [{"name", "role", "team", "strategy", "winner", "alive"}, ...],
+            "log": [{"turn", "phase", "alive", "actions", "votes", "victims", ...}, ...] (record_log 時のみ)
+            "events": [Event, ...] (record_events 時のみ)
+        }
+    """
+    if len(strategies) != len(player_names):
+        raise ValueError("strategies の数がプレイヤー数と一致しません。")
+
+    rng = random.Random(seed)
+    gm = GameManager(list(player_names), rng=rng)
+    gm.assign_roles(list(roles))
+    bots = {player.name: bot_dict[strategy](player, rng) for player, strategy in zip(gm.players, strategies)}
+
+    log: List[Dict[str, Any]] = []
+
+    while gm.turn <= max_turns:
+        # --- 夜フェーズ ---
+        gm.start_night()
+        night_actions: Dict[str, Dict[str, Any]] = {}
+        seer_results: Dict[str, Dict[str, str]] = {}
+        alive_players = gm.get_alive_players()
+        alive_names = [p.name for p in alive_players]
+        for player in alive_players:
+            action_type = gm.get_night_action_type(player)
+            action: Dict[str, Any] = {"type": action_type}
+            if action_type in TARGETED_ACTION_TYPES:
+                options = gm.get_night_target_options(player, alive_players)
+                target = bots[player.name].choose_night_target(gm, options)
+                if target:
+                    action["target"] = target
+                    if action_type == "seer":
+                        seer_result = gm.get_seer_result(player, target)
+                        seer_results[player.name] = {"target": target, "result": seer_result}
+                        bots[player.name].observe_seer_result(target, seer_result)
+            night_actions[player.name] = action
+        night_result = gm.resolve_night_actions(night_actions)
+        victory_info = gm.check_victory()
+        if record_log:
+            log.append({
+                "turn": gm.turn,
+                "phase": "night",
+                "alive": alive_names,
+                "actions": night_actions,
+                "seer_results": seer_results,
+                "victims": night_result["victims"],
+                "immoral_suicides": night_result["immoral_suicides"],
+                "victory": victory_info,
+            })
+        gm.start_day()
+        if victory_info:
+            break
+
+        # --- 昼フェーズ ---
+        alive_names = [p.name for p in gm.get_alive_players()]
+        votes: Dict[str, str] = {}
+        for voter_name in alive_names:
+            target = bots[voter_name].choose_vote(gm, alive_names, votes)
+            if target:
+                votes[voter_name] = target
+                gm.record_vote(voter_name, target)
+        execution_result = gm.execute_day_vote(Counter(votes.values()))
+        victory_info = gm.check_victory()
+        if record_log:
+            log.append({
+                "turn": gm.turn,
+                "phase": "day",
+                "alive": alive_names,
+                "votes": votes,
+                "executed": execution_result["executed"],
+                "immoral_suicides": execution_result["immoral_suicides"],
+                "retaliation_victim": execution_result.get("retaliation_victim"),
+                "victory": victory_info,
+            })
+        if victory_info:
+            break
+
+    result = {
+        "seed": seed,
+        "victory_team": gm.victory_team,
+        "turns": gm.turn,
+        "players": [
+            {
+                "name": player.name,
+                "role": player.role.name,
+                "team": player.role.team,
+                "strategy": strategy,
+                "winner": gm.victory_team is not None and player.role.team == gm.victory_team,
+                "alive": player.alive,
+            }
+            for player, strategy in zip(gm.players, strategies)
+        ],
+    }
+    if record_log:
+        result["log"] = log
+    if record_events:
+        result["events"] = list(gm.events)
+    return result
+
+
+class BackgroundGame:
+    """
+    run_bot_game をバックグラウンドのスレッドで実行し、結果 (進行記録付き) を保持する。
+    観戦モードでは、画面の再描画のたびにゲームを計算し直さずにこの結果をページ送りする。
+    admission (AdmissionController) を渡すと、専用のスレッドを立てずにその待ち行列で実行する
+    (混雑していれば Overloaded)。
+    """
+    def __init__(self, player_names: List[str], roles: List[str], strategies: List[str], seed: int,
+                 admission=None):
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+        args = (list(player_names), list(roles), list(strategies), seed)
+        self.future = None
+        if admission is not None:
+            self.future = admission.submit(self._run, *args)
+        else:
+            self._thread = threading.Thread(target=self._run, args=args, daemon=True)
+            self._thread.start()
+
+    def _run(self, player_names, roles, strategies, seed):
+        try:
+            self.result = run_bot_game(player_names, roles, strategies, seed, record_log=True)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self) -> bool:
+        """待ち行列でまだ始まっていなければ取り消す。取り消せたら True"""
+        return self.future is not None and self.future.cancel()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """完了を待つ。timeout 秒以内に完了すれば True"""
+        return self._done.wait(timeout)
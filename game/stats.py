@@ -0,0 +1,203 @@
+import re
+import json
+import sqlite3
+from typing import List, Dict, Any, Optional, Tuple
+
+# 集計テーブル (結果データベースの中に作る)。
+# ゲームを保存するたびに同じトランザクションで加算するため、問い合わせ時にゲームを走査し直す必要はない。
+# 月 (YYYY-MM)・プレイヤー数ごとに1行で、期間や人数の条件は小さな集計テーブルの合計で答える。
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats_games (
+    month        TEXT NOT NULL,
+    player_count INTEGER NOT NULL,
+    games        INTEGER NOT NULL,
+    turns        INTEGER NOT NULL,
+    PRIMARY KEY (month, player_count)
+);
+CREATE TABLE IF NOT EXISTS stats_teams (
+    month        TEXT NOT NULL,
+    player_count INTEGER NOT NULL,
+    team         TEXT NOT NULL,
+    games        INTEGER NOT NULL,
+    wins         INTEGER NOT NULL,
+    PRIMARY KEY (month, player_count, team)
+);
+CREATE TABLE IF NOT EXISTS stats_roles (
+    month        TEXT NOT NULL,
+    player_count INTEGER NOT NULL,
+    role         TEXT NOT NULL,
+    team         TEXT NOT NULL,
+    players      INTEGER NOT NULL,
+    wins         INTEGER NOT NULL,
+    survived     INTEGER NOT NULL,
+    PRIMARY KEY (month, player_count, role)
+);
+CREATE TABLE IF NOT EXISTS stats_deaths (
+    month        TEXT NOT NULL,
+    player_count INTEGER NOT NULL,
+    role         TEXT NOT NULL,
+    reason       TEXT NOT NULL,
+    deaths       INTEGER NOT NULL,
+    PRIMARY KEY (month, player_count, role, reason)
+)
+"""
+
+STATS_TABLES = ("stats_games", "stats_teams", "stats_roles", "stats_deaths")
+
+# get_game_results の「生死」 (例: "2日目 襲撃により死亡") から死因を取り出す
+_DEATH_PATTERN = re.compile(r"^\S+ (.+)により死亡$")
+SURVIVED_STATUS = "最終日生存"
+UNKNOWN_REASON = "不明"
+
+
+def death_reason(status: str) -> Optional[str]:
+    """「生死」の文字列から死因 (襲撃・処刑など) を返す。生存していれば None"""
+    if status == SURVIVED_STATUS:
+        return None
+    match = _DEATH_PATTERN.match(status)
+    return match.group(1) if match else UNKNOWN_REASON
+
+
+def create_stats_schema(conn: sqlite3.Connection):
+    """
+    集計テーブルを作る (ResultsStore がトランザクションの中で呼ぶ)。
+    集計テーブルがなかった既存のデータベースでは、保存済みのゲームから作り直す。
+    """
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for statement in STATS_SCHEMA.strip().split(";"):
+        if statement.strip():
+            conn.execute(statement)
+    if not set(STATS_TABLES) <= existing:
+        rebuild_stats(conn)
+
+
+def rebuild_stats(conn: sqlite3.Connection):
+    """集計テーブルを保存済みの全ゲームから作り直す (トランザクションの中で呼ぶこと)"""
+    for table in STATS_TABLES:
+        conn.execute(f"DELETE FROM {table}")
+    for row in conn.execute("SELECT played_at, winner, player_count, turns, results FROM games").fetchall():
+        add_game_stats(conn, {
+            "played_at": row[0], "winner": row[1], "player_count": row[2], "turns": row[3],
+            "results": json.loads(row[4]),
+        })
+
+
+def add_game_stats(conn: sqlite3.Connection, record: Dict[str, Any]):
+    """1ゲームぶんを集計テーブルに加算する (ゲームを追加したのと同じトランザクションの中で呼ぶこと)"""
+    month = record["played_at"][:7]
+    player_count = record["player_count"]
+    winner = record.get("winner")
+    conn.execute(
+        "INSERT INTO stats_games (month, player_count, games, turns) VALUES (?, ?, 1, ?) "
+        "ON CONFLICT (month, player_count) DO UPDATE SET games = games + 1, turns = turns + excluded.turns",
+        (month, player_count, record.get("turns") or 0),
+    )
+    teams = {row["陣営"] for row in record["results"]}
+    conn.executemany(
+        "INSERT INTO stats_teams (month, player_count, team, games, wins) VALUES (?, ?, ?, 1, ?) "
+        "ON CONFLICT (month, player_count, team) DO UPDATE SET games = games + 1, wins = wins + excluded.wins",
+        [(month, player_count, team, 1 if team == winner else 0) for team in sorted(teams)],
+    )
+    conn.executemany(
+        "INSERT INTO stats_roles (month, player_count, role, team, players, wins, survived) "
+        "VALUES (?, ?, ?, ?, 1, ?, ?) "
+        "ON CONFLICT (month, player_count, role) DO UPDATE SET players = players + 1, wins = wins + excluded.wins, "
+        "survived = survived + excluded.survived",
+        [(month, player_count, row["役職"], row["陣営"], 1 if row["勝利"] else 0,
+          1 if death_reason(row["生死"]) is None else 0) for row in record["results"]],
+    )
+    deaths = [(month, player_count, row["役職"], death_reason(row["生死"])) for row in record["results"]]
+    conn.executemany(
+        "INSERT INTO stats_deaths (month, player_count, role, reason, deaths) VALUES (?, ?, ?, ?, 1) "
+        "ON CONFLICT (month, player_count, role, reason) DO UPDATE SET deaths = deaths + 1",
+        [death for death in deaths if death[3] is not None],
+    )
+
+
+def _where(player_count: Optional[int], since: Optional[str], until: Optional[str],
+           **equals: Optional[str]) -> Tuple[str, list]:
+    """共通の絞り込み条件 (人数・期間 (YYYY-MM、両端を含む)・役職など) の WHERE 句"""
+    clauses, params = [], []
+    if player_count is not None:
+        clauses.append("player_count = ?")
+        params.append(player_count)
+    if since is not None:
+        clauses.append("month >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("month <= ?")
+        params.append(until)
+    for column, value in equals.items():
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _rate(wins: int, games: int) -> float:
+    return wins / games if games else 0.0
+
+
+class GameStats:
+    """
+    集計テーブルに対する統計の問い合わせ。
+    どの問い合わせも (月 x 人数 x 役職) 程度の行数の集計テーブルを合計するだけなので、保存済みのゲーム数によらず数ミリ秒で答える。
+    期間は "YYYY-MM" の文字列 (両端を含む) で指定する。
+    """
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def summary(self, player_count: Optional[int] = None, since: Optional[str] = None,
+                until: Optional[str] = None) -> Dict[str, Any]:
+        """ゲーム数と平均ターン数"""
+        where, params = _where(player_count, since, until)
+        games, turns = self.conn.execute(
+            f"SELECT COALESCE(SUM(games), 0), COALESCE(SUM(turns), 0) FROM stats_games{where}", params).fetchone()
+        return {"games": games, "avg_turns": turns / games if games else 0.0}
+
+    def team_stats(self, player_count: Optional[int] = None, since: Optional[str] = None,
+                   until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """陣営ごとの参加ゲーム数・勝利数・勝率 (参加ゲーム数の多い順)"""
+        where, params = _where(player_count, since, until)
+        rows = self.conn.execute(
+            f"SELECT team, SUM(games), SUM(wins) FROM stats_teams{where} GROUP BY team ORDER BY SUM(games) DESC, team",
+            params)
+        return [{"team": team, "games": games, "wins": wins, "win_rate": _rate(wins, games)}
+                for team, games, wins in rows]
+
+    def role_stats(self, player_count: Optional[int] = None, since: Optional[str] = None,
+                   until: Optional[str] = None, role: Optional[str] = None) -> List[Dict[str, Any]]:
+        """役職ごとの延べ人数・勝利数・勝率・生存率 (延べ人数の多い順)"""
+        where, params = _where(player_count, since, until, role=role)
+        rows = self.conn.execute(
+            f"SELECT role, team, SUM(players), SUM(wins), SUM(survived) FROM stats_roles{where} "
+            "GROUP BY role ORDER BY SUM(players) DESC, role", params)
+        return [{"role": role_name, "team": team, "players": players, "wins": wins,
+                 "win_rate": _rate(wins, players), "survival_rate": _rate(survived, players)}
+                for role_name, team, players, wins, survived in rows]
+
+    def role_win_rate(self, role: str, player_count: Optional[int] = None, since: Optional[str] = None,
+                      until: Optional[str] = None) -> Dict[str, Any]:
+        """1つの役職の勝率 (例: 9人戦の先月の妖狐)。該当がなければ players = 0"""
+        rows = self.role_stats(player_count, since, until, role=role)
+        if rows:
+            return rows[0]
+        return {"role": role, "team": None, "players": 0, "wins": 0, "win_rate": 0.0, "survival_rate": 0.0}
+
+    def death_reasons(self, role: Optional[str] = None, player_count: Optional[int] = None,
+                      since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """死因ごとの死亡数 (多い順)。role を指定するとその役職のみ (例: 騎士の最も多い死因)"""
+        where, params = _where(player_count, since, until, role=role)
+        rows = self.conn.execute(
+            f"SELECT reason, SUM(deaths) FROM stats_deaths{where} GROUP BY reason ORDER BY SUM(deaths) DESC, reason",
+            params)
+        return [{"reason": reason, "deaths": deaths} for reason, deaths in rows]
+
+    def months(self) -> List[str]:
+        """集計のある月 (古い順)"""
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT month FROM stats_games ORDER BY month")]
+
+    def player_counts(self) -> List[int]:
+        """集計のあるプレイヤー数 (少ない順)"""
+        return [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT player_count FROM stats_games ORDER BY player_count")]
@@ -0,0 +1,47 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional
+
+
+class VoteTally:
+    """
+    昼の投票と得票数の集計 (1日分。画面の状態に1つだけ持ち、取り消しの記録には含めない)。
+    得票数はその場で書き換え、全員分を数え直さずに変わった票の分だけ更新する。
+    投票の辞書は書き換えずに新しい辞書で置き換える (取り消しの記録が古い辞書の参照を持つため)。
+    """
+    __slots__ = ("votes", "counts")
+
+    def __init__(self, votes: Optional[Dict[str, str]] = None):
+        self.votes: Dict[str, str] = votes if votes is not None else {}
+        self.counts: Counter = Counter(self.votes.values())
+
+    def __len__(self) -> int:
+        return len(self.votes)
+
+    def apply(self, changes: Mapping[str, str]) -> "VoteTally":
+        """
+        投票 (投票者 → 投票先) を反映し、自分自身を返す。得票数の更新は変わった票の数に比例する。
+        投票の辞書だけは新しい辞書にするため投票者の数に比例する (古い辞書は書き換えない)。
+        """
+        votes = self.votes
+        for voter, target in changes.items():
+            previous = votes.get(voter)
+            if previous == target:
+                continue
+            if previous is not None:
+                self.counts[previous] -= 1
+                if not self.counts[previous]:
+                    del self.counts[previous]
+            self.counts[target] += 1
+        self.votes = {**votes, **changes}
+        return self
+
+    def leaders(self) -> List[str]:
+        """最多得票のプレイヤー (同票なら全員)"""
+        if not self.counts:
+            return []
+        top = max(self.counts.values())
+        return [name for name, count in self.counts.items() if count == top]
+
+    def missing(self, voters: Iterable[str]) -> List[str]:
+        """まだ投票していないプレイヤー"""
+        return [voter for voter in voters if voter not in self.votes]
@@ -0,0 +1,252 @@
+import os
+import json
+import zlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Callable, Set, Tuple
+
+from .simulator import run_bot_game
+from .rating import Rating, update_team_game
+
+
+def _match_seed(base_seed: int, match_id: str) -> int:
+    """試合IDから再現可能なシードを作る (プロセスをまたいでも同じ値になるよう crc32 を使う)"""
+    return zlib.crc32(f"{base_seed}:{match_id}".encode("utf-8"))
+
+
+def _seat_strategies(a: str, b: str, player_count: int, game_index: int) -> List[str]:
+    """2つの戦略を座席に交互に配置する。game_index ごとに開始位置を入れ替える。"""
+    return [a if (seat + game_index) % 2 == 0 else b for seat in range(player_count)]
+
+
+def round_robin_schedule(strategies: List[str], player_count: int, games_per_pair: int,
+                         base_seed: int = 0) -> List[Dict[str, Any]]:
+    """総当たりの対戦表を作成する。戦略の各ペアについて games_per_pair 試合を組む。"""
+    matches = []
+    for a, b in itertools.combinations(strategies, 2):
+        for game_index in range(games_per_pair):
+            match_id = f"rr:{a}:{b}:{game_index}"
+            matches.append({
+                "match_id": match_id,
+                "strategies": _seat_strategies(a, b, player_count, game_index),
+                "seed": _match_seed(base_seed, match_id),
+            })
+    return matches
+
+
+def swiss_pairings(strategies: List[str], ratings: Dict[str, Rating],
+                   played_pairs: Set[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    スイス式のペアリングを作成する。
+    レート順に並べ、まだ対戦していない最も近い相手と組む (奇数の場合は最下位が不戦)。
+    """
+    unpaired = sorted(strategies, key=lambda s: -ratings.get(s, Rating()).mu)
+    pairs = []
+    while len(unpaired) >= 2:
+        a = unpaired.pop(0)
+        partner = next((b for b in unpaired if tuple(sorted((a, b))) not in played_pairs), unpaired[0])
+        unpaired.remove(partner)
+        pairs.append((a, partner))
+    return pairs
+
+
+def _play_match(match: Dict[str, Any], player_names: List[str], roles: List[str]) -> Dict[str, Any]:
+    """ワーカープロセスで1試合を実行する"""
+    return run_bot_game(player_names, roles, match["strategies"], match["seed"])
+
+
+class Tournament:
+    """
+    ボット戦略同士の大会を実行し、戦略別・役職別のレーティングを更新する。
+    - 試合はプロセスプールで並列に実行し、終わった順にレーティングへ反映する
+    - checkpoint_path を指定すると進捗を保存し、再実行時は完了済みの試合を飛ばす
+    """
+    def __init__(self, strategies: List[str], roles: List[str], mode: str = "round_robin",
+                 games_per_pair: int = 10, rounds: int = 3, workers: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None, checkpoint_every: int = 10, base_seed: int = 0):
+        if len(strategies) < 2:
+            raise ValueError("戦略は2つ以上指定してください。")
+        if mode not in ("round_robin", "swiss"):
+            raise ValueError(f"不明な対戦方式です: {mode}")
+        self.strategies = list(strategies)
+        self.roles = list(roles)
+        self.player_names = [f"Bot{i + 1}" for i in range(len(roles))]
+        self.mode = mode
+        self.games_per_pair = games_per_pair
+        self.rounds = rounds
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.base_seed = base_seed
+
+        # 進捗とレーティング
+        self.ratings: Dict[str, Rating] = {}      # 戦略名 -> Rating
+        self.role_ratings: Dict[str, Rating] = {} # "戦略名/役職名" -> Rating
+        self.completed: Set[str] = set()          # 完了済みの試合ID
+        self.undecided_games = 0                  # 打ち切りで勝敗が付かなかった試合数
+        self.swiss_round = 0
+        self.played_pairs: Set[Tuple[str, str]] = set()
+        self.pending_matches: List[Dict[str, Any]] = [] # スイス式で組み合わせ済みの現ラウンド
+        self._unsaved = 0
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self.load_checkpoint()
+
+    # --- 実行 ---
+    def run(self, progress: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, Any]]:
+        """
+        大会を最後まで実行し、戦略別のリーダーボードを返す。
+        progress: (完了試合数, 予定試合数) を受け取るコールバック
+        """
+        if self.mode == "round_robin":
+            schedule = round_robin_schedule(self.strategies, len(self.roles), self.games_per_pair, self.base_seed)
+            self._run_matches(schedule, progress)
+        else:
+            while self.swiss_round < self.rounds:
+                if not self.pending_matches:
+                    self.pending_matches = self._next_swiss_round()
+                    self.save_checkpoint()
+                self._run_matches(self.pending_matches, progress)
+                for match in self.pending_matches:
+                    a, b = sorted(set(match["strategies"]))
+                    self.played_pairs.add((a, b))
+                self.pending_matches = []
+                self.swiss_round += 1
+                self.save_checkpoint()
+        self.save_checkpoint()
+        return self.leaderboard()
+
+    def _next_swiss_round(self) -> List[Dict[str, Any]]:
+        matches = []
+        for a, b in swiss_pairings(self.strategies, self.ratings, self.played_pairs):
+            for game_index in range(self.games_per_pair):
+                match_id = f"sw{self.swiss_round}:{a}:{b}:{game_index}"
+                matches.append({
+                    "match_id": match_id,
+                    "strategies": _seat_strategies(a, b, len(self.roles), game_index),
+                    "seed": _match_seed(self.base_seed, match_id),
+                })
+        return matches
+
+    def _run_matches(self, matches: List[Dict[str, Any]], progress: Optional[Callable[[int, int], None]]):
+        todo = [match for match in matches if match["match_id"] not in self.completed]
+        total = len(matches)
+        done = total - len(todo)
+        if self.workers <= 1:
+            for match in todo:
+                self.record_result(match, _play_match(match, self.player_names, self.roles))
+                done += 1
+                if progress:
+                    progress(done, total)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(_play_match, match, self.player_names, self.roles): match for match in todo}
+            for future in as_completed(futures):
+                self.record_result(futures[future], future.result())
+                done += 1
+                if progress:
+                    progress(done, total)
+
+    def record_result(self, match: Dict[str, Any], result: Dict[str, Any]):
+        """終了した1試合の結果をレーティングに反映する"""
+        if result["victory_team"] is None:
+            self.undecided_games += 1
+        else:
+            players = result["players"]
+            update_team_game(self.ratings, [(p["strategy"], p["team"], p["winner"]) for p in players])
+            update_team_game(self.role_ratings, [(f"{p['strategy']}/{p['role']}", p["team"], p["winner"]) for p in players])
+        self.completed.add(match["match_id"])
+        self._unsaved += 1
+        if self._unsaved >= self.checkpoint_every:
+            self.save_checkpoint()
+
+    # --- 結果 ---
+    def leaderboard(self) -> List[Dict[str, Any]]:
+        """戦略別のリーダーボード (レートの高い順、95% 信頼区間付き)"""
+        return _leaderboard_rows(self.ratings, "戦略")
+
+    def role_leaderboard(self) -> List[Dict[str, Any]]:
+        """戦略×役職別のリーダーボード"""
+        return _leaderboard_rows(self.role_ratings, "戦略/役職")
+
+    # --- チェックポイント ---
+    def save_checkpoint(self):
+        """進捗を JSON に保存する (一時ファイルに書いてから置き換える)"""
+        self._unsaved = 0
+        if not self.checkpoint_path:
+            return
+        state = {
+            "mode": self.mode,
+            "strategies": self.strategies,
+            "roles": self.roles,
+            "base_seed": self.base_seed,
+            "completed": sorted(self.completed),
+            "undecided_games": self.undecided_games,
+            "ratings": {key: r.to_dict() for key, r in self.ratings.items()},
+            "role_ratings": {key: r.to_dict() for key, r in self.role_ratings.items()},
+            "swiss_round": self.swiss_round,
+            "played_pairs": sorted(list(pair) for pair in self.played_pairs),
+            "pending_matches": self.pending_matches,
+        }
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def load_checkpoint(self):
+        """保存された進捗を読み込む"""
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state["strategies"] != self.strategies or state["roles"] != self.roles or state["mode"] != self.mode:
+            raise ValueError("チェックポイントの大会設定が現在の設定と一致しません。")
+        self.completed = set(state["completed"])
+        self.undecided_games = state["undecided_games"]
+        self.ratings = {key: Rating.from_dict(r) for key, r in state["ratings"].items()}
+        self.role_ratings = {key: Rating.from_dict(r) for key, r in state["role_ratings"].items()}
+        self.swiss_round = state["swiss_round"]
+        self.played_pairs = {tuple(pair) for pair in state["played_pairs"]}
+        self.pending_matches = state["pending_matches"]
+
+
+def _leaderboard_rows(ratings: Dict[str, Rating], key_label: str) -> List[Dict[str, Any]]:
+    rows = []
+    for key, rating in sorted(ratings.items(), key=lambda item: -item[1].mu):
+        rows.append({
+            key_label: key,
+            "レート": round(rating.mu, 1),
+            "下限": round(rating.lower(), 1),
+            "上限": round(rating.upper(), 1),
+            "試合数": rating.games,
+            "勝率": round(rating.wins / rating.games, 3) if rating.games else 0.0,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+    import config.settings as settings
+    from .bot import bot_dict
+
+    parser = argparse.ArgumentParser(description="ボット戦略の大会を実行します")
+    parser.add_argument("--strategies", nargs="+", default=list(bot_dict.keys()))
+    parser.add_argument("--mode", choices=["round_robin", "swiss"], default="round_robin")
+    parser.add_argument("--games", type=int, default=20, help="1ペアあたりの試合数")
+    parser.add_argument("--rounds", type=int, default=3, help="スイス式のラウンド数")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    roles = [role for role, count in settings.DEFAULT_ROLE_COUNTS.items() for _ in range(count)]
+    tournament = Tournament(args.strategies, roles, mode=args.mode, games_per_pair=args.games,
+                            rounds=args.rounds, workers=args.workers, checkpoint_path=args.checkpoint,
+                            base_seed=args.seed)
+    leaderboard = tournament.run(progress=lambda done, total: print(f"\r{done}/{total}", end="", flush=True))
+    print()
+    for row in leaderboard:
+        print(row)
+    for row in tournament.role_leaderboard():
+        print(row)
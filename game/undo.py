@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Mapping, Tuple
+
+from .game_manager import GameManager
+
+DEFAULT_UNDO_LIMIT = 200
+
+
+@dataclass(frozen=True)
+class UndoPoint:
+    """
+    取り消しで戻る地点。
+    ゲームの状態は進行イベントの件数と乱数の状態だけで表し (フェーズ内ではイベントは追記されるだけなので、
+    件数まで切り詰めれば元に戻る)、画面の状態は値への参照をそのまま持つ。
+    参照先の辞書は書き換えずに新しい辞書で置き換える約束なので、複製は不要。
+    """
+    label: str
+    event_count: int
+    rng_state: Tuple
+    session: Mapping[str, Any]
+
+
+class UndoStack:
+    """
+    現在のフェーズ内の操作を取り消すための履歴。
+    フェーズ (ターンと夜/昼) が変わると履歴は無効になる。
+    """
+    def __init__(self, limit: int = DEFAULT_UNDO_LIMIT):
+        self.limit = limit
+        self.points: List[UndoPoint] = []
+        self.phase_key: Optional[Tuple[int, Optional[str]]] = None
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def sync_phase(self, gm: GameManager):
+        """フェーズが変わっていれば履歴を消す"""
+        phase_key = (gm.turn, gm.phase)
+        if phase_key != self.phase_key:
+            self.points = []
+            self.phase_key = phase_key
+
+    def push(self, label: str, gm: GameManager, session: Dict[str, Any]):
+        """操作の直前に呼び、現在の状態を戻る地点として記録する"""
+        self.sync_phase(gm)
+        self.points.append(UndoPoint(label, len(gm.events), gm.rng.getstate(), MappingProxyType(dict(session))))
+        if len(self.points) > self.limit:
+            del self.points[0]
+
+    def rollback(self, gm: GameManager, index: int) -> Dict[str, Any]:
+        """
+        points[index] の地点まで戻す。ゲームの状態はその場で戻し、画面の状態を辞書で返す。
+        戻した地点以降の履歴は消える。
+        """
+        point = self.points[index]
+        gm.truncate_events(point.event_count)
+        gm.rng.setstate(point.rng_state)
+        del self.points[index:]
+        return dict(point.session)
+
+    def undo(self, gm: GameManager) -> Optional[Dict[str, Any]]:
+        """直前の操作を取り消す。履歴がなければ None"""
+        if not self.points:
+            return None
+        return self.rollback(gm, len(self.points) - 1)
+
+    def clear(self):
+        self.points = []
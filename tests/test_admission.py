@@ -0,0 +1,101 @@
+# werewolf_streamlit/tests/test_admission.py
+import threading
+
+import pytest
+
+from game.admission import AdmissionController, Overloaded
+
+class FakeCpu:
+    def __init__(self, load: float = 0.0):
+        self.load = load
+
+    def __call__(self):
+        return self.load
+
+@pytest.fixture
+def make_controller():
+    controllers = []
+
+    def make(**kwargs):
+        controller = AdmissionController(**kwargs)
+        controllers.append(controller)
+        return controller
+    yield make
+    for controller in controllers:
+        controller.close()
+
+def test_queue_depth_limit_and_wait_times(make_controller):
+    """キューがいっぱいなら Overloaded になり、待ち時間と順番が分かるか"""
+    controller = make_controller(max_queue=2, workers=1, cpu_probe=FakeCpu())
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    first = controller.submit(blocker)
+    assert started.wait(5)
+    second = controller.submit(lambda: 2)
+    third = controller.submit(lambda: 3)
+    assert controller.queue_position(third) == 2
+    with pytest.raises(Overloaded):
+        controller.submit(lambda: 4)
+    # 順番待ちの処理は取り消せる
+    assert third.cancel()
+    release.set()
+    assert first.result(5) == "done" and second.result(5) == 2
+    stats = controller.stats()
+    assert stats["rejected_jobs"] == 1
+    assert stats["job_wait_p95_ms"] > 0
+
+def test_live_renders_take_priority(make_controller):
+    """描画中のセッションがある間は、バックグラウンドの処理が始まらないか"""
+    controller = make_controller(max_defer=5, cpu_probe=FakeCpu())
+    order = []
+    with controller.live():
+        future = controller.submit(order.append, "job")
+        assert not future.done()
+        order.append("render")
+    future.result(5)
+    assert order == ["render", "job"]
+    assert controller.stats()["live_renders"] == 1
+
+def test_waiting_inside_a_render_is_not_counted(make_controller):
+    """描画の中で待つ間 (idle) はバックグラウンドの処理を止めず、描画時間にも含めないか"""
+    now = [0.0]
+    controller = make_controller(max_defer=5, cpu_probe=FakeCpu(), clock=lambda: now[0])
+    with controller.live():
+        now[0] += 0.01
+        with controller.idle():
+            assert controller.stats()["live"] == 0
+            controller.submit(lambda: None).result(5) # 待たされない
+            now[0] += 2.0
+        assert controller.stats()["live"] == 1
+    assert controller.stats()["render_p95_ms"] == pytest.approx(10)
+
+def test_autoplay_waits_between_renders_are_not_counted(make_controller):
+    """観戦の自動再生のように次のフェーズまで描画の外 (部分的な再実行の間隔) で待てば、描画中に数えず描画時間にも含めないか"""
+    now = [0.0]
+    controller = make_controller(max_defer=5, cpu_probe=FakeCpu(), clock=lambda: now[0])
+    for _ in range(3):
+        with controller.live(): # 1フェーズ進めた後の画面全体の描画
+            now[0] += 0.01
+        assert controller.stats()["live"] == 0
+        controller.submit(lambda: None).result(5) # 待っている間は待たされない
+        now[0] += 1.5 # 再生速度 (秒/フェーズ)
+    stats = controller.stats()
+    assert stats["live_renders"] == 3
+    assert stats["render_p95_ms"] == pytest.approx(10)
+
+def test_new_rooms_wait_then_get_rejected(make_controller):
+    """CPU 使用量がしきい値を超えている間は新しいルームを待たせ、収まらなければ断るか"""
+    cpu = FakeCpu(0.95)
+    controller = make_controller(max_cpu=0.8, room_wait=0.1, cpu_probe=cpu)
+    with pytest.raises(Overloaded):
+        controller.admit_room()
+    cpu.load = 0.1
+    controller.admit_room()
+    stats = controller.stats()
+    assert (stats["rooms_admitted"], stats["rejected_rooms"]) == (1, 1)
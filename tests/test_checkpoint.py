@@ -0,0 +1,66 @@
+# werewolf_streamlit/tests/test_checkpoint.py
+import os
+import random
+from collections import Counter
+
+import pytest
+
+from game.game_manager import GameManager
+from game.checkpoint import CheckpointStore, encode_checkpoint, decode_checkpoint, read_checkpoint_header
+
+PLAYER_NAMES = ["Alice", "Bob", "Charlie", "Dave", "Eve"]
+
+def _game_in_progress() -> GameManager:
+    gm = GameManager(PLAYER_NAMES.copy(), rng=random.Random(7))
+    gm.assign_roles(["人狼", "村人", "村人", "偽占い師", "騎士"])
+    gm.start_night()
+    seer = next(p for p in gm.players if p.role.name == "偽占い師")
+    wolf = next(p for p in gm.players if p.role.name == "人狼")
+    target = next(p for p in gm.players if p.role.name == "村人")
+    gm.get_seer_result(seer, wolf.name)
+    gm.resolve_night_actions({wolf.name: {"type": "attack", "target": target.name}})
+    gm.start_day()
+    gm.record_vote(wolf.name, seer.name)
+    return gm
+
+def test_checkpoint_round_trip():
+    """スナップショットから同じゲーム・同じ乱数の続き・画面の状態が復元されるか"""
+    gm = _game_in_progress()
+    session = {"day_votes": {"Alice": "Bob"}, "execution_processed": False, "action_confirmed_2": True}
+    data = encode_checkpoint(gm, session, "day_phase")
+    restored, header = decode_checkpoint(data)
+    assert header["stage"] == "day_phase"
+    assert header["session"] == session
+    assert restored.game_id == gm.game_id
+    assert restored.events == gm.events
+    assert restored.turn == gm.turn
+    assert restored.get_game_results() == gm.get_game_results()
+    # 乱数の状態も引き継がれ、以降の処刑 (同票時の抽選など) が同じ結果になる
+    votes = Counter({p.name: 1 for p in gm.get_alive_players()})
+    assert restored.execute_day_vote(votes)["executed"] == gm.execute_day_vote(votes)["executed"]
+    assert read_checkpoint_header(data)["players"] == PLAYER_NAMES
+
+def test_store_writes_atomically_in_background(tmp_path):
+    """バックグラウンドで書き込まれ、最新のスナップショットが読めるか。一時ファイルが残らないか"""
+    store = CheckpointStore(str(tmp_path))
+    gm = _game_in_progress()
+    for turn_index in range(5):
+        store.save(gm.game_id, encode_checkpoint(gm, {"current_player_index": turn_index}, "night_phase"))
+    assert store.flush(5)
+    _, header = store.load(gm.game_id)
+    assert header["session"] == {"current_player_index": 4}
+    assert [c["game_id"] for c in store.list_checkpoints()] == [gm.game_id]
+    assert os.listdir(tmp_path) == [gm.game_id + ".ckpt"]
+    store.delete(gm.game_id)
+    assert store.flush(5)
+    assert store.load(gm.game_id) is None
+    assert store.list_checkpoints() == []
+    store.close()
+
+def test_store_rejects_unsafe_game_id(tmp_path):
+    """ファイル名に使えないゲームID (URL から渡される) を拒否するか"""
+    store = CheckpointStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.path("../outside")
+    assert store.header("../outside") is None
+    store.close()
@@ -0,0 +1,56 @@
+# werewolf_streamlit/tests/test_dataset.py
+import numpy as np
+
+from game.bot import Bot
+from game.dataset import generate_games, ShardWriter, build_dataset, load_manifest, iter_shards, iter_batches
+
+ROLES = ["人狼", "人狼", "村人", "村人", "占い師", "騎士", "狂人"]
+
+def test_generate_games():
+    """生成されるゲームの遷移の形状と結果が正しいか"""
+    games = list(generate_games(ROLES, num_games=5, seed=0, num_envs=4))
+    assert len(games) == 5
+    for game in games:
+        rows = len(game["action"])
+        assert game["obs"].shape[0] == game["mask"].shape[0] == rows
+        assert game["mask"][np.arange(rows), game["action"]].all() # 合法手のみ
+        assert set(np.unique(game["outcome"])) <= {-1.0, 0.0, 1.0}
+
+def test_generate_games_tells_seer_results_to_bots(monkeypatch):
+    """シミュレーターと同じく、占い師のボットに占い結果が伝わるか"""
+    observed = []
+    original = Bot.observe_seer_result
+    def spy(self, target_name, result):
+        observed.append((self.player.role.name, result))
+        original(self, target_name, result)
+    monkeypatch.setattr(Bot, "observe_seer_result", spy)
+    list(generate_games(ROLES, num_games=3, seed=0, num_envs=2))
+    assert observed
+    assert all(role == "占い師" and result in ("人狼", "村人") for role, result in observed)
+
+def test_shard_writer_fixed_size(tmp_path):
+    """シャードが固定行数で分割され、端数は最後のシャードになるか"""
+    writer = ShardWriter(str(tmp_path), "shard", shard_size=7, obs_dim=3, num_players=2)
+    game = {
+        "obs": np.ones((10, 3), dtype=np.float32), "mask": np.ones((10, 2), dtype=bool),
+        "action": np.zeros(10, dtype=np.int64), "actor": np.zeros(10, dtype=np.int64),
+        "outcome": np.ones(10, dtype=np.float32),
+    }
+    writer.write_game(game)
+    writer.flush()
+    assert [shard["rows"] for shard in writer.shards] == [7, 3]
+    assert [shard["games"] for shard in writer.shards] == [0, 1]
+    assert writer.shards[0]["win_rate"] == 1.0
+
+def test_build_dataset_and_stream(tmp_path):
+    """複数ワーカーで作成したデータセットをマニフェスト経由で読み戻せるか"""
+    manifest = build_dataset(str(tmp_path), ROLES, num_games=12, workers=2, shard_size=64, num_envs=4)
+    assert manifest["games"] == 12
+    assert load_manifest(str(tmp_path)) == manifest
+    assert all(shard["rows"] <= 64 for shard in manifest["shards"])
+
+    rows = sum(len(shard["action"]) for shard in iter_shards(str(tmp_path)))
+    assert rows == manifest["rows"]
+    batches = list(iter_batches(str(tmp_path), batch_size=50))
+    assert sum(len(batch["action"]) for batch in batches) == manifest["rows"]
+    assert all(batch["obs"].shape == (50, manifest["obs_dim"]) for batch in batches[:-1])
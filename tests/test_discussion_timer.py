@@ -0,0 +1,24 @@
+# werewolf_streamlit/tests/test_discussion_timer.py
+from game.discussion_timer import DiscussionTimer
+
+def test_start_pause_resume_and_expire():
+    """開始・一時停止・再開で残り時間が正しく減り、0 で止まるか"""
+    timer = DiscussionTimer.new(180)
+    assert not timer.running and timer.remaining_at(1000.0) == 180
+    timer = timer.start(1000.0)
+    assert timer.running and timer.remaining_at(1030.0) == 150
+    assert timer.start(1010.0) is timer # 動いている間の開始は何もしない
+    timer = timer.pause(1030.0)
+    assert not timer.running and timer.remaining_at(5000.0) == 150
+    timer = timer.start(2000.0)
+    assert timer.remaining_at(2200.0) == 0
+    expired = timer.pause(2200.0)
+    assert expired.start(2300.0) is expired # 時間切れなら開始できない
+    assert expired.reset(60) == DiscussionTimer.new(60)
+    assert expired.reset().remaining == 180
+
+def test_round_trips_through_dict():
+    """画面の状態 (チェックポイント) に保存した形式から、同じタイマーに戻せるか"""
+    timer = DiscussionTimer.new(120).start(1000.0)
+    assert DiscussionTimer.from_dict(timer.to_dict()) == timer
+    assert DiscussionTimer.from_dict(timer.pause(1010.0).to_dict()).remaining == 110
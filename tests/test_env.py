@@ -0,0 +1,80 @@
+# werewolf_streamlit/tests/test_env.py
+import numpy as np
+import pytest
+
+from game.env import VectorEnv, ROLE_NAMES, PHASE_NIGHT
+
+ROLES = ["人狼", "人狼", "村人", "村人", "占い師", "騎士", "狂人"]
+
+def _random_legal_actions(mask, rng):
+    scores = rng.random(mask.shape)
+    scores[~mask] = -1
+    return scores.argmax(axis=1)
+
+def test_reset_shapes_and_first_actor():
+    """reset で観測とマスクの形状が正しく、初日の夜は占い師が行動するか"""
+    env = VectorEnv(4, ROLES, seed=0)
+    obs, mask = env.reset()
+    assert obs.shape == (4, env.obs_dim)
+    assert mask.shape == (4, len(ROLES))
+    for k in range(4):
+        gm = env._slots[k].gm
+        actor = gm.players[env.actor[k]]
+        assert actor.role.name == "占い師" # 初日の夜に対象を選ぶのは占い師だけ
+        assert obs[k, env.actor[k]] == 1.0 # 自分の座席
+        assert obs[k, env._role_off + ROLE_NAMES.index("占い師")] == 1.0
+        assert obs[k, env._phase_off + PHASE_NIGHT] == 1.0
+
+def test_mask_matches_night_target_rules():
+    """夜の合法手マスクが GameManager の対象ルールと一致するか"""
+    env = VectorEnv(8, ROLES, seed=1)
+    _, mask = env.reset()
+    for k in range(8):
+        gm = env._slots[k].gm
+        actor = gm.players[env.actor[k]]
+        expected = {env.name_to_seat[name] for name in gm.get_night_target_options(actor)}
+        assert set(np.flatnonzero(mask[k])) == expected
+
+def test_wolf_observes_partner():
+    """人狼の観測には仲間の人狼が含まれる"""
+    env = VectorEnv(1, ["人狼", "人狼", "村人", "村人", "村人"], seed=3)
+    env.reset()
+    rng = np.random.default_rng(0)
+    # 2日目の夜まで進めて人狼が actor になるのを待つ
+    for _ in range(50):
+        gm = env._slots[0].gm
+        actor = gm.players[env.actor[0]]
+        if actor.role.name == "人狼" and env._slots[0].phase == PHASE_NIGHT:
+            wolves = [p.id for p in gm.players if p.role.name == "人狼"]
+            known = env.obs[0, env._private_off:env._private_off + len(gm.players)]
+            assert set(np.flatnonzero(known)) == set(wolves)
+            return
+        env.step(_random_legal_actions(env.mask, rng))
+    pytest.fail("人狼の行動番になりませんでした")
+
+def test_step_rejects_illegal_action():
+    """合法でない行動は ValueError"""
+    env = VectorEnv(2, ROLES, seed=0)
+    _, mask = env.reset()
+    actions = _random_legal_actions(mask, np.random.default_rng(0))
+    actions[1] = env.actor[1] # 占い師は自分を占えない
+    with pytest.raises(ValueError):
+        env.step(actions)
+
+def test_episodes_finish_with_rewards_in_preallocated_buffers():
+    """ゲームが終了すると報酬が入り、バッファは再確保されないか"""
+    env = VectorEnv(16, ROLES, seed=5)
+    obs, mask = env.reset()
+    buffers = (obs, mask, env.rewards, env.dones)
+    rng = np.random.default_rng(5)
+    finished = 0
+    for _ in range(300):
+        result = env.step(_random_legal_actions(mask, rng))
+        assert all(a is b for a, b in zip(result, buffers))
+        _, _, rewards, dones = result
+        for k in np.flatnonzero(dones):
+            finished += 1
+            assert set(np.unique(rewards[k])) <= {-1.0, 1.0}
+            assert (rewards[k] == 1.0).any()
+        assert not rewards[~dones].any()
+    assert finished > 0
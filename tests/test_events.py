@@ -0,0 +1,99 @@
+# werewolf_streamlit/tests/test_events.py
+import random
+from collections import Counter
+
+import pytest
+
+from game.game_manager import GameManager, TARGETED_ACTION_TYPES
+from game.events import (RolesAssigned, PhaseStarted, VoteCast, PlayerKilled, GameEnded, SeerResultShown,
+                         fold_events, event_to_dict, event_from_dict)
+
+PLAYER_NAMES = ["Alice", "Bob", "Charlie", "Dave", "Eve", "Frank", "Grace"]
+ROLES = ["人狼", "人狼", "占い師", "騎士", "猫又", "妖狐", "背徳者"]
+
+def _play_random_game(seed: int) -> GameManager:
+    """GameManager の API だけで1ゲームをランダムに最後まで進める"""
+    rng = random.Random(seed)
+    gm = GameManager(PLAYER_NAMES.copy(), rng=rng)
+    gm.assign_roles(ROLES.copy())
+    while gm.turn <= 30:
+        gm.start_night()
+        alive_players = gm.get_alive_players()
+        actions = {}
+        for player in alive_players:
+            action = {"type": gm.get_night_action_type(player)}
+            options = gm.get_night_target_options(player, alive_players)
+            if action["type"] in TARGETED_ACTION_TYPES and options:
+                action["target"] = rng.choice(options)
+                if action["type"] == "seer":
+                    gm.get_seer_result(player, action["target"])
+            actions[player.name] = action
+        gm.resolve_night_actions(actions)
+        victory = gm.check_victory()
+        gm.start_day()
+        if victory:
+            break
+        alive_names = [p.name for p in gm.get_alive_players()]
+        for voter in alive_names:
+            gm.record_vote(voter, rng.choice(alive_names))
+        votes = {e.voter: e.target for e in gm.events if isinstance(e, VoteCast) and e.turn == gm.turn}
+        gm.execute_day_vote(Counter(votes.values()))
+        if gm.check_victory():
+            break
+    return gm
+
+def _snapshot(gm: GameManager):
+    return {
+        "roles": [(p.name, p.role.name) for p in gm.players],
+        "alive": [p.alive for p in gm.players],
+        "death_info": [p.death_info for p in gm.players],
+        "turn": gm.turn,
+        "phase": gm.phase,
+        "last_night_victims": gm.last_night_victim_name_list,
+        "last_executed": gm.last_executed_name,
+        "victory_team": gm.victory_team,
+        "results": gm.get_game_results(),
+    }
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fold_rebuilds_game_manager(seed):
+    """イベント列だけから、元のゲームと同じ状態が再構成できるか"""
+    gm = _play_random_game(seed)
+    rebuilt = GameManager.from_events(gm.events)
+    assert _snapshot(rebuilt) == _snapshot(gm)
+
+def test_events_record_kills_and_end():
+    """死亡・勝敗がイベントに記録され、勝敗は1回だけ記録されるか"""
+    gm = GameManager(["Alice", "Bob", "Charlie"])
+    gm.assign_roles(["人狼", "村人", "占い師"])
+    gm.start_night()
+    gm.start_day()
+    wolf = next(p for p in gm.players if p.role.name == "人狼")
+    gm.record_vote("Alice", wolf.name)
+    gm.execute_day_vote(Counter({wolf.name: 1}))
+    gm.check_victory()
+    gm.check_victory()
+    assert isinstance(gm.events[0], RolesAssigned)
+    assert gm.events[1:3] == [PhaseStarted(1, "night"), PhaseStarted(2, "day")]
+    assert PlayerKilled(2, wolf.name, "execute") in gm.events
+    assert [e for e in gm.events if isinstance(e, GameEnded)][0].team == "村人"
+    assert sum(isinstance(e, GameEnded) for e in gm.events) == 1
+    state = fold_events(gm.events)
+    assert state.votes == {2: {"Alice": wolf.name}}
+    assert state.last_executed == wolf.name
+
+def test_seer_result_is_recorded_once_per_night():
+    """偽占い師の結果は同じ夜に何度問い合わせても変わらないか"""
+    gm = GameManager(["Alice", "Bob", "Charlie"], rng=random.Random(0))
+    gm.assign_roles(["偽占い師", "村人", "人狼"])
+    seer = next(p for p in gm.players if p.role.name == "偽占い師")
+    target = next(p for p in gm.players if p is not seer)
+    gm.start_night()
+    first = gm.get_seer_result(seer, target.name)
+    assert all(gm.get_seer_result(seer, target.name) == first for _ in range(20))
+    assert sum(isinstance(e, SeerResultShown) for e in gm.events) == 1
+
+def test_event_dict_round_trip():
+    """辞書 (JSON) との相互変換でイベントが変わらないか"""
+    gm = _play_random_game(3)
+    assert [event_from_dict(event_to_dict(e)) for e in gm.events] == gm.events
@@ -674,4 +674,54 @@ def test_get_game_results_with_nekomata(game_manager_with_nekomata):
     assert result_wolf["生死"] == "1日目 道連れにより死亡" # ★ 道連れ死を確認
     assert result_villager["生死"] == "2日目 処刑により死亡"
     assert result_knight["生死"] == "最終日生存"
-    assert result_knight["勝利"] == "🏆" 
\ No newline at end of file
+    assert result_knight["勝利"] == "🏆" 
+
+# --- 夜アクションの対象ルール ---
+
+def test_night_target_options():
+    """夜アクションの対象ルールが役職ごとに正しいか"""
+    gm = GameManager(["Alice", "Bob", "Charlie", "Dave"])
+    gm.assign_roles(["人狼", "占い師", "騎士", "村人"])
+    wolf = next(p for p in gm.players if p.role.name == "人狼")
+    seer = next(p for p in gm.players if p.role.name == "占い師")
+    knight = next(p for p in gm.players if p.role.name == "騎士")
+    villager = next(p for p in gm.players if p.role.name == "村人")
+
+    gm.turn = 1
+    assert gm.get_night_action_type(wolf) == "none" # 初日は襲撃なし
+    assert gm.get_night_action_type(seer) == "seer"
+    assert gm.get_night_target_options(seer) == [p.name for p in gm.players if p is not seer]
+
+    gm.turn = 2
+    assert gm.get_night_action_type(wolf) == "attack"
+    assert wolf.name not in gm.get_night_target_options(wolf)
+    assert gm.get_night_action_type(knight) == "guard"
+    assert knight.name not in gm.get_night_target_options(knight)
+    assert gm.get_night_action_type(villager) == "none"
+    assert gm.get_night_target_options(villager) == []
+
+# --- フェーズごとの表示用データ ---
+
+def test_phase_view_is_reused_until_a_kill():
+    """表示用データはフェーズの間使い回し、死亡が出るかフェーズが変わると作り直される"""
+    gm = GameManager(["Alice", "Bob", "Charlie", "Dave"])
+    gm.assign_roles(["人狼", "偽占い師", "騎士", "村人"])
+    gm.start_night()
+    view = gm.phase_view()
+    assert gm.phase_view() is view
+    fake_seer = next(p for p in gm.players if p.role.name == "偽占い師")
+    assert view.display_roles[fake_seer.name] == "占い師"
+    assert view.night_targets[fake_seer.name] == tuple(gm.get_night_target_options(fake_seer))
+    assert view.alive_summary == "4 人: Alice, Bob, Charlie, Dave"
+    with pytest.raises(TypeError):
+        view.night_targets["Alice"] = () # 書き換えられない
+
+    gm.start_day()
+    day_view = gm.phase_view()
+    assert day_view is not view and day_view.turn == 2
+    villager = next(p for p in gm.players if p.role.name == "村人")
+    gm.execute_day_vote(Counter({villager.name: 1}))
+    after_kill = gm.phase_view()
+    assert after_kill is not day_view
+    assert villager.name not in after_kill.alive_names
+    assert after_kill.player(villager.name) is None
@@ -0,0 +1,86 @@
+# werewolf_streamlit/tests/test_game_server.py
+import threading
+
+import pytest
+
+from game.game_server import GameServer, PHASE_NIGHT, PHASE_VOTE, STATE_OPEN, STATE_RESOLVED, STATE_ERROR
+
+PLAYER_NAMES = ["Alice", "Bob", "Charlie", "Dave", "Eve"]
+
+@pytest.fixture
+def server():
+    server = GameServer()
+    yield server
+    server.close()
+
+def test_concurrent_submissions_resolve_once(server):
+    """各端末から同時に提出しても、最後の提出がそろった時点で1回だけ解決されるか"""
+    calls = []
+    done = threading.Event()
+
+    def on_complete(submissions):
+        calls.append(submissions)
+        done.set()
+
+    server.open_phase("ROOM1", PHASE_NIGHT, 1, PLAYER_NAMES, on_complete=on_complete).result(5)
+    start = threading.Barrier(len(PLAYER_NAMES))
+
+    def submit(name):
+        start.wait()
+        server.submit("ROOM1", PHASE_NIGHT, 1, name, {"type": "none"}).result(5)
+
+    threads = [threading.Thread(target=submit, args=(name,)) for name in PLAYER_NAMES]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert done.wait(5)
+    status = server.status("ROOM1")
+    while status["state"] != STATE_RESOLVED:
+        status = server.wait_for_change("ROOM1", status["version"], timeout=5).result(10)
+    assert calls == [{name: {"type": "none"} for name in PLAYER_NAMES}]
+    assert status["state"] == STATE_RESOLVED
+    assert status["submitted"] == tuple(sorted(PLAYER_NAMES))
+
+def test_submit_is_validated(server):
+    """別のフェーズ・対象外のプレイヤー・締め切り後の提出は受け付けないか"""
+    server.open_phase("ROOM1", PHASE_VOTE, 2, ["Alice", "Bob"]).result(5)
+    with pytest.raises(ValueError):
+        server.submit("ROOM1", PHASE_NIGHT, 2, "Alice", {"type": "none"}).result(5)
+    with pytest.raises(ValueError):
+        server.submit("ROOM1", PHASE_VOTE, 2, "Eve", "Alice").result(5)
+    # 解決前なら投票し直せる
+    server.submit("ROOM1", PHASE_VOTE, 2, "Alice", "Bob").result(5)
+    status = server.submit("ROOM1", PHASE_VOTE, 2, "Alice", "Alice").result(5)
+    assert (status["state"], status["submitted"]) == (STATE_OPEN, ("Alice",))
+    server.submit("ROOM1", PHASE_VOTE, 2, "Bob", "Alice").result(5)
+    with pytest.raises(ValueError):
+        server.submit("ROOM1", PHASE_VOTE, 2, "Bob", "Bob").result(5)
+
+def test_open_phase_is_idempotent_and_takes_over_submissions(server):
+    """同じフェーズを開き直しても提出は消えず、引き継いだ提出で全員そろえば解決されるか"""
+    resolved = threading.Event()
+    server.open_phase("ROOM1", PHASE_NIGHT, 1, ["Alice", "Bob"]).result(5)
+    server.submit("ROOM1", PHASE_NIGHT, 1, "Alice", {"type": "none"}).result(5)
+    status = server.open_phase("ROOM1", PHASE_NIGHT, 1, ["Alice", "Bob"]).result(5)
+    assert status["submitted"] == ("Alice",)
+
+    # 再起動後: 画面の状態に残っていた提出を引き継ぐ
+    restarted = GameServer()
+    try:
+        restarted.open_phase("ROOM1", PHASE_NIGHT, 1, ["Alice", "Bob"],
+                             submitted={"Alice": {"type": "none"}, "Bob": {"type": "none"}},
+                             on_complete=lambda submissions: resolved.set()).result(5)
+        assert resolved.wait(5)
+    finally:
+        restarted.close()
+
+def test_failed_resolution_is_reported(server):
+    def on_complete(submissions):
+        raise RuntimeError("boom")
+
+    server.open_phase("ROOM1", PHASE_VOTE, 1, ["Alice"], on_complete=on_complete).result(5)
+    status = server.submit("ROOM1", PHASE_VOTE, 1, "Alice", "Alice").result(5)
+    while status["state"] != STATE_ERROR:
+        status = server.wait_for_change("ROOM1", status["version"], timeout=5).result(10)
+    assert status["error"] == "boom"
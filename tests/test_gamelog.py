@@ -0,0 +1,71 @@
+# werewolf_streamlit/tests/test_gamelog.py
+import pytest
+
+from game.events import RolesAssigned, PhaseStarted, GameEnded, PlayerKilled
+from game.gamelog import (GameLogWriter, GameLogReader, encode_game, decode_game, write_varint, read_varint,
+                          index_path_for)
+from game.simulator import run_bot_game
+
+PLAYER_NAMES = ["Alice", "Bob", "Charlie", "Dave", "Eve", "Frank", "Grace"]
+ROLES = ["人狼", "人狼", "村人", "偽占い師", "占い師", "騎士", "猫又"]
+
+def _games(count: int, offset: int = 0):
+    for seed in range(offset, offset + count):
+        result = run_bot_game(PLAYER_NAMES, ROLES, ["team_aware"] * len(PLAYER_NAMES), seed=seed, record_events=True)
+        yield f"game-{seed}", result["events"], result
+
+def test_varint_round_trip():
+    """可変長整数が往復で変わらないか"""
+    for value in [0, 1, 127, 128, 300, 2 ** 32, 2 ** 63]:
+        buf = bytearray()
+        write_varint(buf, value)
+        assert read_varint(buf, 0) == (value, len(buf))
+
+def test_encode_round_trip_with_unknown_values():
+    """符号表にない値 (新しい役職など) も文字列として往復できるか"""
+    events = [
+        RolesAssigned(("Alice", "Bob"), ("人狼", "新しい役職")),
+        PhaseStarted(1, "night"),
+        PlayerKilled(1, "Bob", "attack"),
+        GameEnded("人狼", "任意のメッセージ"),
+    ]
+    assert decode_game(encode_game("g1", events)) == ("g1", events)
+
+@pytest.mark.parametrize("compression", ["zlib", "lzma"])
+def test_write_and_random_access(tmp_path, compression):
+    """書き込んだゲームを任意の番号で読み出せ、索引で絞り込めるか"""
+    path = str(tmp_path / "games.wlog")
+    games = list(_games(30))
+    with GameLogWriter(path, block_size=8, compression=compression) as writer:
+        for game_id, events, _ in games:
+            writer.append(game_id, events)
+    with GameLogReader(path) as reader:
+        assert len(reader) == 30
+        for k in [29, 0, 17, 8]:
+            assert reader.read(k) == games[k][:2]
+        wolf_wins = reader.filter(winner="人狼")
+        assert list(wolf_wins) == [k for k, (_, _, result) in enumerate(games) if result["victory_team"] == "人狼"]
+        assert list(reader.filter(player_count=len(PLAYER_NAMES))) == list(range(30))
+        assert list(reader.filter(player_count=5)) == []
+        assert [game_id for game_id, _ in reader.iter_games(wolf_wins)] == [games[k][0] for k in wolf_wins]
+
+def test_append_and_truncated_index(tmp_path):
+    """既存のログへの追記と、書き込み途中で切れた索引からの復旧"""
+    path = str(tmp_path / "games.wlog")
+    first = list(_games(5))
+    with GameLogWriter(path, block_size=4) as writer:
+        for game_id, events, _ in first:
+            writer.append(game_id, events)
+    # 索引の末尾レコードが途中で切れた状態を作る
+    with open(index_path_for(path), "ab") as f:
+        f.write(b"\x00" * 7)
+    with GameLogReader(path) as reader:
+        assert len(reader) == 5
+    second = list(_games(3, offset=5))
+    with GameLogWriter(path, block_size=4) as writer:
+        for game_id, events, _ in second:
+            writer.append(game_id, events)
+    with GameLogReader(path) as reader:
+        assert [game_id for game_id, _ in reader.iter_games()] == [g[0] for g in first + second]
+    with pytest.raises(ValueError):
+        GameLogWriter(path, compression="lzma")
@@ -0,0 +1,72 @@
+# werewolf_streamlit/tests/test_inference.py
+import threading
+import numpy as np
+import pytest
+
+from game.inference import (InferenceService, evaluate_batch, ACTION_INDEX, NUM_FEATURES,
+                            start_default_service, default_service, stop_default_service)
+from game.simulator import run_bot_game
+
+def _features(rows):
+    features = np.zeros((len(rows), NUM_FEATURES))
+    features[:, 0] = 1.0
+    for i, (seer_wolf, seer_human, votes) in enumerate(rows):
+        features[i, 1:4] = (seer_wolf, seer_human, votes)
+    return features
+
+def test_evaluate_batch_scores_by_action():
+    """行動ごとに期待どおりの候補が選ばれるか (1回の呼び出しで複数を評価)"""
+    candidate = _features([(0, 0, 0.2), (1, 0, 0.0), (0, 1, 0.0)]) # 不明 / 人狼判定 / 村人判定
+    features = np.stack([candidate] * 3)
+    mask = np.ones((3, 3), dtype=bool)
+    actions = np.array([ACTION_INDEX["vote"], ACTION_INDEX["guard"], ACTION_INDEX["seer"]])
+    choices = evaluate_batch(features, mask, actions, np.zeros((3, 3)))
+    assert choices.tolist() == [1, 2, 0]
+
+def test_evaluate_batch_respects_mask():
+    """無効な候補は選ばれない"""
+    features = _features([(1, 0, 0.0), (0, 0, 0.0)])[None]
+    mask = np.array([[False, True]])
+    assert evaluate_batch(features, mask, np.array([ACTION_INDEX["vote"]]), np.zeros((1, 2)))[0] == 1
+
+def test_service_batches_concurrent_decisions():
+    """複数スレッドからの意思決定がまとめて評価され、単独評価と同じ結果になるか"""
+    service = InferenceService(max_batch=64, max_wait_ms=20)
+    rng = np.random.default_rng(0)
+    requests = [rng.random((5, NUM_FEATURES)) for _ in range(32)]
+    results = [None] * len(requests)
+
+    def worker(i):
+        results[i] = service.decide(requests[i], "vote")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    service.close()
+
+    for features, result in zip(requests, results):
+        expected = evaluate_batch(features[None], np.ones((1, 5), dtype=bool),
+                                  np.array([ACTION_INDEX["vote"]]), np.zeros((1, 5)))[0]
+        assert result == expected
+    stats = service.stats()
+    assert stats["decisions"] == 32
+    assert stats["batches"] < 32
+    with pytest.raises(RuntimeError):
+        service.submit(requests[0], "vote")
+
+def test_scoring_bot_uses_default_service():
+    """共有サービスの有無でボットのゲーム結果が変わらないか"""
+    names = ["A", "B", "C", "D", "E", "F", "G"]
+    roles = ["人狼", "人狼", "村人", "村人", "占い師", "騎士", "狂人"]
+    local = run_bot_game(names, roles, ["scored"] * 7, seed=4)
+    service = start_default_service(max_wait_ms=1)
+    try:
+        assert default_service() is service
+        shared = run_bot_game(names, roles, ["scored"] * 7, seed=4)
+        assert service.stats()["decisions"] > 0
+    finally:
+        stop_default_service()
+    assert default_service() is None
+    assert shared == local
@@ -0,0 +1,88 @@
+# werewolf_streamlit/tests/test_legacy_import.py
+import os
+import json
+
+from game.results_store import ResultsStore
+from game.legacy_import import LegacyImporter, parse_legacy_file, scan_legacy_files
+
+GAME_A = [
+    {"名前": "Alice", "役職": "人狼", "生死": "2日目 処刑により死亡", "陣営": "人狼", "勝利": ""},
+    {"名前": "Bob", "役職": "村人", "生死": "最終日生存", "陣営": "村人", "勝利": "🏆"},
+]
+GAME_B = [
+    {"名前": "Alice", "役職": "村人", "生死": "1日目 襲撃により死亡", "陣営": "村人", "勝利": ""},
+    {"名前": "Bob", "役職": "人狼", "生死": "最終日生存", "陣営": "人狼", "勝利": "🏆"},
+]
+
+def _write(directory, name, results):
+    path = directory / name
+    path.write_text(json.dumps(results, ensure_ascii=False, indent=4), encoding="utf-8")
+    return path
+
+def test_parse_legacy_file(tmp_path):
+    """ファイル名から日時、内容から勝利陣営とターン数を読み取るか"""
+    path = _write(tmp_path, "20250101_120000.json", GAME_A)
+    item = parse_legacy_file(str(path))
+    assert item["played_at"] == "2025-01-01 12:00:00"
+    assert item["winner"] == "村人"
+    assert item["turns"] == 2
+    assert item["error"] is None
+
+def test_scan_ignores_other_files(tmp_path):
+    _write(tmp_path, "20250101_120000.json", GAME_A)
+    _write(tmp_path, "notes.json", GAME_A)
+    (tmp_path / "results.db").write_text("")
+    assert [os.path.basename(e[0]) for e in scan_legacy_files(str(tmp_path))] == ["20250101_120000.json"]
+
+def test_import_deduplicates_reruns(tmp_path):
+    """再表示で保存された同じゲームは1件にまとめ、時間が離れた同じ内容は別ゲームにするか"""
+    legacy = tmp_path / "result"
+    legacy.mkdir()
+    _write(legacy, "20250101_120000.json", GAME_A)
+    _write(legacy, "20250101_120005.json", GAME_A)  # 同じゲームの再保存
+    _write(legacy, "20250101_121000.json", GAME_B)
+    _write(legacy, "20250108_200000.json", GAME_A)  # 1週間後の別のゲーム
+    (legacy / "20250109_000000.json").write_text("{broken", encoding="utf-8")
+
+    store = ResultsStore(str(tmp_path / "results.db"))
+    stats = LegacyImporter(store, workers=2, batch_size=2, chunk_size=1).run(str(legacy))
+    assert stats["files"] == 5
+    assert stats["games"] == 3
+    assert stats["duplicates"] == 1
+    assert stats["errors"] == 1
+    assert store.count_games() == 3
+
+def test_import_is_restartable(tmp_path):
+    """再実行では取り込み済みのファイルを飛ばし、新しいファイルだけを取り込むか"""
+    legacy = tmp_path / "result"
+    legacy.mkdir()
+    _write(legacy, "20250101_120000.json", GAME_A)
+    store = ResultsStore(str(tmp_path / "results.db"))
+    assert LegacyImporter(store, workers=1).run(str(legacy))["games"] == 1
+
+    _write(legacy, "20250101_120030.json", GAME_A) # 前回取り込んだゲームの再保存
+    _write(legacy, "20250102_090000.json", GAME_B)
+    importer = LegacyImporter(store, workers=1)
+    assert len(importer.pending_files(str(legacy))) == 2
+    stats = importer.run(str(legacy))
+    assert stats["files"] == 2
+    assert stats["games"] == 1
+    assert stats["duplicates"] == 1
+    assert store.count_games() == 2
+
+def test_older_identical_file_is_a_separate_game(tmp_path):
+    """再実行で、前回取り込んだファイルより古い同じ内容のファイルが来ても、日時が離れていれば別のゲームにするか"""
+    legacy = tmp_path / "result"
+    legacy.mkdir()
+    _write(legacy, "20250108_200000.json", GAME_A)
+    store = ResultsStore(str(tmp_path / "results.db"))
+    assert LegacyImporter(store, workers=1).run(str(legacy))["games"] == 1
+
+    _write(legacy, "20250101_120000.json", GAME_A)  # 1週間前の別のゲーム
+    stats = LegacyImporter(store, workers=1).run(str(legacy))
+    assert (stats["games"], stats["duplicates"]) == (1, 0)
+
+    _write(legacy, "20250108_195930.json", GAME_A)  # 最初に取り込んだゲームの少し前の保存
+    stats = LegacyImporter(store, workers=1).run(str(legacy))
+    assert (stats["games"], stats["duplicates"]) == (0, 1)
+    assert store.count_games() == 2
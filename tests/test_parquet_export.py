@@ -0,0 +1,64 @@
+# werewolf_streamlit/tests/test_parquet_export.py
+from datetime import datetime
+
+import pytest
+import pyarrow.dataset as ds
+
+from game.game_manager import GameManager
+from game.events import PhaseStarted, PlayerKilled, VoteCast
+from game.parquet_export import export_parquet, load_table, load_dataframe, load_state, GAMES, PLAYERS, EVENTS
+from game.results_store import ResultsStore, build_game_record
+from game.simulator import run_bot_game
+
+ROLES = {5: ["人狼", "村人", "村人", "占い師", "騎士"], 7: ["人狼", "人狼", "村人", "村人", "占い師", "霊媒師", "騎士"]}
+
+def _save_games(store: ResultsStore, seeds, player_count: int, day: int):
+    names = [f"P{i}" for i in range(player_count)]
+    for seed in seeds:
+        result = run_bot_game(names, ROLES[player_count], ["random"] * player_count, seed=seed, record_events=True)
+        gm = GameManager.from_events(result["events"])
+        gm.game_id = f"g{player_count}-{seed}"
+        store.save_game(build_game_record(gm, played_at=datetime(2026, 1, day, 12, 0, seed % 60)))
+
+def test_incremental_export_is_partitioned(tmp_path):
+    """日付・人数で分割され、2回目以降は追加されたゲームだけが書き出されるか"""
+    db_path, out = str(tmp_path / "results.db"), str(tmp_path / "parquet")
+    store = ResultsStore(db_path)
+    _save_games(store, range(6), 5, day=1)
+    _save_games(store, range(4), 7, day=2)
+    assert export_parquet(db_path, out, include_events=True, batch_games=4) == 10
+    assert export_parquet(db_path, out, include_events=True) == 0
+    _save_games(store, range(6, 9), 5, day=2)
+    assert export_parquet(db_path, out, include_events=True) == 3
+    store.close()
+
+    games = load_table(out, GAMES)
+    assert games.num_rows == 13
+    assert sorted(set(games.column("date").to_pylist())) == ["2026-01-01", "2026-01-02"]
+    assert (tmp_path / "parquet" / "games" / "date=2026-01-02" / "player_count=7").is_dir()
+    seven = load_table(out, GAMES, filter=ds.field("player_count") == 7)
+    assert sorted(seven.column("game_id").to_pylist()) == [f"g7-{s}" for s in range(4)]
+    assert load_table(out, PLAYERS).num_rows == 6 * 5 + 4 * 7 + 3 * 5
+    assert load_state(out)["games"] == 13
+    with pytest.raises(ValueError):
+        export_parquet(db_path, out, include_events=False)
+
+def test_events_and_dataframe(tmp_path):
+    """進行イベントが平らな列で書き出され、pandas に読み込めるか"""
+    db_path, out = str(tmp_path / "results.db"), str(tmp_path / "parquet")
+    store = ResultsStore(db_path)
+    _save_games(store, [3], 5, day=1)
+    record = store.get_game("g5-3")
+    store.close()
+    export_parquet(db_path, out, include_events=True)
+
+    events = load_dataframe(out, EVENTS).sort_values("seq")
+    assert len(events) == len(record["events"]) - 1 # 役職の割り当ては players に含まれる
+    assert events["type"].iloc[0] == PhaseStarted.kind
+    votes = events[events["type"] == VoteCast.kind]
+    assert not votes.empty and (votes["phase"] == "day").all()
+    kills = events[events["type"] == PlayerKilled.kind]
+    assert not kills.empty
+    assert list(kills["detail"]) == [e["reason"] for e in record["events"] if e["type"] == PlayerKilled.kind]
+    games = load_dataframe(out, GAMES, columns=["game_id", "winner", "turns"])
+    assert games["winner"].iloc[0] == record["winner"]
@@ -0,0 +1,63 @@
+# werewolf_streamlit/tests/test_player_ratings.py
+import sqlite3
+
+from game import player_ratings
+from game.results_store import ResultsStore
+
+def _record(game_id: str, winner, seats):
+    """seats: (名前, 陣営) のリスト"""
+    return {
+        "game_id": game_id, "played_at": "2026-01-01 20:00:00", "winner": winner, "player_count": len(seats),
+        "turns": 3,
+        "results": [{"名前": name, "役職": team, "陣営": team, "生死": "最終日生存", "勝利": "🏆" if team == winner else ""}
+                    for name, team in seats],
+    }
+
+def _games():
+    yield _record("g1", "人狼", [("Alice", "人狼"), ("Bob", "村人"), ("Carol", "村人")])
+    yield _record("g2", "村人", [("Alice", "村人"), ("Bob", "人狼"), ("Carol", "村人")])
+    yield _record("g3", "人狼", [("Alice", "人狼"), ("Bob", "村人"), ("Dave", "村人")])
+    yield _record("g4", None, [("Alice", "人狼"), ("Bob", "村人"), ("Dave", "村人")])
+
+def test_ratings_are_updated_per_game(tmp_path):
+    """保存のたびにそのゲームのプレイヤーだけが更新され、陣営別のレーティングも付くか"""
+    store = ResultsStore(str(tmp_path / "results.db"))
+    games = list(_games())
+    store.save_game(games[0])
+    alice_first = store.ratings().get("Alice")
+    assert store.ratings().get("Dave") is None
+    assert alice_first.games == 1 and alice_first.mu > 1500
+    for record in games[1:]:
+        store.save_game(record)
+    ratings = store.ratings()
+    board = ratings.leaderboard()
+    assert board[0]["プレイヤー"] == "Alice"
+    assert board[0]["試合数"] == 3 # 勝敗のつかなかったゲームは数えない
+    assert ratings.get("Alice", "人狼").games == 2
+    assert ratings.get("Alice", "村人").games == 1
+    assert ratings.teams() == ["人狼", "村人"]
+    assert [row["プレイヤー"] for row in ratings.leaderboard("人狼")] == ["Alice", "Bob"]
+    assert {row["プレイヤー"] for row in ratings.leaderboard(min_games=2)} == {"Alice", "Bob", "Carol"}
+    store.close()
+
+def test_rebuild_only_when_version_changes(tmp_path, monkeypatch):
+    """計算方法のバージョンが変わったときだけ全ゲームから作り直し、結果は逐次更新と一致するか"""
+    path = str(tmp_path / "results.db")
+    store = ResultsStore(path)
+    store.save_games(_games())
+    incremental = store.ratings().leaderboard()
+    store.close()
+
+    # バージョンが同じなら作り直さない (手で書き換えた値が残る)
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE player_ratings SET mu = 0 WHERE name = 'Dave'")
+    conn.commit()
+    conn.close()
+    store = ResultsStore(path)
+    assert store.ratings().get("Dave").mu == 0
+    store.close()
+
+    monkeypatch.setattr(player_ratings, "RATING_VERSION", player_ratings.RATING_VERSION + 1)
+    store = ResultsStore(path)
+    assert store.ratings().leaderboard() == incremental
+    store.close()
@@ -0,0 +1,39 @@
+# werewolf_streamlit/tests/test_replay.py
+import pytest
+
+from game.events import fold_events, PhaseStarted
+from game.replay import Replay
+from game.simulator import run_bot_game
+
+PLAYER_NAMES = ["Alice", "Bob", "Charlie", "Dave", "Eve", "Frank", "Grace"]
+ROLES = ["人狼", "人狼", "村人", "占い師", "騎士", "猫又", "狂人"]
+
+def _events(seed: int):
+    return run_bot_game(PLAYER_NAMES, ROLES, ["team_aware"] * len(PLAYER_NAMES), seed=seed, record_events=True)["events"]
+
+@pytest.mark.parametrize("interval", [1, 4, 16, 1000])
+def test_state_at_matches_full_fold(interval):
+    """キーフレームから再生した状態が、先頭から畳み込んだ状態と一致するか"""
+    events = _events(0)
+    replay = Replay(events, keyframe_interval=interval)
+    assert len(replay.keyframes) == len(events) // interval + 1
+    for position in range(len(events) + 1):
+        assert replay.state_at(position) == fold_events(events[:position])
+
+def test_steps_and_views():
+    """フェーズごとのコマに分かれ、各コマの表示内容が正しいか"""
+    events = _events(2)
+    replay = Replay(events)
+    assert replay.steps[0].label == "開始前"
+    phases = [(e.turn, e.phase) for e in events if isinstance(e, PhaseStarted)]
+    assert [(s.turn, s.phase) for s in replay.steps[1:]] == phases[:len(replay.steps) - 1]
+    final = fold_events(events)
+    last = replay.step_view(len(replay) - 1)
+    assert last["victory"] == final.victory_message
+    first_night = replay.step_view(1)
+    assert first_night["alive"] == PLAYER_NAMES
+    assert first_night["actions"] == final.night_actions[1]
+    day = next(i for i, s in enumerate(replay.steps) if s.phase == "day")
+    assert replay.step_view(day)["votes"] == final.votes[replay.steps[day].turn]
+    # 途中のコマを見ても、キーフレームは書き換わらない
+    assert replay.state_at(len(events)) == final
@@ -0,0 +1,165 @@
+# werewolf_streamlit/tests/test_results_store.py
+import json
+import multiprocessing
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from game.game_manager import GameManager
+from game.events import event_from_dict
+from game.results_store import ResultsStore, WriteBehindWriter, build_game_record, read_data_version
+
+def _finished_game() -> GameManager:
+    gm = GameManager(["Alice", "Bob", "Charlie"])
+    gm.assign_roles(["人狼", "村人", "占い師"])
+    wolf = next(p for p in gm.players if p.role.name == "人狼")
+    gm.execute_day_vote(Counter({wolf.name: 1}))
+    gm.check_victory()
+    return gm
+
+def _record(game_id: str, winner: str = "村人", played_at: str = "2026-01-01 12:00:00"):
+    return {
+        "game_id": game_id, "played_at": played_at, "winner": winner, "player_count": 2, "turns": 2,
+        "results": [
+            {"名前": "Alice", "役職": "人狼", "生死": "1日目 処刑により死亡", "陣営": "人狼", "勝利": ""},
+            {"名前": "Bob", "役職": "村人", "生死": "最終日生存", "陣営": "村人", "勝利": "🏆"},
+        ],
+    }
+
+def test_save_game_is_idempotent(tmp_path):
+    """同じゲームIDを何度保存しても1件のままか"""
+    store = ResultsStore(str(tmp_path / "results.db"))
+    gm = _finished_game()
+    record = build_game_record(gm, played_at=datetime(2026, 1, 2, 3, 4, 5))
+    assert store.save_game(record) is True
+    assert store.save_game(record) is False
+    assert store.count_games() == 1
+    saved = store.get_game(gm.game_id)
+    assert saved["played_at"] == "2026-01-02 03:04:05"
+    assert saved["winner"] == "村人"
+    assert saved["results"] == gm.get_game_results()
+    players = store.conn.execute("SELECT COUNT(*) FROM game_players").fetchone()[0]
+    assert players == 3
+    assert saved["events"] == record["events"]
+    assert GameManager.from_events([event_from_dict(e) for e in saved["events"]]).get_game_results() == gm.get_game_results()
+
+def test_store_uses_wal_and_indexes(tmp_path):
+    """WAL モードで、日付・勝利陣営・役職・名前のインデックスがあるか"""
+    store = ResultsStore(str(tmp_path / "results.db"))
+    assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {row[0] for row in store.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_games_played_at", "idx_games_winner", "idx_game_players_role", "idx_game_players_name"} <= indexes
+
+def test_write_behind_writer(tmp_path):
+    """submit はすぐに戻り、flush 後には書き込まれているか"""
+    path = str(tmp_path / "results.db")
+    writer = WriteBehindWriter(path)
+    for i in range(20):
+        writer.submit(_record(f"g{i}"))
+    writer.submit(_record("g0")) # 重複
+    assert writer.flush(timeout=10)
+    writer.close()
+    assert writer.last_error is None
+    assert ResultsStore(path).count_games() == 20
+    with pytest.raises(RuntimeError):
+        writer.submit(_record("g99"))
+
+def test_write_behind_writer_keeps_failed_records(tmp_path):
+    """壊れたレコードだけが退避ファイルに回り、同じまとまりの他のレコードは書き込まれるか"""
+    path = str(tmp_path / "results.db")
+    writer = WriteBehindWriter(path)
+    broken = {"game_id": "broken"} # 必須の項目がない
+    futures = [writer.submit(_record("g1")), writer.submit(broken), writer.submit(_record("g2"))]
+    writer.close()
+    assert futures[0].result(5) is True and futures[2].result(5) is True
+    with pytest.raises(KeyError):
+        futures[1].result(5)
+    assert ResultsStore(path).count_games() == 2
+    assert writer.failed == 1
+    with open(writer.dead_letter_path, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [broken]
+
+def test_write_behind_writer_flush_returns_when_store_cannot_open(tmp_path):
+    """データベースが開けなくても flush が戻り、レコードは退避ファイルに残るか"""
+    path = str(tmp_path) # ディレクトリなので開けない
+    writer = WriteBehindWriter(path, dead_letter_path=str(tmp_path / "failed.jsonl"))
+    future = writer.submit(_record("g1"))
+    assert writer.flush(timeout=10)
+    assert future.exception(5) is not None
+    assert writer.last_error is not None
+    with open(tmp_path / "failed.jsonl", encoding="utf-8") as f:
+        assert json.loads(f.readline())["game_id"] == "g1"
+    writer.close()
+
+def _write_from_process(path: str, prefix: str):
+    writer = WriteBehindWriter(path, max_batch=5)
+    for i in range(30):
+        writer.submit(_record(f"{prefix}{i % 25}"))
+    writer.close()
+
+def test_read_data_version_does_not_take_the_write_lock(tmp_path):
+    """描画のたびに読むデータのバージョンとストアの接続が、書き込み中のロックを待たないか"""
+    path = str(tmp_path / "results.db")
+    assert read_data_version(path) == 0 # まだデータベースがない
+    store = ResultsStore(path)
+    store.save_games([_record("g1"), _record("g2")])
+    store.conn.execute("BEGIN IMMEDIATE") # 書き込み中
+    try:
+        assert read_data_version(path) == store.data_version() == 2
+        reader = ResultsStore(path, timeout=0.1) # スキーマは作成済みなので、ロックを取らずに開ける
+        assert reader.count_games() == 2
+        reader.close()
+    finally:
+        store.conn.execute("ROLLBACK")
+        store.close()
+
+def test_concurrent_processes(tmp_path):
+    """複数プロセスから同時に書き込んでも欠落・重複しないか"""
+    path = str(tmp_path / "results.db")
+    ResultsStore(path).close()
+    processes = [multiprocessing.Process(target=_write_from_process, args=(path, prefix)) for prefix in ("a", "b", "a")]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+    assert all(process.exitcode == 0 for process in processes)
+    assert ResultsStore(path).count_games() == 50
+
+def test_list_games_keyset_pagination(tmp_path):
+    """新しい順のページ送りで全件が重複なく返り、条件で絞り込めるか。追加するとバージョンが変わるか"""
+    store = ResultsStore(str(tmp_path / "results.db"))
+    # 同じ日時のゲームを含める (played_at が同じでも game_id で順序が決まる)
+    store.save_games([_record(f"g{i:02d}", winner="人狼" if i % 3 == 0 else "村人",
+                              played_at=f"2026-01-{1 + i // 2:02d} 12:00:00") for i in range(25)])
+    seen, after = [], None
+    while True:
+        page = store.list_games(after=after, limit=7)
+        if not page:
+            break
+        seen.extend(game["game_id"] for game in page)
+        after = (page[-1]["played_at"], page[-1]["game_id"])
+    assert seen == sorted((f"g{i:02d}" for i in range(25)), key=lambda g: (1 + int(g[1:]) // 2, g), reverse=True)
+    assert store.list_games(limit=1)[0]["players"] == ["Alice", "Bob"]
+    assert {g["game_id"] for g in store.list_games(winner="人狼", limit=100)} == {f"g{i:02d}" for i in range(0, 25, 3)}
+    assert len(store.list_games(since="2026-01-02", until="2026-01-03", limit=100)) == 4
+    assert len(store.list_games(player="Alice", roles=["人狼", "村人"], limit=100)) == 25
+    assert store.list_games(player="Carol", limit=100) == []
+    assert store.list_games(roles=["妖狐"], limit=100) == []
+    version = store.data_version()
+    store.save_game(_record("g99"))
+    assert store.data_version() > version
+    store.close()
+
+def test_recent_rosters_are_deduplicated(tmp_path):
+    """過去のゲームの名簿が新しい順に、同じ顔ぶれを重複させずに返るか"""
+    store = ResultsStore(str(tmp_path / "results.db"))
+    store.save_games([_record(f"g{i}", played_at=f"2026-01-0{i + 1} 12:00:00") for i in range(3)])
+    record = _record("g9", played_at="2026-01-09 12:00:00")
+    record["results"] = list(reversed(record["results"]))
+    store.save_game(record)
+    rosters = store.recent_rosters()
+    assert [r["players"] for r in rosters] == [["Bob", "Alice"], ["Alice", "Bob"]]
+    assert rosters[1]["played_at"] == "2026-01-03 12:00:00"
+    assert len(store.recent_rosters(limit=1)) == 1
+    store.close()
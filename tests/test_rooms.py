@@ -0,0 +1,120 @@
+# werewolf_streamlit/tests/test_rooms.py
+import random
+import threading
+
+import pytest
+
+from game.game_manager import GameManager
+from game.checkpoint import CheckpointStore
+from game.rooms import RoomRegistry, estimate_size
+
+PLAYER_NAMES = ["Alice", "Bob", "Charlie", "Dave", "Eve"]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _game(seed: int) -> GameManager:
+    gm = GameManager(PLAYER_NAMES.copy(), rng=random.Random(seed))
+    gm.assign_roles(["人狼", "村人", "村人", "占い師", "騎士"])
+    gm.start_night()
+    return gm
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    yield store
+    store.close()
+
+def test_lru_eviction_and_restore(store):
+    """上限を超えると古いルームから退避され、開くと同じ状態で復元されるか"""
+    registry = RoomRegistry(store, max_loaded_rooms=2, clock=FakeClock(), rng=random.Random(0))
+    codes = [registry.create(_game(seed), {"current_player_index": seed}, "night_phase").code for seed in range(3)]
+    assert registry.loaded_codes() == codes[1:]
+    assert registry.stats()["evictions"] == 1
+    with registry.open(codes[0].lower()) as room:
+        assert room.session == {"current_player_index": 0}
+        assert room.stage == "night_phase"
+        assert [p.role.name for p in room.gm.players] == [p.role.name for p in _game(0).players]
+        room.session = {"current_player_index": 3}
+    # 開いたルームが最新になり、代わりに最も古いルームが退避される
+    assert registry.loaded_codes() == [codes[2], codes[0]]
+    stats = registry.stats()
+    assert (stats["rooms"], stats["loaded"], stats["restores"]) == (3, 2, 1)
+    assert stats["bytes"] > 0
+
+def test_idle_rooms_are_evicted_and_survive_restart(store):
+    """放置時間を超えたルームが退避され、再起動後の新しい一覧からもルームコードで開けるか"""
+    clock = FakeClock()
+    registry = RoomRegistry(store, idle_ttl=60, clock=clock)
+    code = registry.create(_game(1), {}, "day_phase").code
+    clock.now = 30
+    registry.enforce_limits()
+    assert registry.loaded_codes() == [code]
+    clock.now = 120
+    registry.enforce_limits()
+    assert registry.loaded_codes() == []
+    assert store.flush(5)
+
+    restarted = RoomRegistry(store)
+    assert restarted.exists(code)
+    with restarted.open(code) as room:
+        assert room.stage == "day_phase"
+    restarted.close(code)
+    assert store.flush(5)
+    assert not restarted.exists(code)
+    with pytest.raises(KeyError):
+        restarted.acquire(code)
+
+def test_room_in_use_is_not_evicted(store):
+    """使用中 (ロック中) のルームは退避されないか"""
+    registry = RoomRegistry(store, max_loaded_rooms=1)
+    first = registry.create(_game(1), {}, "night_phase").code
+    room = registry.acquire(first)
+    second = registry.create(_game(2), {}, "night_phase").code
+    # 使用中のルームの代わりに、他のルームが退避される
+    assert registry.loaded_codes() == [first]
+    registry.release(room)
+    with registry.open(second):
+        pass
+    assert registry.loaded_codes() == [second]
+
+def test_close_room_from_inside_open(store):
+    """ルームを使用中の描画の中から削除しても止まらず、ロックを放したときに片付けられるか"""
+    registry = RoomRegistry(store)
+    code = registry.create(_game(1), {"current_player_index": 0}, "game_over").code
+    closed = threading.Event()
+    def render():
+        with registry.open(code) as room:
+            registry.close(code) # 「新しいゲームを始める」
+            closed.set()
+            assert room.gm is not None # 描画が終わるまではそのまま使える
+    thread = threading.Thread(target=render, daemon=True)
+    thread.start()
+    assert closed.wait(5), "close() がデッドロックした"
+    thread.join(5)
+    assert not thread.is_alive()
+    assert store.flush(5)
+    assert not registry.exists(code)
+    with pytest.raises(KeyError):
+        registry.acquire(code)
+
+def test_peek_reads_session_without_the_room_lock(store):
+    """使用中 (ロック中) のルームでも、画面の状態の値をロックを取らずに読めるか"""
+    registry = RoomRegistry(store, max_loaded_rooms=1)
+    code = registry.create(_game(1), {"discussion_timer": {"turn": 1}}, "day_phase").code
+    room = registry.acquire(code)
+    assert registry.peek(code.lower(), "discussion_timer") == {"turn": 1}
+    assert registry.peek(code, "missing", "default") == "default"
+    registry.release(room)
+    registry.create(_game(2), {}, "night_phase") # 最初のルームは退避される
+    assert registry.peek(code, "discussion_timer") is None
+    assert registry.peek("NOROOM", "discussion_timer") is None
+
+def test_estimate_size_counts_shared_objects_once():
+    shared = list(range(1000))
+    assert estimate_size([shared, shared]) < 2 * estimate_size(shared)
+    assert estimate_size(_game(1)) > estimate_size(PLAYER_NAMES)
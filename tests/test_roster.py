@@ -0,0 +1,29 @@
+# werewolf_streamlit/tests/test_roster.py
+import pytest
+
+from game.roster import parse_roster, parse_roster_csv, validate_roster
+
+def test_parse_pasted_roster():
+    """改行・カンマ・読点・タブ区切りの名簿を読み、空行は無視して空欄は残すか"""
+    text = "Alice\n\nBob, Charlie\nDave、Eve\tFrank\n  \nGina,,\n"
+    assert parse_roster(text) == ["Alice", "Bob", "Charlie", "Dave", "Eve", "Frank", "Gina", "", ""]
+
+def test_parse_csv_roster():
+    """見出しの名前の列を使い、見出しがなければ1列目を使うか (BOM・Shift_JIS も読めるか)"""
+    with_header = "番号,名前\n1,アリス\n2,\n\n3,ボブ\n".encode("utf-8-sig")
+    assert parse_roster_csv(with_header) == ["アリス", "", "ボブ"]
+    assert parse_roster_csv("アリス,10\nボブ,20\n".encode("cp932")) == ["アリス", "ボブ"]
+    assert parse_roster_csv(b"") == []
+    # UTF-8 でも Shift_JIS でも読めなければ UnicodeDecodeError (画面ではエラーとして表示する)
+    with pytest.raises(UnicodeDecodeError):
+        parse_roster_csv(b"\x81 ")
+
+def test_validate_roster_reports_all_problems():
+    """人数・空の名前・重複を一度に指摘し、問題がなければ空のリストを返すか"""
+    errors = validate_roster(["A", "", "B", "A", "A"], min_players=6)
+    assert errors == [
+        "プレイヤーは 6 人以上必要です (現在 5 人)。",
+        "名前が空です: 2 人目",
+        "名前が重複しています: A (1 人目, 4 人目, 5 人目)",
+    ]
+    assert validate_roster([f"P{i}" for i in range(50)], min_players=3) == []
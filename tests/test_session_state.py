@@ -0,0 +1,28 @@
+# werewolf_streamlit/tests/test_session_state.py
+from ui.session_state import collect, memory_report, namespace_of, DAY, NIGHT, PHASE_KEY
+
+def test_phase_change_drops_previous_phase_keys():
+    """フェーズが変わると前のフェーズのキーだけが捨てられ、ゲームの再開に必要なキーは残るか"""
+    state = {"day_votes": {"A": "B"}, "room_code": "ABCDE", "action_confirmed_0": True}
+    collect(state, "night_phase", 1)
+    state.update({"role_toggle_A": True, "action_target_A": "B", "undo_stack": object()})
+    assert collect(state, "night_phase", 1) == 0 # 同じフェーズでは何もしない
+    assert collect(state, "day_phase", 1) == 3
+    assert set(state) == {"day_votes", "room_code", "action_confirmed_0", PHASE_KEY}
+    state.update({"vote_tally": object(), "vote_radio_A": "B"})
+    collect(state, "day_phase", 2) # 同じステージでもターンが変われば、前の昼のキーは捨てる
+    assert "vote_tally" not in state and "vote_radio_A" not in state
+
+def test_stage_change_drops_unused_namespaces_and_caches_over_budget():
+    """使わないステージの名前空間と、目安を超えたときのキャッシュが捨てられるか"""
+    state = {"history_cursors": [None], "replay_cache": list(range(10000)), "replay_cache_id": "g1",
+             "role_count_人狼": 2, "roster_text": "A\nB"}
+    collect(state, "history", None, budget=10 ** 9)
+    assert "replay_cache" in state and "role_count_人狼" not in state
+    collect(state, "replay", None, budget=1000)
+    assert "replay_cache" not in state and "history_cursors" in state
+    collect(state, "initial_setup", None)
+    assert set(state) == {"roster_text", PHASE_KEY}
+    assert namespace_of("vote_select_A") is DAY and namespace_of("device_target_A") is NIGHT
+    report = memory_report({"vote_tally": {"A": "B"}, "stage": "day_phase"})
+    assert set(report) == {"day", "other"} and report["day"][0] == 1
@@ -0,0 +1,71 @@
+# werewolf_streamlit/tests/test_simulator.py
+import pytest
+
+from game.game_manager import GameManager
+from game.bot import bot_dict, TeamAwareBot
+from game.simulator import run_bot_game, BackgroundGame
+from game.admission import AdmissionController
+
+PLAYER_NAMES = ["Alice", "Bob", "Charlie", "Dave", "Eve", "Frank", "Grace"]
+ROLES = ["人狼", "人狼", "村人", "村人", "占い師", "騎士", "狂人"]
+
+# --- ボットとシミュレーション ---
+
+def test_team_aware_bot_avoids_wolf_partner():
+    """人狼のボットは仲間の人狼に投票しない"""
+    gm = GameManager(["Alice", "Bob", "Charlie"])
+    gm.assign_roles(["人狼", "人狼", "村人"])
+    wolf, partner = [p for p in gm.players if p.role.name == "人狼"]
+    villager = next(p for p in gm.players if p.role.name == "村人")
+    bot = TeamAwareBot(wolf, gm.rng)
+    for _ in range(20):
+        assert bot.choose_vote(gm, [p.name for p in gm.players], {}) == villager.name
+
+@pytest.mark.parametrize("strategy", list(bot_dict.keys()))
+def test_run_bot_game_finishes(strategy):
+    """ボットのみのゲームが勝敗まで進行するか"""
+    result = run_bot_game(PLAYER_NAMES, ROLES, [strategy] * len(PLAYER_NAMES), seed=1)
+    assert result["victory_team"] in ("村人", "人狼", "妖狐")
+    assert len(result["players"]) == len(PLAYER_NAMES)
+    assert any(p["winner"] for p in result["players"])
+    assert all(p["strategy"] == strategy for p in result["players"])
+
+def test_run_bot_game_is_reproducible():
+    """同じシードなら同じゲームが再現されるか"""
+    strategies = ["random", "team_aware"] * 3 + ["bandwagon"]
+    first = run_bot_game(PLAYER_NAMES, ROLES, strategies, seed=42)
+    second = run_bot_game(PLAYER_NAMES, ROLES, strategies, seed=42)
+    assert first == second
+
+def test_run_bot_game_strategy_count_mismatch():
+    """戦略の数がプレイヤー数と合わない場合はエラー"""
+    with pytest.raises(ValueError):
+        run_bot_game(PLAYER_NAMES, ROLES, ["random"], seed=0)
+
+def test_run_bot_game_log():
+    """進行記録が夜と昼を交互に含み、最後のフェーズに勝利情報があるか"""
+    result = run_bot_game(PLAYER_NAMES, ROLES, ["team_aware"] * len(PLAYER_NAMES), seed=3, record_log=True)
+    log = result["log"]
+    assert log[0]["phase"] == "night" and log[0]["turn"] == 1
+    assert all(a["phase"] != b["phase"] for a, b in zip(log, log[1:]))
+    assert log[-1]["victory"]["team"] == result["victory_team"]
+    assert "log" not in run_bot_game(PLAYER_NAMES, ROLES, ["random"] * len(PLAYER_NAMES), seed=3)
+
+def test_background_game():
+    """バックグラウンドで生成したゲームが同期実行と同じ結果になるか"""
+    strategies = ["bandwagon"] * len(PLAYER_NAMES)
+    job = BackgroundGame(PLAYER_NAMES, ROLES, strategies, seed=9)
+    assert job.wait(timeout=10)
+    assert job.error is None
+    assert job.result == run_bot_game(PLAYER_NAMES, ROLES, strategies, seed=9, record_log=True)
+
+def test_background_game_in_admission_queue():
+    """受付制御の待ち行列で実行しても同じ結果になるか"""
+    strategies = ["bandwagon"] * len(PLAYER_NAMES)
+    admission = AdmissionController(workers=1)
+    try:
+        job = BackgroundGame(PLAYER_NAMES, ROLES, strategies, seed=9, admission=admission)
+        assert job.wait(timeout=10)
+        assert job.result == run_bot_game(PLAYER_NAMES, ROLES, strategies, seed=9, record_log=True)
+    finally:
+        admission.close()
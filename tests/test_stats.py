@@ -0,0 +1,61 @@
+# werewolf_streamlit/tests/test_stats.py
+import sqlite3
+
+from game.results_store import ResultsStore
+from game.stats import death_reason
+
+def _record(game_id: str, played_at: str, winner: str, seats, turns: int = 3):
+    """seats: (役職, 陣営, 生死) のリスト"""
+    return {
+        "game_id": game_id, "played_at": played_at, "winner": winner, "player_count": len(seats), "turns": turns,
+        "results": [{"名前": f"P{i}", "役職": role, "陣営": team, "生死": status, "勝利": "🏆" if team == winner else ""}
+                    for i, (role, team, status) in enumerate(seats)],
+    }
+
+SEATS = [
+    ("人狼", "人狼", "2日目 処刑により死亡"),
+    ("騎士", "村人", "1日目 襲撃により死亡"),
+    ("妖狐", "妖狐", "最終日生存"),
+]
+
+def test_death_reason():
+    assert death_reason("2日目 襲撃により死亡") == "襲撃"
+    assert death_reason("最終日生存") is None
+    assert death_reason("死亡(詳細不明)") == "不明"
+
+def test_aggregates_are_updated_on_save(tmp_path):
+    """保存したゲームが集計に加算され、月・人数で絞り込めるか。同じゲームの再保存で二重に数えないか"""
+    store = ResultsStore(str(tmp_path / "results.db"))
+    store.save_game(_record("g1", "2026-01-05 20:00:00", "村人", SEATS))
+    store.save_game(_record("g2", "2026-02-05 20:00:00", "妖狐", SEATS, turns=5))
+    store.save_game(_record("g2", "2026-02-05 20:00:00", "妖狐", SEATS, turns=5))
+    store.save_game(_record("g3", "2026-02-06 20:00:00", "人狼", SEATS[:2] + [("村人", "村人", "最終日生存")] * 2))
+    stats = store.stats()
+    assert stats.months() == ["2026-01", "2026-02"]
+    assert stats.player_counts() == [3, 4]
+    assert stats.summary() == {"games": 3, "avg_turns": 11 / 3}
+    fox = stats.role_win_rate("妖狐", player_count=3, since="2026-02", until="2026-02")
+    assert (fox["players"], fox["wins"], fox["survival_rate"]) == (1, 1, 1.0)
+    assert stats.role_win_rate("妖狐", player_count=4)["players"] == 0
+    teams = {t["team"]: t for t in stats.team_stats()}
+    assert (teams["村人"]["games"], teams["村人"]["wins"]) == (3, 1)
+    assert (teams["妖狐"]["games"], teams["妖狐"]["wins"]) == (2, 1)
+    assert stats.death_reasons("騎士") == [{"reason": "襲撃", "deaths": 3}]
+    assert stats.death_reasons(since="2026-02")[0] == {"reason": "処刑", "deaths": 2}
+    store.close()
+
+def test_existing_database_is_backfilled(tmp_path):
+    """集計テーブルがない既存のデータベースを開くと、保存済みのゲームから集計が作られるか"""
+    path = str(tmp_path / "results.db")
+    store = ResultsStore(path)
+    store.save_game(_record("g1", "2026-01-05 20:00:00", "村人", SEATS))
+    store.close()
+    conn = sqlite3.connect(path)
+    for table in ["stats_games", "stats_teams", "stats_roles", "stats_deaths"]:
+        conn.execute(f"DROP TABLE {table}")
+    conn.commit()
+    conn.close()
+    store = ResultsStore(path)
+    assert store.stats().summary()["games"] == 1
+    assert store.stats().role_win_rate("人狼")["players"] == 1
+    store.close()
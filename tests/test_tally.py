@@ -0,0 +1,29 @@
+# werewolf_streamlit/tests/test_tally.py
+import random
+from collections import Counter
+
+from game.tally import VoteTally
+
+PLAYER_NAMES = [f"P{i}" for i in range(30)]
+
+def test_apply_updates_counts_incrementally():
+    """投票・投票先の変更を反映した集計が、数え直した結果と一致するか"""
+    rng = random.Random(5)
+    tally = VoteTally()
+    for _ in range(200):
+        changes = {rng.choice(PLAYER_NAMES): rng.choice(PLAYER_NAMES) for _ in range(rng.randint(1, 5))}
+        tally = tally.apply(changes)
+        assert tally.counts == Counter(tally.votes.values())
+        assert all(count > 0 for count in tally.counts.values())
+    assert len(tally) == len(tally.votes)
+
+def test_apply_does_not_modify_previous_votes():
+    """取り消しの記録が参照する古い投票の辞書は書き換えられず、集計はその場で更新されるか"""
+    votes = {"Alice": "Bob"}
+    tally = VoteTally(votes)
+    updated = tally.apply({"Alice": "Carol", "Bob": "Carol"})
+    assert votes == {"Alice": "Bob"}
+    assert updated is tally and tally.votes is not votes
+    assert updated.counts == Counter({"Carol": 2})
+    assert updated.leaders() == ["Carol"]
+    assert updated.missing(["Alice", "Bob", "Dave"]) == ["Dave"]
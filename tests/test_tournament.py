@@ -0,0 +1,79 @@
+# werewolf_streamlit/tests/test_tournament.py
+import json
+import pytest
+
+from game.rating import Rating, update_rating, update_team_game
+from game.tournament import Tournament, round_robin_schedule, swiss_pairings
+
+ROLES = ["人狼", "人狼", "村人", "村人", "占い師", "騎士", "狂人"]
+
+# --- レーティング ---
+
+def test_update_rating_win_and_loss():
+    """勝てばレートが上がり、負ければ下がり、RD は小さくなる"""
+    base = Rating()
+    won = update_rating(base, [(1500.0, 350.0, 1.0)])
+    lost = update_rating(base, [(1500.0, 350.0, 0.0)])
+    assert won.mu > base.mu > lost.mu
+    assert won.rd < base.rd
+    assert won.games == 1 and won.wins == 1.0
+
+def test_update_team_game():
+    """陣営戦の結果で勝った側のキーのレートが上がる"""
+    ratings = {}
+    update_team_game(ratings, [("A", "村人", True), ("A", "村人", True), ("B", "人狼", False)])
+    assert ratings["A"].mu > ratings["B"].mu
+    assert ratings["A"].games == 2
+    assert ratings["B"].games == 1
+
+# --- 対戦表 ---
+
+def test_round_robin_schedule():
+    """総当たりで全ペアが試合数ぶん組まれ、座席が入れ替わるか"""
+    schedule = round_robin_schedule(["a", "b", "c"], player_count=5, games_per_pair=2)
+    assert len(schedule) == 3 * 2
+    assert len({m["match_id"] for m in schedule}) == len(schedule)
+    first, second = schedule[0], schedule[1]
+    assert first["strategies"][0] != second["strategies"][0]
+    assert round_robin_schedule(["a", "b", "c"], 5, 2) == schedule # シードも含めて再現可能
+
+def test_swiss_pairings_avoid_rematch():
+    """スイス式では対戦済みのペアを避ける"""
+    ratings = {"a": Rating(1600), "b": Rating(1550), "c": Rating(1500), "d": Rating(1450)}
+    pairs = swiss_pairings(["a", "b", "c", "d"], ratings, {("a", "b")})
+    assert ("a", "b") not in pairs
+    assert pairs[0] == ("a", "c")
+
+# --- 大会の実行 ---
+
+def test_tournament_run_and_resume(tmp_path):
+    """大会を実行し、チェックポイントから再開すると完了済みの試合を飛ばすか"""
+    checkpoint = tmp_path / "tournament.json"
+    tournament = Tournament(["random", "team_aware"], ROLES, games_per_pair=4, workers=1,
+                            checkpoint_path=str(checkpoint))
+    leaderboard = tournament.run()
+    assert {row["戦略"] for row in leaderboard} == {"random", "team_aware"}
+    assert all(row["下限"] <= row["レート"] <= row["上限"] for row in leaderboard)
+    assert len(json.loads(checkpoint.read_text(encoding="utf-8"))["completed"]) == 4
+
+    resumed = Tournament(["random", "team_aware"], ROLES, games_per_pair=4, workers=1,
+                         checkpoint_path=str(checkpoint))
+    played = []
+    resumed.run(progress=lambda done, total: played.append(done))
+    assert played == [] # 全試合が完了済み
+    assert resumed.leaderboard() == leaderboard
+
+def test_tournament_swiss_with_process_pool():
+    """スイス式をプロセスプールで実行できるか"""
+    tournament = Tournament(["random", "team_aware", "bandwagon"], ROLES, mode="swiss",
+                            games_per_pair=2, rounds=2, workers=2)
+    tournament.run()
+    assert len(tournament.completed) == 2 * 2
+    assert tournament.role_leaderboard()
+
+def test_tournament_checkpoint_mismatch(tmp_path):
+    """設定の異なるチェックポイントは読み込まない"""
+    checkpoint = tmp_path / "tournament.json"
+    Tournament(["random", "team_aware"], ROLES, games_per_pair=1, workers=1, checkpoint_path=str(checkpoint)).run()
+    with pytest.raises(ValueError):
+        Tournament(["random", "bandwagon"], ROLES, workers=1, checkpoint_path=str(checkpoint))
@@ -0,0 +1,63 @@
+# werewolf_streamlit/tests/test_undo.py
+import random
+
+import pytest
+
+from game.game_manager import GameManager
+from game.events import SeerResultShown, VoteCast
+from game.undo import UndoStack
+
+PLAYER_NAMES = ["Alice", "Bob", "Charlie", "Dave", "Eve"]
+
+def _night_game() -> GameManager:
+    gm = GameManager(PLAYER_NAMES.copy(), rng=random.Random(3))
+    gm.assign_roles(["人狼", "村人", "村人", "偽占い師", "騎士"])
+    gm.start_night()
+    return gm
+
+def test_rollback_restores_events_rng_and_session():
+    """取り消すとイベント・乱数・画面の状態が操作前に戻り、偽占い師の結果も同じものが出るか"""
+    gm = _night_game()
+    seer = next(p for p in gm.players if p.role.name == "偽占い師")
+    stack = UndoStack()
+    night_actions = {}
+    stack.push("占い", gm, {"night_actions": night_actions, "current_player_index": 2})
+    first = gm.get_seer_result(seer, "Alice")
+    assert isinstance(gm.events[-1], SeerResultShown)
+    session = stack.undo(gm)
+    assert session == {"night_actions": {}, "current_player_index": 2}
+    assert session["night_actions"] is night_actions # 複製せず参照を持つ
+    assert not any(isinstance(e, SeerResultShown) for e in gm.events)
+    assert gm.get_seer_result(seer, "Alice") == first
+    assert len(stack) == 0
+    assert stack.undo(gm) is None
+
+def test_rollback_to_earlier_point_drops_later_points():
+    """途中の地点まで戻すと、それ以降の履歴が消えるか"""
+    gm = _night_game()
+    gm.start_day()
+    stack = UndoStack()
+    votes = {}
+    for voter in ["Alice", "Bob", "Charlie"]:
+        stack.push(voter, gm, {"day_votes": votes})
+        gm.record_vote(voter, "Dave")
+        votes = {**votes, voter: "Dave"}
+    session = stack.rollback(gm, 1)
+    assert session["day_votes"] == {"Alice": "Dave"}
+    assert [p.label for p in stack.points] == ["Alice"]
+    assert [e.voter for e in gm.events if isinstance(e, VoteCast)] == ["Alice"]
+
+def test_history_is_cleared_on_phase_change():
+    """フェーズが変わると履歴が消え、確定した処刑などは取り消せないか"""
+    gm = _night_game()
+    gm.start_day()
+    stack = UndoStack()
+    stack.push("投票", gm, {})
+    count = len(gm.events)
+    gm.record_vote("Alice", "Bob")
+    gm.execute_day_vote({"Bob": 1})
+    with pytest.raises(ValueError):
+        gm.truncate_events(count)
+    gm.start_night()
+    stack.sync_phase(gm)
+    assert len(stack) == 0
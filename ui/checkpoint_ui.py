@@ -0,0 +1,123 @@
+from datetime import datetime
+import streamlit as st
+from game.checkpoint import encode_checkpoint
+from game.rooms import RoomRegistry, ROOM_CHECKPOINT_PREFIX
+from ui.resources import get_checkpoint_store
+
+# チェックポイントを取る画面
+CHECKPOINT_STAGES = ("night_phase", "day_phase")
+
+# ゲームの再開に必要な画面の状態 (GameManager 以外)
+SESSION_KEYS = [
+    "player_count", "player_names", "role_counts", "debug_mode_enabled", "multi_device",
+    "current_player_index", "night_actions",
+    "day_votes", "batch_vote_mode", "execution_processed", "last_execution_result", "last_executed_name",
+    "last_night_victims", "last_night_immoral_suicides", "discussion_timer",
+]
+SESSION_KEY_PREFIXES = ("action_confirmed_",)
+
+# ブラウザを再読み込みしても再開できるよう、URL のクエリパラメータにゲームIDを入れておく
+QUERY_PARAM = "game"
+
+
+def save_checkpoint():
+    """
+    進行中のゲームのチェックポイントを取る (app.py が毎回の描画の最後に呼ぶ)。
+    スナップショットの作成はこのスレッドで行い (1ミリ秒未満)、ファイルへの書き込みはバックグラウンドで行う。
+    """
+    stage = st.session_state.get("stage")
+    gm = st.session_state.get("game_manager")
+    if stage not in CHECKPOINT_STAGES or gm is None:
+        return
+    session = {key: st.session_state[key] for key in SESSION_KEYS if key in st.session_state}
+    for key in st.session_state.keys():
+        if key.startswith(SESSION_KEY_PREFIXES):
+            session[key] = st.session_state[key]
+    # ルームのゲームはルームのチェックポイントに書く (再起動後もルームコードで開ける)
+    room_code = st.session_state.get("room_code")
+    if room_code:
+        get_checkpoint_store().save(RoomRegistry.checkpoint_id(room_code), encode_checkpoint(gm, session, stage))
+        return
+    get_checkpoint_store().save(gm.game_id, encode_checkpoint(gm, session, stage))
+    if st.query_params.get(QUERY_PARAM) != gm.game_id:
+        st.query_params[QUERY_PARAM] = gm.game_id
+
+
+def restore_checkpoint(game_id: str) -> bool:
+    """チェックポイントからゲームと画面の状態を復元する。見つからなければ False"""
+    loaded = get_checkpoint_store().load(game_id)
+    if loaded is None:
+        return False
+    gm, header = loaded
+    for key, value in header["session"].items():
+        st.session_state[key] = value
+    st.session_state.game_manager = gm
+    st.session_state.stage = header["stage"]
+    st.query_params[QUERY_PARAM] = game_id
+    return True
+
+
+def discard_checkpoint(game_id: str):
+    """チェックポイントを削除する (ゲーム終了時や、再開しないことを選んだ場合)"""
+    get_checkpoint_store().delete(game_id)
+    if st.query_params.get(QUERY_PARAM) == game_id:
+        del st.query_params[QUERY_PARAM]
+
+
+def pending_resume_game_id():
+    """URL に再開できるゲームIDがあれば返す"""
+    game_id = st.query_params.get(QUERY_PARAM)
+    if game_id and get_checkpoint_store().header(game_id) is not None:
+        return game_id
+    return None
+
+
+def _describe(checkpoint) -> str:
+    saved_at = datetime.fromtimestamp(checkpoint["saved_at"]).strftime("%m/%d %H:%M")
+    phase = "夜" if checkpoint["stage"] == "night_phase" else "昼"
+    return f"{saved_at} - {checkpoint['turn']}日目 {phase} ({', '.join(checkpoint['players'])})"
+
+
+def render_resume():
+    """中断したゲームの再開を確認する画面"""
+    st.header("中断したゲーム")
+    game_id = st.session_state.get("resume_game_id")
+    checkpoint = get_checkpoint_store().header(game_id) if game_id else None
+    if checkpoint is None:
+        st.warning("再開できるゲームが見つかりませんでした。")
+        if st.button("設定に戻る"):
+            st.session_state.stage = 'initial_setup'
+            st.rerun()
+        return
+    st.info(f"途中で中断されたゲームがあります: {_describe(checkpoint)}")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("続きから再開する"):
+            if restore_checkpoint(game_id):
+                del st.session_state.resume_game_id
+            else:
+                st.session_state.stage = 'initial_setup'
+            st.rerun()
+    with col2:
+        if st.button("破棄して新しいゲームを始める"):
+            discard_checkpoint(game_id)
+            del st.session_state.resume_game_id
+            st.session_state.stage = 'initial_setup'
+            st.rerun()
+
+
+def render_saved_games():
+    """設定画面に、中断したゲームの一覧と再開ボタンを表示する"""
+    # 退避中のルームはルームコードで参加するため、ここには出さない
+    checkpoints = [c for c in get_checkpoint_store().list_checkpoints()
+                   if not c["game_id"].startswith(ROOM_CHECKPOINT_PREFIX)]
+    if not checkpoints:
+        return
+    with st.expander(f"中断したゲームを再開 ({len(checkpoints)} 件)"):
+        for checkpoint in checkpoints[:10]:
+            col1, col2 = st.columns([4, 1])
+            col1.write(_describe(checkpoint))
+            if col2.button("再開", key=f"resume_{checkpoint['game_id']}"):
+                if restore_checkpoint(checkpoint["game_id"]):
+                    st.rerun()
+                st.error("チェックポイントを読み込めませんでした。")
@@ -1,9 +1,184 @@
 import streamlit as st
 from collections import Counter
+import config.settings as settings
+from game.tally import VoteTally
+from ui.undo_ui import push_undo_point, render_undo_controls, clear_undo
+from ui.room_ui import room_fragment, rerun_fragment
+from ui.timer_ui import render_discussion_timer
+
+DEFAULT_LARGE_LOBBY_PLAYERS = 16 # 生存者がこの人数以上なら、大人数向けの投票画面 (ページ分けした投票用紙) にする
+DEFAULT_BALLOT_PAGE_SIZE = 10    # 投票用紙の1ページの人数
+
+def execute_vote(gm, state, vote_counts: Counter):
+    """
+    得票数で処刑を実行し、結果を画面の状態に保存する。
+    state は st.session_state、またはルームの画面の状態 (複数端末のゲームで、最後の投票がそろったとき)。
+    """
+    execution_result = gm.execute_day_vote(vote_counts)
+    state["last_execution_result"] = execution_result
+    state["last_executed_name"] = execution_result.get("executed")
+    state["execution_processed"] = True
+    return execution_result
+
+
+def _current_tally() -> VoteTally:
+    """
+    day_votes の集計。集計は day_votes と同じ辞書を持つ間だけ使い回し、
+    取り消しやチェックポイントからの復元で day_votes が置き換わっていれば数え直す。
+    """
+    votes = st.session_state.day_votes
+    tally = st.session_state.get("vote_tally")
+    if tally is None or tally.votes is not votes:
+        tally = VoteTally(votes)
+        st.session_state.vote_tally = tally
+    return tally
+
+
+def _record_votes(gm, changes, label: str) -> VoteTally:
+    """投票 (投票者 → 投票先) をまとめて記録する。取り消しの地点は1つだけ作る"""
+    push_undo_point(label)
+    tally = _current_tally().apply(changes)
+    st.session_state.vote_tally = tally
+    st.session_state.day_votes = tally.votes
+    for voter_name, voted_name in changes.items():
+        gm.record_vote(voter_name, voted_name)
+    return tally
+
+
+def _render_ballot_form(gm, alive_player_names: tuple):
+    """
+    大人数向けの投票用紙。投票者をページに分けて表にし、1ページ分の投票をフォームでまとめて確定する
+    (選んでいる間は再実行されず、確定したときに1回だけ再実行される)。
+    投票先は文字を入力して絞り込める選択欄で選ぶ。
+    """
+    page_size = getattr(settings, "BALLOT_PAGE_SIZE", DEFAULT_BALLOT_PAGE_SIZE)
+    col1, col2 = st.columns([3, 1])
+    query = col1.text_input("投票者を名前で絞り込む", key="ballot_search")
+    only_missing = col2.checkbox("未投票のみ", key="ballot_only_missing")
+    voters = [name for name in alive_player_names if query.strip() in name]
+    if only_missing:
+        voters = _current_tally().missing(voters)
+    if not voters:
+        st.caption("該当する投票者はいません。")
+        return
+    page_count = (len(voters) + page_size - 1) // page_size
+    page = 1
+    if page_count > 1:
+        if st.session_state.get("ballot_page", 1) > page_count: # 絞り込みでページが減った
+            st.session_state.ballot_page = page_count
+        page = st.number_input(f"ページ (全 {page_count} ページ・{len(voters)} 人)",
+                               min_value=1, max_value=page_count, key="ballot_page")
+    page_voters = voters[(page - 1) * page_size:page * page_size]
+
+    votes = st.session_state.day_votes
+    options = ("",) + alive_player_names
+    with st.form("ballot_form"):
+        selections = {}
+        for voter_name in page_voters:
+            col1, col2 = st.columns([1, 2])
+            col1.write(f"🗳️ {voter_name}" + (" ✅" if voter_name in votes else ""))
+            current_vote = votes.get(voter_name, "")
+            selections[voter_name] = col2.selectbox(
+                f"{voter_name} さんの投票先", options=options, key=f"vote_select_{voter_name}",
+                index=options.index(current_vote) if current_vote in options else 0,
+                format_func=lambda name: name or "(未投票)", label_visibility="collapsed")
+        submitted = st.form_submit_button("このページの投票を確定する")
+    if submitted:
+        changes = {voter: voted for voter, voted in selections.items() if voted and voted != votes.get(voter)}
+        if changes:
+            _record_votes(gm, changes, f"{len(changes)} 人の投票 ({', '.join(changes)})")
+            st.success(f"{len(changes)} 人の投票を記録しました。")
+
+
+def _render_tally(tally: VoteTally, alive_count: int):
+    """投票の途中経過 (得票数の上位)"""
+    st.info(f"投票状況: {len(tally)} / {alive_count} 人")
+    if tally.counts:
+        st.write("得票数 (上位): " + " ・ ".join(f"{name} {count} 票" for name, count in tally.counts.most_common(5)))
+
+
+@room_fragment
+def _render_voting():
+    """個別投票モードの投票・取り消し・集計。投票してもこの部分だけを再実行し、議論タイマーなどは描画し直さない"""
+    gm = st.session_state.game_manager
+    multi_device = st.session_state.get("multi_device", False)
+    view = gm.phase_view() # 生存者の並びは昼の間使い回す (処刑などで死亡が出るまで作り直さない)
+    alive_players = view.alive
+    alive_player_names = view.alive_names
+    large_lobby = len(alive_players) >= getattr(settings, "LARGE_LOBBY_PLAYERS", DEFAULT_LARGE_LOBBY_PLAYERS)
+
+    # 各自の端末で参加するゲームでは、各端末から投票する
+    if multi_device:
+        from ui.device_ui import render_device_votes
+        render_device_votes(gm, alive_players)
+    # 大人数のゲームでは、人数 x 人数のラジオボタンの代わりに投票用紙をページごとにまとめて入力する
+    elif large_lobby:
+        if not st.session_state.get("execution_processed", False):
+            _render_ballot_form(gm, alive_player_names)
+    else:
+        for player in alive_players:
+            voter_name = player.name
+            current_vote = st.session_state.day_votes.get(voter_name)
+            with st.expander(f"🗳️ {voter_name} さんの投票" + (f"済み: {current_vote}" if current_vote else " （クリックして投票）"), expanded=(not current_vote)):
+                st.write(f"**{voter_name} さん、処刑したい人に投票してください。**")
+                voted_name = st.radio(
+                    "投票先:",
+                    options=alive_player_names,
+                    key=f"vote_radio_{voter_name}",
+                    index=alive_player_names.index(current_vote) if current_vote in alive_player_names else None,
+                    label_visibility="collapsed"
+                )
+
+                if voted_name and voted_name != current_vote:
+                    _record_votes(gm, {voter_name: voted_name}, f"{voter_name} さんの投票 ({voted_name})")
+                    st.info(f"{voter_name} さんは {voted_name} さんに投票しました。")
+                    rerun_fragment() # 見出しと集計を更新する (画面全体は描画し直さない)
+
+    st.markdown("--- ")
+    if not st.session_state.get("execution_processed", False) and not multi_device:
+        render_undo_controls()
+
+    # --- 投票締め切りと処刑実行ロジック・投票状況表示 ---
+    tally = _current_tally()
+    all_voted = len(tally) == len(alive_players)
+
+    if 'execution_processed' not in st.session_state:
+        st.session_state.execution_processed = False
+
+    if all_voted:
+        st.subheader("投票結果")
+        vote_counts = tally.counts
+        st.write("各プレイヤーへの得票数:")
+        for name, count in vote_counts.most_common():
+            st.write(f"- {name}: {count} 票")
+        st.markdown("--- ")
+
+        # 各自の端末で参加するゲームでは、最後の投票がそろった時点でゲームサーバーが処刑を実行する
+        if not st.session_state.execution_processed and multi_device:
+            st.info("処刑を実行しています...")
+        # まだ処刑処理が行われていない場合のみ、処刑ボタンを表示・処理
+        elif not st.session_state.execution_processed:
+            if st.button("投票を締め切り、処刑を実行する"):
+                execute_vote(gm, st.session_state, vote_counts)
+                clear_undo() # 処刑は取り消せない
+                if gm.debug_mode:
+                    st.write("DEBUG: Setting execution_processed to True.")
+                st.rerun() # 処刑結果と次へのボタンは画面全体の描画で表示する
+    elif large_lobby and not multi_device:
+        _render_tally(tally, len(alive_players))
+    elif not multi_device: # まだ全員投票していない場合 (各自の端末の場合は render_device_votes が表示する)
+        # --- 投票状況の表示エリア ---
+        st.info(f"投票状況: {len(tally)} / {len(alive_players)} 人")
+
 
 def render_day_phase():
     """昼フェーズのUIを描画する"""
     gm = st.session_state.game_manager # gm を最初に取得
+    multi_device = st.session_state.get("multi_device", False)
+    if multi_device:
+        # 各自の端末で参加するゲーム (device_ui が day_ui を使うため、ここでインポート)
+        from ui.device_ui import render_sync, notify_devices
+        render_sync() # 他の端末の投票・処刑・夜への移行を待つ
     # デバッグ: day_phase ステージ開始時のフラグ状態確認
     if gm.debug_mode:
         st.write(f"DEBUG: Entering day_phase. execution_processed = {st.session_state.get('execution_processed')}")
@@ -36,78 +211,15 @@ def render_day_phase():
 
     # --- 生存者表示 ---
     st.subheader("生存者")
-    alive_players = gm.get_alive_players()
-    alive_player_names = [p.name for p in alive_players]
-    st.write(f"{len(alive_player_names)} 人: {', '.join(alive_player_names)}")
+    view = gm.phase_view()
+    alive_player_names = view.alive_names
+    st.write(view.alive_summary)
 
     st.markdown("--- ")
 
     # 議論時間表示
     st.subheader("議論タイム")
-    discussion_time = st.slider("議論時間 (分)", min_value=1, max_value=10, value=3, step=1)
-    discussion_seconds = discussion_time * 60
-    timer_container = st.empty()
-    timer_html = f"""
-    <div style="background-color:#f0f0f0; padding:10px; border-radius:5px; text-align:center; margin-bottom:10px;">
-      <h3 id="timer">{discussion_time}:00</h3>
-    </div>
-    <button id="start-timer" style="background-color:#4CAF50; color:white; border:none; padding:10px 20px;
-     border-radius:5px; cursor:pointer; margin-right:10px;">開始</button>
-    <button id="reset-timer" style="background-color:#f44336; color:white; border:none; padding:10px 20px;
-     border-radius:5px; cursor:pointer;">リセット</button>
-
-    <script>
-    let timerInterval;
-    let seconds = {discussion_seconds};
-    let isRunning = false;
-
-    function updateTimerDisplay() {{
-      const minutes = Math.floor(seconds / 60);
-      const remainingSeconds = seconds % 60;
-      document.getElementById('timer').textContent =
-        `${{minutes}}:${{remainingSeconds < 10 ? '0' : ''}}${{remainingSeconds}}`;
-    }}
-
-    document.getElementById('start-timer').addEventListener('click', function() {{
-      if (!isRunning) {{
-        isRunning = true;
-        this.textContent = '一時停止';
-        this.style.backgroundColor = '#2196F3';
-
-        timerInterval = setInterval(function() {{
-          if (seconds > 0) {{
-            seconds--;
-            updateTimerDisplay();
-          }} else {{
-            clearInterval(timerInterval);
-            document.getElementById('timer').textContent = '時間切れ！';
-            document.getElementById('timer').style.color = 'red';
-            document.getElementById('start-timer').disabled = true;
-            document.getElementById('start-timer').style.backgroundColor = '#cccccc';
-          }}
-        }}, 1000);
-      }} else {{
-        isRunning = false;
-        this.textContent = '再開';
-        this.style.backgroundColor = '#4CAF50';
-        clearInterval(timerInterval);
-      }}
-    }});
-
-    document.getElementById('reset-timer').addEventListener('click', function() {{
-      clearInterval(timerInterval);
-      seconds = {discussion_seconds};
-      updateTimerDisplay();
-      isRunning = false;
-      document.getElementById('start-timer').textContent = '開始';
-      document.getElementById('start-timer').style.backgroundColor = '#4CAF50';
-      document.getElementById('start-timer').disabled = false;
-      document.getElementById('timer').style.color = 'black';
-    }});
-    </script>
-    """
-    with timer_container:
-        st.components.v1.html(timer_html, height=150)
+    render_discussion_timer() # 残り時間はサーバー側でルームごとに持ち、全端末で共有する
 
     st.markdown("--- ")
 
@@ -125,10 +237,9 @@ def render_day_phase():
     # --- 一括処刑モード --- 
     if st.session_state.batch_vote_mode:
         st.info("議論の結果、処刑する対象者を一人選択してください。")
-        vote_options = alive_player_names
         selected_target = st.selectbox(
             "処刑対象者:",
-            options=[""] + vote_options, # 未選択を許容
+            options=("",) + alive_player_names, # 未選択を許容
             key="batch_execute_target"
         )
 
@@ -138,66 +249,21 @@ def render_day_phase():
                 if selected_target:
                     # 選択された対象者に1票だけ入ったCounterを作成
                     vote_counts = Counter({selected_target: 1})
-                    execution_result = gm.execute_day_vote(vote_counts)
-                    st.session_state.last_execution_result = execution_result
-                    st.session_state.last_executed_name = execution_result.get("executed")
-                    st.session_state.execution_processed = True
+                    execute_vote(gm, st.session_state, vote_counts)
+                    clear_undo() # 処刑は取り消せない
+                    if multi_device:
+                        notify_devices()
                     st.success(f"{selected_target} の処刑を決定しました。")
                 else:
                     st.warning("処刑対象者を選択してください。")
 
-    # --- 個別投票モード --- 
-    else:
-        for player in alive_players:
-            voter_name = player.name
-            current_vote = st.session_state.day_votes.get(voter_name)
-            with st.expander(f"🗳️ {voter_name} さんの投票" + (f"済み: {current_vote}" if current_vote else " （クリックして投票）"), expanded=(not current_vote)):
-                st.write(f"**{voter_name} さん、処刑したい人に投票してください。**")
-                vote_options = alive_player_names
+        st.markdown("--- ")
+        if not st.session_state.get("execution_processed", False) and not multi_device:
+            render_undo_controls()
 
-                voted_name = st.radio(
-                    "投票先:",
-                    options=vote_options,
-                    key=f"vote_radio_{voter_name}",
-                    index=vote_options.index(current_vote) if current_vote in vote_options else None,
-                    label_visibility="collapsed"
-                )
-
-                if voted_name and voted_name != current_vote:
-                    st.session_state.day_votes[voter_name] = voted_name
-                    st.info(f"{voter_name} さんは {voted_name} さんに投票しました。")
-                    st.rerun()
-
-    st.markdown("--- ")
-
-    # --- 投票締め切りと処刑実行ロジック・投票状況表示 (個別投票モード時のみ) ---
-    if not st.session_state.batch_vote_mode:
-        all_voted = len(st.session_state.day_votes) == len(alive_players)
-
-        if 'execution_processed' not in st.session_state:
-            st.session_state.execution_processed = False
-
-        if all_voted:
-            st.subheader("投票結果")
-            vote_counts = Counter(st.session_state.day_votes.values())
-            st.write("各プレイヤーへの得票数:")
-            for name, count in vote_counts.most_common():
-                st.write(f"- {name}: {count} 票")
-            st.markdown("--- ")
-
-            # まだ処刑処理が行われていない場合のみ、処刑ボタンを表示・処理
-            if not st.session_state.execution_processed:
-                if st.button("投票を締め切り、処刑を実行する"):
-                    execution_result = gm.execute_day_vote(vote_counts)
-                    st.session_state.last_execution_result = execution_result
-                    st.session_state.last_executed_name = execution_result.get("executed")
-                    st.session_state.execution_processed = True
-                    if gm.debug_mode:
-                        st.write("DEBUG: Setting execution_processed to True. No rerun here.")
-                    # リラン不要、下の処理で結果が表示される
-        else: # まだ全員投票していない場合
-            # --- 投票状況の表示エリア (個別投票モード時のみ) --- 
-            st.info(f"投票状況: {len(st.session_state.day_votes)} / {len(alive_players)} 人")
+    # --- 個別投票モード: 投票・取り消し・集計 (投票してもこの部分だけが再実行される) ---
+    else:
+        _render_voting()
 
     # --- 処刑結果の取得 (共通処理) ---
     execution_result_to_display = None
@@ -246,6 +312,7 @@ def render_day_phase():
                     st.warning("DEBUG: 'Proceed to Night' button clicked!")
                 st.info("夜フェーズへ移行します。")
                 st.session_state.stage = 'night_phase'
+                gm.start_night()
                 if gm.debug_mode:
                     st.write(f"DEBUG: Set stage to {st.session_state.stage}")
                 st.session_state.current_player_index = 0
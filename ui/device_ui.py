@@ -0,0 +1,248 @@
+import functools
+from collections import Counter
+import streamlit as st
+from game.game_manager import TARGETED_ACTION_TYPES
+from game.game_server import PHASE_NIGHT, PHASE_VOTE, STATE_OPEN, STATE_ERROR
+from ui.resources import get_game_server, get_room_registry
+from ui.night_ui import finish_night
+from ui.day_ui import execute_vote
+from ui.room_ui import room_fragment
+
+# 各自の端末で参加するゲーム (multi_device) の画面。
+# 夜アクションと投票はゲームサーバー (game/game_server.py) が各端末から並行して受け付け、
+# 最後の提出が届いた時点でルームのゲームを進める。待っている端末は状況をポーリングし、変化したら再描画する。
+
+# この端末のプレイヤー (ルームでは共有しない)。再読み込みしても同じ席に戻れるよう URL にも入れる
+SEAT_PARAM = "seat"
+MODERATOR = "進行役 (見るだけ)"
+PLACEHOLDER = "選択してください"
+# 待っている端末が状況を確認する間隔
+SYNC_INTERVAL = "1s"
+SUBMIT_TIMEOUT = 5.0 # 秒
+
+
+# --- フェーズの解決 (最後の提出がそろったとき、ゲームサーバーが別スレッドで呼ぶ) ---
+def _resolve_in_room(registry, code: str, stage: str, turn: int, apply, submissions):
+    """ルームのロックを取り、まだ同じフェーズにいれば apply(room, 提出) でゲームを進める"""
+    try:
+        with registry.open(code) as room:
+            if room.stage == stage and room.gm.turn == turn:
+                apply(room, submissions)
+    except KeyError:
+        pass # ルームが削除された
+
+
+def _apply_night(room, submissions):
+    room.session["night_actions"] = dict(submissions)
+    finish_night(room.gm, room.session)
+    room.stage = 'day_phase'
+
+
+def _apply_votes(room, submissions):
+    if room.session.get("execution_processed") or room.session.get("batch_vote_mode"):
+        return
+    room.session["day_votes"] = dict(submissions)
+    execute_vote(room.gm, room.session, Counter(submissions.values()))
+
+
+def _ensure_phase(kind: str, stage: str, expected, submitted, apply):
+    """ゲームサーバーに現在のフェーズを開く (開いていれば何もしない)。状況を返す"""
+    code = st.session_state.room_code
+    turn = st.session_state.game_manager.turn
+    on_complete = functools.partial(_resolve_in_room, get_room_registry(), code, stage, turn, apply)
+    return get_game_server().open_phase(code, kind, turn, expected, submitted, on_complete).result(SUBMIT_TIMEOUT)
+
+
+def _submit(kind: str, player_name: str, data):
+    gm = st.session_state.game_manager
+    get_game_server().submit(st.session_state.room_code, kind, gm.turn, player_name, data).result(SUBMIT_TIMEOUT)
+
+
+def notify_devices():
+    """ゲームサーバーを経由しない進行 (一括処刑など) を、他の端末に再描画させる"""
+    if st.session_state.get("multi_device") and st.session_state.get("room_code"):
+        get_game_server().notify(st.session_state.room_code)
+
+
+# --- 同期 ---
+@st.fragment(run_every=SYNC_INTERVAL)
+def _watch(code: str, version: int):
+    # この部分だけを定期的に再実行し、ルームの状況が変わったときだけ画面全体を描画し直す
+    if get_game_server().version(code) != version:
+        st.rerun(scope="app")
+
+
+def render_sync():
+    """他の端末の提出やフェーズの解決を待つ (状況が変わったら再描画する)"""
+    code = st.session_state.get("room_code")
+    if code:
+        _watch(code, get_game_server().version(code))
+
+
+# --- 席 ---
+def current_seat():
+    """この端末のプレイヤー名 (進行役なら MODERATOR)。未選択なら None"""
+    seat = st.session_state.get("device_seat") or st.query_params.get(SEAT_PARAM)
+    gm = st.session_state.get("game_manager")
+    if gm is not None and seat not in [p.name for p in gm.players] + [MODERATOR]:
+        return None
+    return seat
+
+
+def _render_seat_picker(gm) -> bool:
+    """この端末のプレイヤーを選ばせる。選択済みなら True"""
+    if current_seat() is not None:
+        return True
+    st.subheader("この端末で参加するプレイヤー")
+    choice = st.selectbox("あなたは誰ですか？", options=[PLACEHOLDER] + [p.name for p in gm.players] + [MODERATOR],
+                          key="device_seat_select")
+    if st.button("この端末で参加する", disabled=choice == PLACEHOLDER, key="device_seat_button"):
+        st.session_state.device_seat = choice
+        st.query_params[SEAT_PARAM] = choice
+        st.rerun()
+    return False
+
+
+def render_seat_sidebar():
+    """サイドバーに、この端末のプレイヤーと変更ボタンを表示する"""
+    if not st.session_state.get("room_code") or not st.session_state.get("multi_device"):
+        return
+    seat = st.session_state.get("device_seat") or st.query_params.get(SEAT_PARAM)
+    if seat:
+        st.sidebar.markdown(f"この端末: **{seat}**")
+        if st.sidebar.button("プレイヤーを変更", key="device_seat_change"):
+            clear_seat()
+            st.rerun()
+
+
+def clear_seat():
+    st.session_state.pop("device_seat", None)
+    st.session_state.pop("device_night_result", None)
+    if SEAT_PARAM in st.query_params:
+        del st.query_params[SEAT_PARAM]
+
+
+def _render_progress(status, label: str):
+    pending = [name for name in status["expected"] if name not in status["submitted"]]
+    st.progress(len(status["submitted"]) / max(len(status["expected"]), 1),
+                text=f"{label}: {len(status['submitted'])} / {len(status['expected'])} 人")
+    if status["state"] == STATE_ERROR:
+        st.error(f"フェーズの解決に失敗しました: {status['error']}")
+    elif pending:
+        st.caption("待っているプレイヤー: " + ", ".join(pending))
+
+
+# --- 夜 ---
+def _night_result_message(gm, player, action_data):
+    """夜アクションを提出したプレイヤーに表示する内容 (占い結果はここでイベントとして記録される)"""
+    action_type = action_data["type"]
+    target = action_data.get("target")
+    if action_type == "seer" and target:
+        seer_result = gm.get_seer_result(player, target)
+        if player.role.name == "偽占い師":
+            return f"占い結果（偽）: **{target}** さんは **{seer_result}** です。"
+        return f"占い結果: **{target}** さんは **{seer_result}** です。"
+    if action_type == "medium":
+        executed_player = next((p for p in gm.players if p.name == gm.last_executed_name), None)
+        if executed_player:
+            return f"昨晩処刑された {gm.last_executed_name} は **{executed_player.role.medium_result()}** でした。"
+        return "昨晩は処刑がありませんでした。"
+    if target:
+        return f"あなたは **{target}** さんを選択しました。"
+    return None
+
+
+def _render_night_action(gm, player, view):
+    """夜アクションの選択と提出 (view は夜の表示用データ GameManager.phase_view)"""
+    st.info(f"あなたの役職は **{view.display_roles[player.name]}** です。")
+    action_type = view.action_types[player.name]
+    action_data = {"type": action_type}
+    can_confirm = True
+    if action_type in TARGETED_ACTION_TYPES:
+        target_options = view.night_targets[player.name]
+        if not target_options:
+            st.info("選択できる対象がいません。")
+        else:
+            target = st.selectbox(view.action_labels[player.name],
+                                  options=(PLACEHOLDER,) + target_options, key=f"device_target_{gm.turn}")
+            can_confirm = target != PLACEHOLDER
+            if can_confirm:
+                action_data["target"] = target
+        button_label = "アクションを確定する"
+    elif action_type == "medium":
+        button_label = "結果を確認する"
+    else:
+        st.write("このターンでは、特に必要なアクションはありません。")
+        button_label = "確認しました"
+    if st.button(button_label, disabled=not can_confirm, key=f"device_confirm_{gm.turn}"):
+        # 提出より先に結果を記録する (最後の提出だと、直後にフェーズが解決されるため)
+        st.session_state.device_night_result = (gm.turn, _night_result_message(gm, player, action_data))
+        _submit(PHASE_NIGHT, player.name, action_data)
+        # 再起動後もゲームサーバーに引き継げるよう、ルームの画面の状態にも残す
+        st.session_state.night_actions = {**st.session_state.night_actions, player.name: action_data}
+        st.rerun()
+
+
+@room_fragment
+def _render_night_panel(player_name: str):
+    """夜アクションの入力 (対象を選んでもこの部分だけを再実行する)"""
+    gm = st.session_state.game_manager
+    view = gm.phase_view()
+    player = view.player(player_name)
+    if player is not None:
+        _render_night_action(gm, player, view)
+
+
+def _render_night_result(turn: int):
+    """提出した夜アクションの結果 (占い結果など)。昼になってからも表示する"""
+    result = st.session_state.get("device_night_result")
+    if result and result[0] == turn and result[1]:
+        st.info(result[1])
+
+
+def render_device_night():
+    """夜フェーズ (各自の端末で参加するゲーム)"""
+    gm = st.session_state.game_manager
+    st.header(f"ターン {gm.turn}: 夜🔮")
+    view = gm.phase_view()
+    status = _ensure_phase(PHASE_NIGHT, 'night_phase', list(view.alive_names),
+                           st.session_state.get("night_actions", {}), _apply_night)
+    if not _render_seat_picker(gm):
+        return
+    seat = current_seat()
+    player = view.player(seat)
+    if player is not None and player.name not in status["submitted"] and status["state"] == STATE_OPEN:
+        st.subheader(f"{player.name} さんの夜")
+        st.warning("⚠️ 画面を他の人に見せないでください。")
+        _render_night_panel(player.name)
+    elif player is not None:
+        st.success("夜のアクションを提出しました。全員がそろうと昼になります。")
+        _render_night_result(gm.turn)
+    elif seat != MODERATOR:
+        st.info("あなたは死亡しています。夜が明けるのを待っています。")
+    _render_progress(status, "提出済み")
+    render_sync()
+
+
+# --- 昼 ---
+def render_device_votes(gm, alive_players):
+    """昼の投票 (各自の端末で参加するゲーム)。最後の投票がそろうと処刑が実行される"""
+    _render_night_result(gm.turn - 1)
+    if st.session_state.get("execution_processed"):
+        return
+    names = [p.name for p in alive_players]
+    status = _ensure_phase(PHASE_VOTE, 'day_phase', names, st.session_state.get("day_votes", {}), _apply_votes)
+    if not _render_seat_picker(gm):
+        return
+    seat = current_seat()
+    if seat in names and status["state"] == STATE_OPEN:
+        current_vote = st.session_state.day_votes.get(seat)
+        st.write(f"**{seat} さん、処刑したい人に投票してください。**" + (" (全員の投票がそろうまで変更できます)" if current_vote else ""))
+        voted_name = st.radio("投票先:", options=names, index=names.index(current_vote) if current_vote in names else None,
+                              key=f"device_vote_{gm.turn}", label_visibility="collapsed")
+        if voted_name and voted_name != current_vote:
+            _submit(PHASE_VOTE, seat, voted_name)
+            st.session_state.day_votes = {**st.session_state.day_votes, seat: voted_name}
+            gm.record_vote(seat, voted_name)
+            st.rerun()
+    _render_progress(status, "投票済み")
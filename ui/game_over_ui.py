@@ -1,8 +1,48 @@
 import streamlit as st
 import pandas as pd
-import os
-import json
-from datetime import datetime
+from game.results_store import build_game_record
+from ui.resources import get_results_writer
+from ui.checkpoint_ui import discard_checkpoint
+from ui.replay_ui import start_replay
+from ui.room_ui import leave_room
+from ui.device_ui import clear_seat
+
+def _submit_result(gm):
+    """結果の書き込みを依頼する (ゲームIDごとに1回)。書き込みが終わったかは返す Future で確かめる"""
+    pending = st.session_state.get("saved_game")
+    if pending is None or pending[0] != gm.game_id:
+        pending = (gm.game_id, get_results_writer().submit(build_game_record(gm)))
+        st.session_state.saved_game = pending
+    return pending[1]
+
+
+@st.fragment(run_every=0.5)
+def _wait_for_save(future):
+    """書き込みが終わるまで、この部分だけを再実行して待つ (ルームのゲームには触れないので room_fragment にしない)"""
+    if future.done():
+        st.rerun() # 結果は画面全体の描画で表示する
+    st.info("結果を保存しています...")
+
+
+def _render_save_status(gm):
+    """結果の保存の状況。書き込みが確認できてから、保存済みの表示とチェックポイントの削除を行う"""
+    try:
+        future = _submit_result(gm)
+    except Exception as e:
+        st.error(f"結果の保存中にエラーが発生しました: {e}")
+        return
+    if not future.done():
+        _wait_for_save(future)
+        return
+    error = future.exception()
+    if error is not None:
+        st.error(f"結果を保存できませんでした: {error} (記録は {get_results_writer().dead_letter_path} に退避しました)")
+        return
+    if st.session_state.get("saved_game_id") != gm.game_id:
+        discard_checkpoint(gm.game_id) # 終了したゲームは再開の対象から外す
+        st.session_state.saved_game_id = gm.game_id
+    st.success(f"結果を保存しました。(ゲームID: {gm.game_id})")
+
 
 def render_game_over():
     """ゲーム終了画面のUIを描画する"""
@@ -31,23 +71,19 @@ def render_game_over():
             st.error(f"結果の表示中にエラーが発生しました: {e}")
             st.write("ゲーム結果データ:", game_results) # デバッグ用に元データを表示
 
-        # --- 結果のファイル保存 ---
-        try:
-            results_dir = "result"
-            os.makedirs(results_dir, exist_ok=True) # result ディレクトリがなければ作成
-            now = datetime.now()
-            filename = now.strftime("%Y%m%d_%H%M%S") + ".json"
-            filepath = os.path.join(results_dir, filename)
-
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(game_results, f, ensure_ascii=False, indent=4)
-            st.success(f"結果を {filepath} に保存しました。")
-        except Exception as e:
-            st.error(f"結果の保存中にエラーが発生しました: {e}")
+        # --- 結果の保存 (バックグラウンドで書き込み、ゲームIDごとに1件) ---
+        gm = st.session_state.game_manager
+        _render_save_status(gm)
+
+        if st.button("リプレイを見る"):
+            start_replay(gm.game_id, gm.events, 'game_over')
+            st.rerun()
 
     st.markdown("--- ")
     # --- 新しいゲームボタン ---
     if st.button("新しいゲームを始める"):
+         leave_room(close=True)
+         clear_seat()
          keys_to_delete = list(st.session_state.keys())
          for key in keys_to_delete:
              del st.session_state[key]
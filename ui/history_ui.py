@@ -0,0 +1,114 @@
+import streamlit as st
+import pandas as pd
+from game.results_store import ResultsStore, read_data_version
+from game.events import event_from_dict
+from game.role import role_dict
+from ui.resources import results_db_path
+from ui.replay_ui import start_replay
+
+PAGE_SIZE = 20
+ALL = "すべて"
+# 勝利陣営の選択肢 (役職の陣営から作る)
+TEAMS = list(dict.fromkeys(role_dict[name](0).team for name in role_dict))
+
+
+# 1ページぶんの一覧。キャッシュのキーにデータのバージョン (ゲームが追加されるたびに増える) を含めるため、
+# 新しいゲームが保存されると自動的に取り直す。同じ条件・ページの再描画ではデータベースに問い合わせない。
+@st.cache_data(max_entries=256, show_spinner=False)
+def _fetch_page(db_path: str, version: int, filters: tuple, after, limit: int):
+    store = ResultsStore(db_path)
+    try:
+        return store.list_games(**dict(filters), after=after, limit=limit)
+    finally:
+        store.close()
+
+
+# ゲームの詳細 (結果と進行イベント)。保存済みのゲームは変わらないので、ゲームIDだけをキーにする
+@st.cache_data(max_entries=64, show_spinner=False)
+def _fetch_game(db_path: str, game_id: str):
+    store = ResultsStore(db_path)
+    try:
+        return store.get_game(game_id)
+    finally:
+        store.close()
+
+
+def _render_filters() -> tuple:
+    """絞り込みの入力欄。条件を (名前, 値) のタプルで返す (キャッシュのキーにするため)"""
+    with st.expander("絞り込み", expanded=False):
+        col1, col2 = st.columns(2)
+        dates = col1.date_input("期間", value=(), key="history_dates")
+        winner = col2.selectbox("勝利陣営", options=[ALL] + TEAMS, key="history_winner")
+        player = col1.text_input("プレイヤー名", key="history_player").strip()
+        player_count = col2.number_input("プレイヤー数 (0 はすべて)", min_value=0, value=0, step=1,
+                                         key="history_player_count")
+        roles = st.multiselect("含まれる役職", options=list(role_dict.keys()), key="history_roles")
+    filters = []
+    if len(dates) >= 1:
+        filters.append(("since", dates[0].isoformat()))
+        filters.append(("until", dates[-1].isoformat()))
+    if winner != ALL:
+        filters.append(("winner", winner))
+    if player:
+        filters.append(("player", player))
+    if player_count:
+        filters.append(("player_count", int(player_count)))
+    if roles:
+        filters.append(("roles", tuple(sorted(roles))))
+    return tuple(filters)
+
+
+def render_history():
+    """保存済みのゲームの一覧 (新しい順、ページ送り)。詳細は開いたゲームの分だけ読み込む"""
+    st.header("対戦履歴📜")
+    db_path = results_db_path()
+    filters = _render_filters()
+    # 条件が変わったら1ページ目に戻る。history_cursors は各ページの先頭の直前のゲーム (1ページ目は None)
+    if st.session_state.get("history_filter_key") != filters:
+        st.session_state.history_filter_key = filters
+        st.session_state.history_cursors = [None]
+    cursors = st.session_state.history_cursors
+
+    # 次のページがあるか分かるよう、1件多く取る
+    games = _fetch_page(db_path, read_data_version(db_path), filters, cursors[-1], PAGE_SIZE + 1)
+    has_next = len(games) > PAGE_SIZE
+    games = games[:PAGE_SIZE]
+
+    if not games:
+        st.info("条件に合うゲームがありません。" if filters or len(cursors) > 1 else "まだ保存されたゲームがありません。")
+    for game in games:
+        label = (f"{game['played_at'][:16]} ・ {game['player_count']}人 ・ {game['turns']}日目まで ・ "
+                 f"{game['winner'] or '勝敗なし'}" + (" 陣営の勝利" if game["winner"] else ""))
+        expander = st.expander(label, key=f"history_game_{game['game_id']}", on_change="rerun")
+        with expander:
+            st.caption(", ".join(game["players"]))
+            if expander.open:
+                _render_game_detail(db_path, game["game_id"])
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    if col1.button("◀ 新しいゲーム", disabled=len(cursors) == 1, key="history_prev"):
+        cursors.pop()
+        st.rerun()
+    col2.write(f"{len(cursors)} ページ目")
+    if col3.button("古いゲーム ▶", disabled=not has_next, key="history_next"):
+        cursors.append((games[-1]["played_at"], games[-1]["game_id"]))
+        st.rerun()
+
+    st.markdown("--- ")
+    if st.button("設定に戻る", key="history_back"):
+        st.session_state.stage = 'initial_setup'
+        st.rerun()
+
+
+def _render_game_detail(db_path: str, game_id: str):
+    record = _fetch_game(db_path, game_id)
+    if record is None:
+        st.warning("ゲームが見つかりませんでした。")
+        return
+    st.dataframe(pd.DataFrame(record["results"])[["名前", "役職", "陣営", "生死", "勝利"]], hide_index=True)
+    if record.get("events"):
+        if st.button("リプレイを見る", key=f"history_replay_{game_id}"):
+            start_replay(game_id, [event_from_dict(e) for e in record["events"]], 'history')
+            st.rerun()
+    else:
+        st.caption("このゲームには進行の記録がありません。")
@@ -1,38 +1,175 @@
 import streamlit as st
+from game.game_manager import TARGETED_ACTION_TYPES
+from ui.undo_ui import push_undo_point, render_undo_controls
+from ui.room_ui import room_fragment
+
+def finish_night(gm, state):
+    """
+    夜のアクション結果を解決して昼に移行し、昼フェーズ用の画面の状態を用意する (画面の切り替えは呼び出し側で行う)。
+    state は st.session_state、またはルームの画面の状態 (複数端末のゲームで、最後の提出がそろったとき)。
+    """
+    # 夜のアクション結果を解決
+    night_results = gm.resolve_night_actions(state["night_actions"])
+    # 結果を画面の状態に保存 (昼フェーズで表示するため)
+    state["last_night_victims"] = night_results.get("victims", [])
+    state["last_night_immoral_suicides"] = night_results.get("immoral_suicides", [])
+    # 必要ならデバッグログも保存
+    # state["last_night_debug_log"] = night_results.get("debug")
+
+    # ★★★ ターンを進め、状態を昼に移行 ★★★
+    gm.start_day()
+    # 昼フェーズ用の状態をリセット
+    state["day_votes"] = {} # 投票情報をリセット
+    state["execution_processed"] = False # 処刑済みフラグをリセット
+    state.pop("last_execution_result", None) # 前の昼の結果をクリア
+    # 夜アクション確認用フラグをクリア
+    for key in [key for key in state.keys() if key.startswith("action_confirmed_")]:
+        del state[key]
+
+
+@room_fragment
+def _render_action_panel(current_player_index: int):
+    """現在のプレイヤーの役職確認とアクション (役職の表示切り替えや対象の選択では、この部分だけを再実行する)"""
+    if st.session_state.get('current_player_index', 0) != current_player_index:
+        st.rerun() # 他の端末で手番が進んだ
+    gm = st.session_state.game_manager
+    view = gm.phase_view() # 生存者・対象・表示文字列は夜の間使い回す (死亡が出るまで作り直さない)
+    current_player = view.alive[current_player_index]
+    action_confirmed_for_current_player = st.session_state.get(f'action_confirmed_{current_player_index}', False)
+
+    # 役職確認エリア
+    role_revealed = st.toggle(f"役職を確認する ( {current_player.name} さんのみ)", key=f"role_toggle_{current_player.name}")
+    if role_revealed:
+        display_role = view.display_roles[current_player.name]
+        st.info(f"あなたの役職は **{display_role}** です。")
+
+        # アクションが必要か判定
+        action_required = current_player.role.has_night_action(gm.turn)
+
+        if action_required:
+            st.markdown("--- ")
+            st.subheader("アクション")
+
+            # アクションが既に確定されている場合 (占い結果表示など)
+            if action_confirmed_for_current_player:
+                action_data = st.session_state.night_actions.get(current_player.name, {})
+                action_type = action_data.get("type")
+                selected_target = action_data.get("target")
+
+                if action_type in ["seer", "attack", "guard"] and selected_target:
+                    st.write(f"あなたは **{selected_target}** さんを選択しました。")
+                    # 占い師・偽占い師の場合、結果を表示
+                    if action_type == "seer" or action_type == "fake_seer":
+                        # 結果は GameManager がイベントとして記録する (再描画しても同じ結果が表示される)
+                        seer_result = gm.get_seer_result(current_player, selected_target)
+                        if seer_result is not None:
+                            if current_player.role.name == "偽占い師":
+                                st.info(f"占い結果（偽）: **{selected_target}** さんは **{seer_result}** です。")
+                            else:
+                                st.info(f"占い結果: **{selected_target}** さんは **{seer_result}** です。")
+                        else:
+                            st.error("対象プレイヤーが見つかりませんでした。")
+
+                elif action_type == "medium":
+                    if gm.last_executed_name:
+                        executed_player = next((p for p in gm.players if p.name == gm.last_executed_name), None)
+                        if executed_player:
+                            medium_result = executed_player.role.medium_result()
+                            st.info(f"昨晩処刑された {gm.last_executed_name} は **{medium_result}** でした。")
+                        else:
+                            st.warning(f"{gm.last_executed_name} の情報が見つかりませんでした。")
+                    else:
+                        st.info("昨晩は処刑がありませんでした。")
+                elif action_type == "none":
+                     st.info("このターンでは、特に必要なアクションはありませんでした。")
+
+                # 次へ進むボタン
+                if st.button("次のプレイヤーへ", key=f"next_player_{current_player.name}"):
+                    push_undo_point(f"{current_player.name} さんの番を終了")
+                    st.session_state[f'action_confirmed_{current_player_index}'] = False
+                    st.session_state.current_player_index = current_player_index + 1
+                    st.rerun()
+
+            # アクションがまだ確定されていない場合 (選択UI表示)
+            else:
+                action_type = "none"
+                selected_target = None
+                can_confirm = False
+
+                # 役職に応じたアクションUIを表示 (対象ルールは GameManager 側で定義)
+                night_action_type = view.action_types[current_player.name]
+                if night_action_type in TARGETED_ACTION_TYPES:
+                    action_label = view.action_labels[current_player.name]
+                    target_options = view.night_targets[current_player.name]
+                    action_type = night_action_type
+
+                    if not target_options:
+                        st.info("選択できる対象がいません。")
+                        can_confirm = True
+                    else:
+                        selected_target = st.selectbox(
+                            action_label,
+                            options=("選択してください",) + target_options,
+                            index=0,
+                            key=f"action_target_{current_player.name}"
+                        )
+                        can_confirm = selected_target != "選択してください"
+
+                elif night_action_type == "medium":
+                    action_type = "medium"
+                    can_confirm = True
+
+                else: # 村人などアクションUI不要な役職
+                    action_type = "none"
+                    can_confirm = True
+                    st.write("あなたのアクションは自動的に処理されるか、現在はありません。")
+
+                # アクション完了ボタン
+                button_label = "アクションを確定する" if current_player.role.name not in ["霊媒師"] else "結果を確認する"
+                if st.button(button_label, key=f"confirm_action_{current_player.name}", disabled=not can_confirm):
+                    action_data = {"type": action_type}
+                    valid_action = True
+
+                    if action_type in ["attack", "seer", "guard"]:
+                        if selected_target and selected_target != "選択してください":
+                            action_data["target"] = selected_target
+                        elif not target_options:
+                            pass
+                        else:
+                            st.error("対象を選択してください。")
+                            valid_action = False
+
+                    if valid_action:
+                        push_undo_point(f"{current_player.name} さんのアクション")
+                        # 取り消し用の記録が古い辞書を参照しているため、書き換えずに置き換える
+                        st.session_state.night_actions = {**st.session_state.night_actions, current_player.name: action_data}
+                        st.session_state[f'action_confirmed_{current_player_index}'] = True
+                        st.rerun()
+
+        else: # action_required が False の場合 (騎士の初日など)
+            st.info("このターンでは、特に必要なアクションはありません。")
+            if st.button("確認しました", key=f"no_action_confirm_{current_player.name}"):
+                push_undo_point(f"{current_player.name} さんの確認")
+                st.session_state.night_actions = {**st.session_state.night_actions, current_player.name: {"type": "none"}}
+                st.session_state[f'action_confirmed_{current_player_index}'] = False
+                st.session_state.current_player_index = current_player_index + 1
+                st.rerun()
+    else:
+        st.write("役職を確認してから、アクションを行ってください。")
+
 
 def render_night_phase():
     """夜フェーズのUIを描画する"""
     gm = st.session_state.game_manager
     st.header(f"ターン {gm.turn}: 夜🔮")
 
-    alive_players = gm.get_alive_players()
+    alive_players = gm.phase_view().alive
     current_player_index = st.session_state.get('current_player_index', 0)
-    action_confirmed_for_current_player = st.session_state.get(f'action_confirmed_{current_player_index}', False)
 
     # 全員の夜アクションが完了したかチェック
     if current_player_index >= len(alive_players):
-        # 夜のアクション結果を解決
-        night_results = gm.resolve_night_actions(st.session_state.night_actions)
-        # 結果をセッション状態に保存 (昼フェーズで表示するため)
-        st.session_state.last_night_victims = night_results.get("victims", [])
-        st.session_state.last_night_immoral_suicides = night_results.get("immoral_suicides", [])
-        # 必要ならデバッグログも保存
-        # st.session_state.last_night_debug_log = night_results.get("debug")
-
-        # 勝利判定
-        victory_info = gm.check_victory()
-        # ★★★ ターンを進め、状態を昼に移行 ★★★
-        gm.turn += 1
+        finish_night(gm, st.session_state)
         st.session_state.stage = 'day_phase'
-        # 昼フェーズ用の状態をリセット
-        st.session_state.day_votes = {} # 投票情報をリセット
-        st.session_state.execution_processed = False # 処刑済みフラグをリセット
-        if 'last_execution_result' in st.session_state:
-            del st.session_state.last_execution_result # 前の昼の結果をクリア
-        # 夜アクション確認用フラグをクリア
-        for i in range(len(alive_players)):
-            if f'action_confirmed_{i}' in st.session_state:
-                del st.session_state[f'action_confirmed_{i}']
 
         st.success("全員の夜のアクションが完了しました。")
             # 「昼へ進む」ボタンでリランし、昼画面を表示
@@ -56,128 +193,8 @@ def render_night_phase():
         st.subheader(f"{current_player.name} さんの番です")
         st.warning("⚠️ **他の人は見ないでください！** スマホをこの人に渡してください。")
 
-        # 役職確認エリア
-        role_revealed = st.toggle(f"役職を確認する ( {current_player.name} さんのみ)", key=f"role_toggle_{current_player.name}")
-        if role_revealed:
-            display_role = "占い師" if current_player.role.name == "偽占い師" else current_player.role.name
-            st.info(f"あなたの役職は **{display_role}** です。")
-
-            # アクションが必要か判定
-            action_required = current_player.role.has_night_action(gm.turn)
-
-            if action_required:
-                st.markdown("--- ")
-                st.subheader("アクション")
-
-                # アクションが既に確定されている場合 (占い結果表示など)
-                if action_confirmed_for_current_player:
-                    action_data = st.session_state.night_actions.get(current_player.name, {})
-                    action_type = action_data.get("type")
-                    selected_target = action_data.get("target")
-
-                    if action_type in ["seer", "attack", "guard"] and selected_target:
-                        st.write(f"あなたは **{selected_target}** さんを選択しました。")
-                        # 占い師・偽占い師の場合、結果を表示
-                        if action_type == "seer" or action_type == "fake_seer":
-                            target_player = next((p for p in gm.players if p.name == selected_target), None)
-                            if target_player:
-                                # 偽占い師の結果生成ロジックは Role 側に実装済み
-                                if current_player.role.name == "偽占い師":
-                                    seer_result = current_player.role.fake_seer_result()
-                                    st.info(f"占い結果（偽）: **{selected_target}** さんは **{seer_result}** です。")
-                                else:
-                                    seer_result = target_player.role.seer_result()
-                                    st.info(f"占い結果: **{selected_target}** さんは **{seer_result}** です。")
-                            else:
-                                st.error("対象プレイヤーが見つかりませんでした。")
-
-                    elif action_type == "medium":
-                        if gm.last_executed_name:
-                            executed_player = next((p for p in gm.players if p.name == gm.last_executed_name), None)
-                            if executed_player:
-                                medium_result = executed_player.role.medium_result()
-                                st.info(f"昨晩処刑された {gm.last_executed_name} は **{medium_result}** でした。")
-                            else:
-                                st.warning(f"{gm.last_executed_name} の情報が見つかりませんでした。")
-                        else:
-                            st.info("昨晩は処刑がありませんでした。")
-                    elif action_type == "none":
-                         st.info("このターンでは、特に必要なアクションはありませんでした。")
-
-                    # 次へ進むボタン
-                    if st.button("次のプレイヤーへ", key=f"next_player_{current_player.name}"):
-                        st.session_state[f'action_confirmed_{current_player_index}'] = False
-                        st.session_state.current_player_index = current_player_index + 1
-                        st.rerun()
-
-                # アクションがまだ確定されていない場合 (選択UI表示)
-                else:
-                    action_type = "none"
-                    selected_target = None
-                    can_confirm = False
-
-                    # 役職に応じたアクションUIを表示
-                    if current_player.role.name in ["人狼", "占い師", "偽占い師", "騎士"]:
-                        target_options = []
-                        action_label = current_player.role.action_description() + "を選んでください:"
-
-                        if current_player.role.name == "人狼":
-                            target_options = [p.name for p in alive_players if p.role.species() != "人狼"]
-                            action_type = "attack"
-                        elif current_player.role.name == "占い師" or current_player.role.name == "偽占い師":
-                            target_options = [p.name for p in alive_players if p.name != current_player.name]
-                            action_type = "seer"
-                        elif current_player.role.name == "騎士":
-                            target_options = [p.name for p in alive_players if p.name != current_player.name]
-                            action_type = "guard"
-
-                        if not target_options:
-                            st.info("選択できる対象がいません。")
-                            can_confirm = True
-                        else:
-                            selected_target = st.selectbox(
-                                action_label,
-                                options=["選択してください"] + target_options,
-                                index=0,
-                                key=f"action_target_{current_player.name}"
-                            )
-                            can_confirm = selected_target != "選択してください"
-
-                    elif current_player.role.name == "霊媒師":
-                        action_type = "medium"
-                        can_confirm = True
+        # 役職確認とアクションの選択 (操作してもこの部分だけが再実行される)
+        _render_action_panel(current_player_index)
 
-                    else: # 村人などアクションUI不要な役職
-                        action_type = "none"
-                        can_confirm = True
-                        st.write("あなたのアクションは自動的に処理されるか、現在はありません。")
-
-                    # アクション完了ボタン
-                    button_label = "アクションを確定する" if current_player.role.name not in ["霊媒師"] else "結果を確認する"
-                    if st.button(button_label, key=f"confirm_action_{current_player.name}", disabled=not can_confirm):
-                        action_data = {"type": action_type}
-                        valid_action = True
-
-                        if action_type in ["attack", "seer", "guard"]:
-                            if selected_target and selected_target != "選択してください":
-                                action_data["target"] = selected_target
-                            elif not target_options:
-                                pass
-                            else:
-                                st.error("対象を選択してください。")
-                                valid_action = False
-
-                        if valid_action:
-                            st.session_state.night_actions[current_player.name] = action_data
-                            st.session_state[f'action_confirmed_{current_player_index}'] = True
-                            st.rerun()
-
-            else: # action_required が False の場合 (騎士の初日など)
-                st.info("このターンでは、特に必要なアクションはありません。")
-                if st.button("確認しました", key=f"no_action_confirm_{current_player.name}"):
-                    st.session_state.night_actions[current_player.name] = {"type": "none"}
-                    st.session_state[f'action_confirmed_{current_player_index}'] = False
-                    st.session_state.current_player_index = current_player_index + 1
-                    st.rerun()
-        else:
-            st.write("役職を確認してから、アクションを行ってください。") 
\ No newline at end of file
+        st.markdown("--- ")
+        render_undo_controls() 
\ No newline at end of file
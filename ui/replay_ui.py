@@ -0,0 +1,91 @@
+import streamlit as st
+from collections import Counter
+from game.replay import Replay
+
+# 夜アクション・死因の表示名
+ACTION_LABELS = {"attack": "襲撃", "seer": "占い", "guard": "護衛"}
+DEATH_REASON_LABELS = {"attack": "襲撃", "execute": "処刑", "curse": "呪殺", "suicide": "後追死", "retaliation": "道連れ"}
+
+
+def start_replay(game_id: str, events, return_stage: str):
+    """リプレイ画面を開く (events はゲームの進行イベント)"""
+    st.session_state.replay_game_id = game_id
+    st.session_state.replay_events = list(events)
+    st.session_state.replay_return_stage = return_stage
+    st.session_state.stage = 'replay'
+
+
+def _get_replay(game_id: str, events) -> Replay:
+    """セッションごとにリプレイ (キーフレーム) と、表示済みのコマを保持する"""
+    if st.session_state.get("replay_cache_id") != game_id:
+        st.session_state.replay_cache_id = game_id
+        st.session_state.replay_cache = Replay(events)
+        st.session_state.replay_views = {}
+    return st.session_state.replay_cache
+
+
+def _get_view(replay: Replay, index: int):
+    views = st.session_state.replay_views
+    if index not in views:
+        views[index] = replay.step_view(index)
+    return views[index]
+
+
+def render_replay():
+    """終了したゲームのリプレイ画面。スライダーで任意のフェーズの状態を表示する。"""
+    st.header("リプレイ📼")
+    game_id = st.session_state.get("replay_game_id")
+    events = st.session_state.get("replay_events")
+    if not events:
+        st.error("リプレイするゲームがありません。")
+        _render_back_button()
+        return
+
+    replay = _get_replay(game_id, events)
+    labels = [step.label for step in replay.steps]
+    if len(labels) > 1:
+        index = st.select_slider("フェーズ", options=list(range(len(labels))), value=len(labels) - 1,
+                                 format_func=lambda i: labels[i], key="replay_index")
+    else:
+        index = 0
+    view = _get_view(replay, index)
+    roles = view["roles"]
+
+    st.subheader(view["label"])
+    st.write(f"生存者 {len(view['alive'])} 人: {', '.join(view['alive'])}")
+
+    if view["phase"] == "night":
+        lines = []
+        for name, action in view["actions"].items():
+            target = action.get("target")
+            if target:
+                lines.append(f"- {name} [{roles[name]}] → **{target}** を{ACTION_LABELS.get(action['type'], action['type'])}")
+        st.markdown("\n".join(lines) if lines else "この夜のアクションはありませんでした。")
+        for seer_name, seer_result in view["seer_results"].items():
+            st.info(f"{seer_name} の占い結果: {seer_result['target']} は **{seer_result['result']}**")
+    elif view["phase"] == "day":
+        tally = Counter(view["votes"].values())
+        for name, count in tally.most_common():
+            voters = [voter for voter, target in view["votes"].items() if target == name]
+            st.write(f"- {name}: {count} 票 ({', '.join(voters)})")
+        if not view["votes"]:
+            st.write("投票の記録はありません。")
+    else:
+        st.markdown("\n".join(f"- {name}: {role}" for name, role in roles.items()))
+
+    for name, reason in view["deaths"]:
+        st.error(f"**{name}** [{roles[name]}] が{DEATH_REASON_LABELS.get(reason, reason)}により死亡")
+    if view["victory"]:
+        st.success(view["victory"])
+
+    _render_back_button()
+
+
+def _render_back_button():
+    st.markdown("--- ")
+    if st.button("戻る"):
+        st.session_state.stage = st.session_state.get("replay_return_stage", 'initial_setup')
+        for key in ["replay_game_id", "replay_events", "replay_return_stage", "replay_index"]:
+            if key in st.session_state:
+                del st.session_state[key]
+        st.rerun()
@@ -0,0 +1,49 @@
+import streamlit as st
+import config.settings as settings
+from game.results_store import WriteBehindWriter, DEFAULT_DB_PATH
+from game.checkpoint import CheckpointStore, DEFAULT_CHECKPOINT_DIR
+from game.rooms import RoomRegistry, DEFAULT_MAX_LOADED_ROOMS, DEFAULT_MAX_BYTES, DEFAULT_IDLE_TTL
+from game.game_server import GameServer
+from game.admission import (AdmissionController, DEFAULT_MAX_CPU, DEFAULT_MAX_QUEUE, DEFAULT_WORKERS,
+                            DEFAULT_ROOM_WAIT, DEFAULT_MAX_DEFER)
+
+# サーバープロセス内で共有するリソース (st.cache_resource でセッションをまたいで1つだけ生成する)
+
+def results_db_path() -> str:
+    return getattr(settings, "RESULTS_DB_PATH", DEFAULT_DB_PATH)
+
+@st.cache_resource
+def get_results_writer() -> WriteBehindWriter:
+    """ゲーム結果のバックグラウンド書き込み用ライター"""
+    return WriteBehindWriter(results_db_path())
+
+@st.cache_resource
+def get_checkpoint_store() -> CheckpointStore:
+    """進行中のゲームのチェックポイント (バックグラウンドで書き込む)"""
+    return CheckpointStore(getattr(settings, "CHECKPOINT_DIR", DEFAULT_CHECKPOINT_DIR))
+
+@st.cache_resource
+def get_room_registry() -> RoomRegistry:
+    """ルーム (ゲーム卓) の一覧。退避したルームは get_checkpoint_store のディレクトリに書き出す"""
+    return RoomRegistry(
+        get_checkpoint_store(),
+        max_loaded_rooms=getattr(settings, "ROOM_MAX_LOADED_ROOMS", DEFAULT_MAX_LOADED_ROOMS),
+        max_bytes=getattr(settings, "ROOM_MAX_BYTES", DEFAULT_MAX_BYTES),
+        idle_ttl=getattr(settings, "ROOM_IDLE_TTL", DEFAULT_IDLE_TTL),
+    )
+
+@st.cache_resource
+def get_game_server() -> GameServer:
+    """各自の端末で参加するゲームの、夜アクション・投票の受付"""
+    return GameServer()
+
+@st.cache_resource
+def get_admission_controller() -> AdmissionController:
+    """受付制御 (混雑時に新しいルームやバックグラウンドの処理を待たせる・断る)"""
+    return AdmissionController(
+        max_cpu=getattr(settings, "ADMISSION_MAX_CPU", DEFAULT_MAX_CPU),
+        max_queue=getattr(settings, "ADMISSION_MAX_QUEUE", DEFAULT_MAX_QUEUE),
+        workers=getattr(settings, "ADMISSION_WORKERS", DEFAULT_WORKERS),
+        room_wait=getattr(settings, "ADMISSION_ROOM_WAIT", DEFAULT_ROOM_WAIT),
+        max_defer=getattr(settings, "ADMISSION_MAX_DEFER", DEFAULT_MAX_DEFER),
+    )
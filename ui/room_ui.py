@@ -0,0 +1,201 @@
+import functools
+import threading
+from contextlib import contextmanager
+import streamlit as st
+from ui.resources import get_room_registry, get_game_server, get_admission_controller
+from ui.checkpoint_ui import SESSION_KEYS, SESSION_KEY_PREFIXES, save_checkpoint
+
+# ブラウザを再読み込みしても同じルームに戻れるよう、URL のクエリパラメータにルームコードを入れておく
+QUERY_PARAM = "room"
+
+# room_session の中で描画しているか・room_fragment の部分的な再実行中か (スクリプトのスレッドごと)
+_local = threading.local()
+
+
+def _room_keys():
+    """ルームで共有する画面の状態のキー (現在のセッションにあるもの)"""
+    keys = [key for key in SESSION_KEYS if key in st.session_state]
+    keys += [key for key in st.session_state.keys() if key.startswith(SESSION_KEY_PREFIXES)]
+    return keys
+
+
+def create_room():
+    """現在のゲームを新しいルームに登録する (ゲーム開始時に呼ぶ)"""
+    session = {key: st.session_state[key] for key in _room_keys()}
+    room = get_room_registry().create(st.session_state.game_manager, session, st.session_state.stage)
+    st.session_state.room_code = room.code
+    st.query_params[QUERY_PARAM] = room.code
+    return room.code
+
+
+def join_room(code: str) -> bool:
+    """ルームコードで参加する。ルームがなければ False"""
+    code = code.strip().upper()
+    if not code or not get_room_registry().exists(code):
+        return False
+    st.session_state.room_code = code
+    st.query_params[QUERY_PARAM] = code
+    return True
+
+
+def leave_room(close: bool = False):
+    """ルームから抜ける。close=True ならルームも削除する (ゲームを終えて新しいゲームを始めるとき)"""
+    code = st.session_state.pop("room_code", None)
+    if code and close:
+        get_room_registry().close(code)
+        get_game_server().close_room(code)
+    if st.query_params.get(QUERY_PARAM) == code:
+        del st.query_params[QUERY_PARAM]
+
+
+def pending_room_code():
+    """URL に参加できるルームコードがあれば返す"""
+    code = st.query_params.get(QUERY_PARAM)
+    if code and get_room_registry().exists(code):
+        return code.upper()
+    return None
+
+
+@contextmanager
+def room_session():
+    """
+    app.py が描画全体をこの中で行う。
+    ルームに参加していれば、ルームのロックを取ってゲームと画面の状態をセッションに読み込み、
+    描画の終わりに書き戻してセッションからゲームを外す (ゲームを持つのはルームの一覧だけにし、
+    使われていないルームを退避できるようにする)。
+    """
+    _local.active = True
+    try:
+        with _room_session():
+            yield
+    finally:
+        _local.active = False
+
+
+@contextmanager
+def _room_session():
+    code = st.session_state.get("room_code")
+    if not code:
+        yield
+        return
+    registry = get_room_registry()
+    try:
+        room = registry.acquire(code)
+    except KeyError:
+        st.session_state.pop("room_code", None)
+        st.warning(f"ルーム {code} が見つかりませんでした。")
+        yield
+        return
+    try:
+        for key in _room_keys():
+            if key not in room.session:
+                del st.session_state[key]
+        for key, value in room.session.items():
+            st.session_state[key] = value
+        st.session_state.game_manager = room.gm
+        st.session_state.stage = room.stage
+        yield
+    finally:
+        try:
+            if st.session_state.get("room_code") == code:
+                room.session = {key: st.session_state[key] for key in _room_keys()}
+                room.gm = st.session_state.get("game_manager", room.gm)
+                room.stage = st.session_state.get("stage", room.stage)
+                st.session_state.pop("game_manager", None)
+        finally:
+            registry.release(room)
+
+
+def room_fragment(func=None, *, run_every=None):
+    """
+    ゲーム画面の一部を st.fragment にする。その部分の操作では、画面全体ではなくこの部分だけが再実行される。
+    部分的な再実行は app.py を通らないため、ここでルームのゲームを読み込み (room_session)、終わったらチェックポイントを取る。
+    その間に他の端末でフェーズが進んでいた (ステージが変わった) 場合は、画面全体を描画し直す。
+    run_every を指定すると、その間隔でもこの部分だけを再実行する (@room_fragment(run_every="5s") のように使う)。
+    """
+    if func is None:
+        return functools.partial(room_fragment, run_every=run_every)
+
+    @st.fragment(run_every=run_every)
+    @functools.wraps(func)
+    def fragment(stage, *args, **kwargs):
+        if getattr(_local, "active", False): # app.py の描画の中 (初回)
+            return func(*args, **kwargs)
+        with get_admission_controller().live(), room_session():
+            _local.fragment = True
+            try:
+                if st.session_state.get("stage") != stage or "game_manager" not in st.session_state:
+                    st.rerun()
+                return func(*args, **kwargs)
+            finally:
+                _local.fragment = False
+                save_checkpoint()
+
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        return fragment(st.session_state.get("stage"), *args, **kwargs)
+    return call
+
+
+@contextmanager
+def room_update():
+    """
+    st.fragment の部分的な再実行の中でルームの画面の状態を書き換えるときは、この中で行う。
+    ルームのロックを取ってゲームと画面の状態を読み込み、終わったら書き戻してチェックポイントを取る
+    (画面全体の描画の中では読み込み済みなので何もしない)。
+    """
+    if getattr(_local, "active", False):
+        yield
+        return
+    with get_admission_controller().live(), room_session():
+        try:
+            yield
+        finally:
+            save_checkpoint()
+
+
+def peek_room_state(key: str):
+    """
+    ルームで共有する画面の状態の値を、ルームのロックを取らずに読む (定期的な部分的な再実行で他の端末での変更を確かめる用)。
+    画面全体の描画の中や、ルームに参加していない・ルームが退避中の場合は、この端末の画面の状態の値。
+    """
+    code = st.session_state.get("room_code")
+    if code and not getattr(_local, "active", False):
+        value = get_room_registry().peek(code, key)
+        if value is not None:
+            return value
+    return st.session_state.get(key)
+
+
+def rerun_fragment():
+    """room_fragment の中から、その部分だけを再実行する (画面全体の描画の中で呼ばれた場合は画面全体)"""
+    st.rerun(scope="fragment" if getattr(_local, "fragment", False) else "app")
+
+
+def render_room_sidebar():
+    """サイドバーにルームコードを表示する (デバッグモードではルームの一覧の状況も)"""
+    code = st.session_state.get("room_code")
+    if code:
+        st.sidebar.markdown(f"ルームコード: **{code}**")
+        st.sidebar.caption("他の端末からは、設定画面の「ルームに参加」でこのコードを入力すると同じゲームを開けます。")
+    if st.session_state.get("debug_mode_enabled"):
+        stats = get_room_registry().stats()
+        st.sidebar.caption(
+            f"ルーム {stats['rooms']} (メモリ上 {stats['loaded']}) ・ {stats['bytes'] / 1024:.0f} KB ・ "
+            f"退避 {stats['evictions']} ・ 復元 {stats['restores']}")
+        load = get_admission_controller().stats()
+        st.sidebar.caption(
+            f"CPU {load['cpu']:.0%} ・ 描画中 {load['live']} (p95 {load['render_p95_ms']:.0f} ms) ・ "
+            f"待ち行列 {load['queued']} (待ち時間 平均 {load['job_wait_mean_ms']:.0f} ms / p95 {load['job_wait_p95_ms']:.0f} ms) ・ "
+            f"新規ルームの待ち p95 {load['room_wait_p95_ms']:.0f} ms ・ "
+            f"断った件数 ルーム {load['rejected_rooms']} / 処理 {load['rejected_jobs']}")
+
+
+def render_join_room():
+    """設定画面の「ルームに参加」"""
+    with st.expander("ルームに参加"):
+        code = st.text_input("ルームコード", key="join_room_code", max_chars=8)
+        if st.button("参加する", key="join_room_button"):
+            if join_room(code):
+                st.rerun()
+            st.error("ルームが見つかりませんでした。")
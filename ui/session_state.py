@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, MutableMapping, Any
+import streamlit as st
+import config.settings as settings
+from game.rooms import estimate_size
+
+DEFAULT_SESSION_MEMORY_BUDGET = 8 * 1024 * 1024 # 1セッションの画面の状態の目安 (バイト)。超えたらキャッシュを捨てる
+# 最後に後片付けをしたフェーズ (ステージとターン)
+PHASE_KEY = "session_phase"
+
+
+@dataclass(frozen=True)
+class Namespace:
+    """
+    画面の状態のキーの名前空間。キー名 (keys) か接頭辞 (prefixes) で、どのキーがこの名前空間のものかを決める。
+    phase: 夜・昼の1フェーズの間だけ使うキー (フェーズが変わるたびに捨てる)
+    cache: 作り直せるキャッシュ (メモリの目安を超えたら、使っている画面でも捨てる)
+    """
+    name: str
+    keys: Tuple[str, ...] = ()
+    prefixes: Tuple[str, ...] = ()
+    phase: bool = False
+    cache: bool = False
+
+    def owns(self, key: str) -> bool:
+        return key in self.keys or key.startswith(self.prefixes)
+
+
+# 名前空間の一覧。画面の状態に新しいキーを追加するときは、ここに登録する。
+# ゲームの再開に必要なキー (checkpoint_ui.SESSION_KEYS) とルーム・座席のキーは登録しない (後片付けの対象外)
+SETUP = Namespace("setup", keys=("player_count_input", "roster_upload", "roster_upload_id", "roster_history",
+                                 "debug_mode_checkbox", "multi_device_checkbox", "spectator_strategy",
+                                 "spectator_seed", "join_room_code"),
+                  prefixes=("role_count_",))
+NIGHT = Namespace("night", prefixes=("role_toggle_", "action_target_", "confirm_action_", "no_action_confirm_",
+                                     "next_player_", "device_target_", "device_confirm_"), phase=True)
+DAY = Namespace("day", keys=("vote_tally", "batch_execute_target", "ballot_search", "ballot_only_missing",
+                             "ballot_page", "discussion_timer_view", "discussion_timer_action"),
+                prefixes=("vote_radio_", "vote_select_", "device_vote_"), phase=True)
+UNDO = Namespace("undo", keys=("undo_stack", "undo_last"), prefixes=("undo_to_",), phase=True)
+GAME = Namespace("game", keys=("device_night_result", "saved_game", "saved_game_id"))
+SPECTATOR = Namespace("spectator", keys=("spectator_job", "spectator_index", "spectator_autoplay", "spectator_speed",
+                                                "spectator_autoplay_started"))
+REPLAY = Namespace("replay", keys=("replay_game_id", "replay_events", "replay_return_stage", "replay_index"))
+REPLAY_CACHE = Namespace("replay_cache", keys=("replay_cache", "replay_cache_id", "replay_views"), cache=True)
+HISTORY = Namespace("history", prefixes=("history_",))
+STATS = Namespace("stats", prefixes=("stats_", "leaderboard_"))
+NAMESPACES = (SETUP, NIGHT, DAY, UNDO, GAME, SPECTATOR, REPLAY, REPLAY_CACHE, HISTORY, STATS)
+
+# ステージごとに残す名前空間 (ここにない名前空間のキーは、そのステージに移ったときに捨てる)
+STAGE_NAMESPACES: Dict[str, Tuple[Namespace, ...]] = {
+    "initial_setup": (SETUP,),
+    "role_setup": (SETUP,),
+    "confirm_setup": (SETUP,),
+    "night_phase": (NIGHT, UNDO, GAME),
+    "day_phase": (DAY, UNDO, GAME),
+    "game_over": (GAME, REPLAY_CACHE),
+    "replay": (GAME, REPLAY, REPLAY_CACHE, HISTORY), # 戻り先 (終了画面・対戦履歴) の状態も残す
+    "spectator": (SPECTATOR,),
+    "history": (HISTORY, REPLAY_CACHE),
+    "stats": (STATS,),
+    "resume": (),
+}
+
+
+def namespace_of(key: str) -> Optional[Namespace]:
+    for namespace in NAMESPACES:
+        if namespace.owns(key):
+            return namespace
+    return None
+
+
+def collect(state: MutableMapping[str, Any], stage: str, turn: Optional[int], budget: Optional[int] = None) -> int:
+    """
+    フェーズ (ステージとターン) が前回から変わっていれば、新しいステージで使わない名前空間のキーと、
+    前のフェーズのキー (phase の名前空間) を捨てる。budget を超えていれば、キャッシュの名前空間も捨てる。
+    捨てたキーの数を返す。
+    """
+    phase = [stage, turn]
+    if state.get(PHASE_KEY) == phase:
+        return 0
+    keep = STAGE_NAMESPACES.get(stage, ())
+    over_budget = budget is not None and estimate_size(dict(state)) > budget
+    dropped = 0
+    for key in list(state.keys()):
+        namespace = namespace_of(key)
+        if namespace is None:
+            continue
+        # phase の名前空間のキーは、同じステージでも前のフェーズ (ターン) のものなので捨てる
+        if namespace not in keep or namespace.phase or (namespace.cache and over_budget):
+            del state[key]
+            dropped += 1
+    state[PHASE_KEY] = phase
+    return dropped
+
+
+def memory_report(state: MutableMapping[str, Any]) -> Dict[str, Tuple[int, int]]:
+    """
+    画面の状態の、名前空間ごとのキーの数とおおよそのメモリ使用量 (バイト)。どこにも属さないキーは "other" にまとめる。
+    ルームのゲーム (game_manager) はルームの一覧の側で数えるため含めない。
+    """
+    report: Dict[str, Tuple[int, int]] = {}
+    for key in list(state.keys()):
+        if key == "game_manager":
+            continue
+        namespace = namespace_of(key)
+        name = namespace.name if namespace is not None else "other"
+        count, size = report.get(name, (0, 0))
+        report[name] = (count + 1, size + estimate_size(state[key]))
+    return report
+
+
+def collect_session_garbage():
+    """app.py が毎回の描画の最初に呼ぶ (ルームのゲームを読み込んだ後)。フェーズが変わったときだけ後片付けをする"""
+    gm = st.session_state.get("game_manager")
+    collect(st.session_state, st.session_state.get("stage"), gm.turn if gm is not None else None,
+            budget=getattr(settings, "SESSION_MEMORY_BUDGET", DEFAULT_SESSION_MEMORY_BUDGET))
+
+
+def render_memory_report():
+    """デバッグモードで、このセッションの画面の状態のメモリ使用量をサイドバーに表示する"""
+    if not st.session_state.get("debug_mode_enabled"):
+        return
+    report = memory_report(st.session_state)
+    total = sum(size for _, size in report.values())
+    keys = sum(count for count, _ in report.values())
+    parts = " ・ ".join(f"{name} {count} ({size / 1024:.0f} KB)"
+                        for name, (count, size) in sorted(report.items(), key=lambda item: -item[1][1]))
+    st.sidebar.caption(f"画面の状態: {keys} キー ・ {total / 1024:.0f} KB ({parts})")
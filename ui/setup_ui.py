@@ -1,89 +1,116 @@
+import csv
 import streamlit as st
 from game.role import role_dict
 import config.settings as settings
+from ui.checkpoint_ui import render_saved_games
+from ui.room_ui import create_room, render_join_room
+from ui.resources import get_admission_controller, results_db_path
+from game.admission import Overloaded
+from game.results_store import ResultsStore, read_data_version
+from game.roster import parse_roster, parse_roster_csv, validate_roster
 
 # role_dict から AVAILABLE_ROLES を定義
 AVAILABLE_ROLES = list(role_dict.keys())
 
 MIN_PLAYERS = 3
 
+def _placeholder_names(names, count: int):
+    """名簿を count 人にする (足りない分は「プレイヤーN」で埋め、多い分は切り捨てる)"""
+    return names[:count] + [f"プレイヤー{i + 1}" for i in range(len(names), count)]
+
+
+# 過去のゲームの名簿。新しいゲームが保存されるまではデータベースに問い合わせ直さない
+@st.cache_data(max_entries=16, show_spinner=False)
+def _fetch_rosters(db_path: str, version: int):
+    store = ResultsStore(db_path)
+    try:
+        return store.recent_rosters()
+    finally:
+        store.close()
+
+
+def _render_roster_sources():
+    """名簿の入力元 (人数から仮の名前・CSV・過去のゲームの名簿)。選ぶと名簿の入力欄を置き換える"""
+    names = parse_roster(st.session_state.roster_text)
+    default_count = getattr(settings, "DEFAULT_PLAYER_COUNT", 0)
+    col1, col2 = st.columns([2, 1])
+    count = col1.number_input(f"人数 ({MIN_PLAYERS}人以上)", min_value=MIN_PLAYERS,
+                              value=max(len(names), MIN_PLAYERS), step=1, key="player_count_input")
+    if col2.button("この人数にする", help="足りない分は仮の名前で埋めます"):
+        st.session_state.roster_text = "\n".join(_placeholder_names(names, int(count)))
+    if default_count >= MIN_PLAYERS and st.button(f"デフォルトの {default_count} 人で設定"):
+        st.session_state.roster_text = "\n".join(_placeholder_names(names, default_count))
+
+    with st.expander("名簿をまとめて入力 (CSV・過去のゲーム)"):
+        uploaded = st.file_uploader("名簿ファイル (CSV またはテキスト)", type=["csv", "txt"], key="roster_upload")
+        # 同じファイルは1回だけ読み込む (読み込んだ後の手直しを上書きしないため)
+        if uploaded is not None and uploaded.file_id != st.session_state.get("roster_upload_id"):
+            st.session_state.roster_upload_id = uploaded.file_id
+            data = uploaded.getvalue()
+            try:
+                if uploaded.name.lower().endswith(".csv"):
+                    imported = parse_roster_csv(data)
+                else:
+                    imported = parse_roster(data.decode("utf-8-sig", errors="replace"))
+            except (UnicodeDecodeError, csv.Error) as e:
+                st.error(f"{uploaded.name} を読み込めませんでした (UTF-8 か Shift_JIS の CSV にしてください): {e}")
+            else:
+                st.session_state.roster_text = "\n".join(imported)
+                st.success(f"{uploaded.name} から {len(imported)} 人を読み込みました。")
+
+        db_path = results_db_path()
+        rosters = _fetch_rosters(db_path, read_data_version(db_path))
+        if rosters:
+            labels = [f"{r['played_at'][:16]} ・ {len(r['players'])}人: {', '.join(r['players'][:5])}"
+                      + (" ..." if len(r["players"]) > 5 else "") for r in rosters]
+            index = st.selectbox("過去のゲームの名簿", options=range(len(rosters)),
+                                 format_func=labels.__getitem__, key="roster_history")
+            if st.button("この名簿を使う"):
+                st.session_state.roster_text = "\n".join(rosters[index]["players"])
+        else:
+            st.caption("保存済みのゲームはまだありません。")
+
+
 def render_initial_setup():
     """プレイヤー数と名前の設定UIを描画する"""
     st.header("ゲーム設定")
     st.session_state.error_message = ""
+    render_saved_games()
+    render_join_room()
+    col1, col2 = st.columns(2)
+    if col1.button("📊 統計を見る"):
+        st.session_state.stage = 'stats'
+        st.rerun()
+    if col2.button("📜 対戦履歴"):
+        st.session_state.stage = 'history'
+        st.rerun()
 
-    # --- プレイヤー数設定 ---
-    st.subheader("プレイヤー人数")
+    # --- プレイヤー名簿 ---
+    # 人数によらず入力欄は1つ (1行に1人)。人数は名簿の行数で決まる
+    st.subheader("プレイヤー")
+    if "roster_text" not in st.session_state:
+        default_count = getattr(settings, "DEFAULT_PLAYER_COUNT", 0)
+        st.session_state.roster_text = "\n".join(
+            st.session_state.player_names or _placeholder_names([], max(default_count, MIN_PLAYERS)))
+    _render_roster_sources()
 
-    # デフォルト設定の使用
-    use_default_count = False
-    default_count = getattr(settings, "DEFAULT_PLAYER_COUNT", 0)
-    if default_count >= MIN_PLAYERS:
-        if st.button(f"デフォルトの {default_count} 人で設定"):
-            st.session_state.player_count = default_count
-            use_default_count = True
-            st.rerun()
+    roster_text = st.text_area("プレイヤー名 (1行に1人。カンマ・タブ区切りで貼り付けても構いません)",
+                               key="roster_text", height=200)
+    names = parse_roster(roster_text)
+    st.session_state.player_names = names
+    st.session_state.player_count = len(names)
+    st.caption(f"{len(names)} 人")
 
-    # 数値入力
-    current_player_count = st.session_state.player_count if st.session_state.player_count >= MIN_PLAYERS else MIN_PLAYERS
-    num_input = st.number_input(
-        f"人数を入力してください（{MIN_PLAYERS}人以上）",
-        min_value=MIN_PLAYERS,
-        value=current_player_count,
-        step=1,
-        key="player_count_input",
-        disabled=use_default_count
-    )
-    # number_input の値が変更されたら session_state に反映
-    if not use_default_count and num_input != st.session_state.player_count:
-         st.session_state.player_count = num_input
-         st.session_state.player_names = [""] * num_input # 名前入力欄をリセット
-         st.rerun()
-
-    # --- プレイヤー名設定 ---
-    if st.session_state.player_count >= MIN_PLAYERS:
-        st.subheader("プレイヤー名")
-
-        # 名前入力欄を動的に生成
-        if len(st.session_state.player_names) != st.session_state.player_count:
-             st.session_state.player_names = [""] * st.session_state.player_count
-
-        input_names = []
-        cols = st.columns(3)
-        for i in range(st.session_state.player_count):
-            container = cols[i % 3]
-            default_value = st.session_state.player_names[i] or f"プレイヤー{i + 1}"
-            name = container.text_input(
-                f"プレイヤー{i + 1}",
-                value=default_value,
-                key=f"player_name_{i}"
-            )
-            input_names.append(name)
-
-        # 名前が変更されたら session_state に反映
-        if input_names != st.session_state.player_names:
-             st.session_state.player_names = input_names
-
-        # --- 設定確定ボタン ---
-        if st.button("役職設定へ進む"):
-            # 入力チェック
-            valid = True
-            if not st.session_state.player_names:
-                st.session_state.error_message = "プレイヤー名が設定されていません。"
-                valid = False
-            elif "" in st.session_state.player_names:
-                st.session_state.error_message = "すべてのプレイヤー名を入力してください。"
-                valid = False
-            elif len(set(st.session_state.player_names)) != st.session_state.player_count:
-                st.session_state.error_message = "プレイヤー名が重複しています。"
-                valid = False
-
-            if valid:
-                st.session_state.stage = 'role_setup'
-                st.session_state.error_message = ""
-                st.rerun()
-            else:
-                 st.rerun()
+    # --- 設定確定ボタン ---
+    if st.button("役職設定へ進む"):
+        # 人数・空の名前・重複をまとめて確かめる
+        errors = validate_roster(names, min_players=MIN_PLAYERS)
+        if errors:
+            st.session_state.error_message = "\n\n".join(errors)
+        else:
+            st.session_state.stage = 'role_setup'
+            st.session_state.error_message = ""
+            st.rerun()
 
     # エラーメッセージ表示
     if st.session_state.error_message:
@@ -191,27 +218,38 @@ def render_confirm_setup():
                              help="有効にすると、ゲーム進行のデバッグ情報が表示されます")
     # チェックボックスの状態をセッションに保存
     st.session_state.debug_mode_enabled = debug_mode
+    st.session_state.multi_device = st.checkbox(
+        "各自の端末で参加する", value=st.session_state.get("multi_device", False), key="multi_device_checkbox",
+        help="各プレイヤーが自分の端末からルームコードで参加し、夜のアクションと投票を同時に行います")
 
     col1, col2 = st.columns(2)
     with col1:
         if st.button("ゲーム開始！"):
-            player_names = st.session_state.player_names
-            role_counts = st.session_state.role_counts
-            roles = []
-            for role_name, count in role_counts.items():
-                roles.extend([role_name] * count)
+            # 混雑していれば少し待たせ、収まらなければ開始しない (進行中の卓の描画を遅くしないため)
+            try:
+                get_admission_controller().admit_room()
+            except Overloaded as e:
+                st.error(f"サーバーが混雑しているため、ゲームを開始できませんでした ({e})。しばらくしてからもう一度お試しください。")
+            else:
+                player_names = st.session_state.player_names
+                role_counts = st.session_state.role_counts
+                roles = []
+                for role_name, count in role_counts.items():
+                    roles.extend([role_name] * count)
 
-            # セッション状態からデバッグモード設定を読み込む
-            current_debug_mode = st.session_state.get("debug_mode_enabled", False)
-            from game.game_manager import GameManager # GameManagerをここでインポート
-            game_manager = GameManager(player_names, debug_mode=current_debug_mode)
-            game_manager.assign_roles(roles)
+                # セッション状態からデバッグモード設定を読み込む
+                current_debug_mode = st.session_state.get("debug_mode_enabled", False)
+                from game.game_manager import GameManager # GameManagerをここでインポート
+                game_manager = GameManager(player_names, debug_mode=current_debug_mode)
+                game_manager.assign_roles(roles)
+                game_manager.start_night()
 
-            st.session_state.game_manager = game_manager
-            st.session_state.stage = 'night_phase'
-            st.session_state.current_player_index = 0
-            st.session_state.night_actions = {}
-            st.rerun()
+                st.session_state.game_manager = game_manager
+                st.session_state.stage = 'night_phase'
+                st.session_state.current_player_index = 0
+                st.session_state.night_actions = {}
+                create_room() # 他の端末からもルームコードで開けるようにする
+                st.rerun()
     with col2:
         if st.button("役職設定に戻る"):
             st.session_state.stage = 'role_setup'
@@ -220,4 +258,29 @@ def render_confirm_setup():
                 del st.session_state.debug_mode_enabled
             if 'game_manager' in st.session_state:
                  del st.session_state.game_manager
-            st.rerun() 
\ No newline at end of file
+            st.rerun()
+
+    # --- 観戦モード (全員ボット) ---
+    st.markdown("--- ")
+    with st.expander("観戦モード (全員ボットで対戦)"):
+        from game.bot import bot_dict
+        strategy = st.selectbox("ボットの戦略", options=list(bot_dict.keys()), key="spectator_strategy")
+        seed = st.number_input("シード", min_value=0, value=0, step=1, key="spectator_seed")
+        if st.button("ボット同士の対戦を観戦する"):
+            from game.simulator import BackgroundGame
+            from game.inference import start_default_service
+            start_default_service() # 同時に観戦中の他のセッションのボットとまとめて推論する
+            roles = []
+            for role_name, count in st.session_state.role_counts.items():
+                roles.extend([role_name] * count)
+            player_names = st.session_state.player_names
+            # ボット対戦は受付制御の待ち行列で実行する (混雑していれば断る)
+            try:
+                st.session_state.spectator_job = BackgroundGame(player_names, roles, [strategy] * len(player_names),
+                                                                int(seed), admission=get_admission_controller())
+            except Overloaded as e:
+                st.error(f"サーバーが混雑しているため、観戦を開始できませんでした ({e})。しばらくしてからもう一度お試しください。")
+            else:
+                st.session_state.spectator_index = 0
+                st.session_state.stage = 'spectator'
+                st.rerun() 
\ No newline at end of file
@@ -0,0 +1,141 @@
+import streamlit as st
+import pandas as pd
+from collections import Counter
+from ui.resources import get_admission_controller
+
+# 夜アクションの表示名
+ACTION_LABELS = {"attack": "襲撃", "seer": "占い", "guard": "護衛"}
+
+
+def render_spectator():
+    """観戦モード (全員ボット) のUIを描画する。事前に計算された進行記録をページ送りする。"""
+    st.header("観戦モード👀")
+    job = st.session_state.get("spectator_job")
+    if job is None:
+        st.error("観戦するゲームがありません。設定画面に戻ります。")
+        st.session_state.stage = 'confirm_setup'
+        st.rerun()
+
+    # --- ゲーム生成の完了待ち (混雑時は受付制御の待ち行列で順番を待つ) ---
+    if not job.done():
+        _wait_for_job(job)
+        _render_back_button()
+        return
+    if job.error:
+        st.error(f"ゲームの生成中にエラーが発生しました: {job.error}")
+        _render_back_button()
+        return
+
+    result = job.result
+    log = result["log"]
+    last_index = len(log) - 1
+    roles = {p["name"]: p["role"] for p in result["players"]}
+
+    # --- 操作 (ボタンは描画前に処理する) ---
+    index = min(st.session_state.get("spectator_index", 0), last_index)
+    col1, col2, col3, col4 = st.columns(4)
+    if col1.button("⏮ 最初へ", disabled=index == 0):
+        index = 0
+    if col2.button("◀ 前へ", disabled=index == 0):
+        index -= 1
+    if col3.button("次へ ▶", disabled=index == last_index):
+        index += 1
+    if col4.button("最後へ ⏭", disabled=index == last_index):
+        index = last_index
+    st.session_state.spectator_index = index
+
+    speed = st.slider("再生速度 (秒/フェーズ)", min_value=0.5, max_value=5.0, value=1.5, step=0.5, key="spectator_speed")
+    autoplay = st.toggle("自動再生", key="spectator_autoplay")
+    st.progress((index + 1) / len(log), text=f"{index + 1} / {len(log)} フェーズ")
+
+    _render_frame(log[index], roles)
+
+    if index == last_index:
+        _render_final_results(result)
+    _render_back_button()
+
+    # --- 自動再生 ---
+    if autoplay and index < last_index:
+        # 次のフェーズへは speed 秒ごとの部分的な再実行で進める (描画の中で待たないので、待つ間は描画中に数えられない)
+        st.session_state.spectator_autoplay_started = True
+        st.fragment(run_every=speed)(_autoplay_step)()
+
+
+def _autoplay_step():
+    """自動再生で1フェーズ進める。画面全体の描画の中での最初の実行では進めず、次の定期的な再実行から進める"""
+    if st.session_state.pop("spectator_autoplay_started", False):
+        return
+    st.session_state.spectator_index = st.session_state.get("spectator_index", 0) + 1
+    st.rerun() # 進めたフェーズは画面全体の描画で表示する
+
+
+@st.fragment(run_every=0.5)
+def _wait_for_job(job):
+    """
+    ゲームの生成が終わるまで、この部分だけを再実行して待つ。
+    部分的な再実行は app.py を通らないため描画中 (受付制御の live) に数えられず、待っている間も生成が遅れない。
+    """
+    if job.done():
+        st.rerun() # 生成したゲームは画面全体の描画で表示する
+    position = get_admission_controller().queue_position(job.future) if job.future else None
+    st.info(f"順番待ちです ({position} 番目)..." if position else "ゲームを生成しています...")
+
+
+def _render_frame(frame, roles):
+    """進行記録の1フェーズぶんを描画する"""
+    if frame["phase"] == "night":
+        st.subheader(f"ターン {frame['turn']}: 夜🔮")
+        lines = []
+        for name, action in frame["actions"].items():
+            target = action.get("target")
+            if target:
+                lines.append(f"- {name} [{roles[name]}] → **{target}** を{ACTION_LABELS.get(action['type'], action['type'])}")
+        st.markdown("\n".join(lines) if lines else "この夜のアクションはありませんでした。")
+        for seer_name, seer_result in frame.get("seer_results", {}).items():
+            st.info(f"{seer_name} の占い結果: {seer_result['target']} は **{seer_result['result']}**")
+        if frame["victims"]:
+            st.error(f"犠牲者: **{', '.join(frame['victims'])}**")
+        else:
+            st.info("この夜は誰も死亡しませんでした。")
+    else:
+        st.subheader(f"{frame['turn']}日目 - 昼☀️")
+        st.write(f"生存者 {len(frame['alive'])} 人: {', '.join(frame['alive'])}")
+        tally = Counter(frame["votes"].values())
+        for name, count in tally.most_common():
+            voters = [voter for voter, target in frame["votes"].items() if target == name]
+            st.write(f"- {name}: {count} 票 ({', '.join(voters)})")
+        if frame["executed"]:
+            st.error(f"**{frame['executed']}** [{roles[frame['executed']]}] が処刑されました。")
+        else:
+            st.info("処刑はありませんでした。")
+        if frame.get("retaliation_victim"):
+            st.error(f"猫又の道連れ: **{frame['retaliation_victim']}**")
+    if frame.get("immoral_suicides"):
+        st.warning(f"後追い: **{', '.join(frame['immoral_suicides'])}**")
+    if frame.get("victory"):
+        st.success(frame["victory"]["message"])
+
+
+def _render_final_results(result):
+    st.subheader("最終結果")
+    if result["victory_team"]:
+        st.write(f"🎉 {result['victory_team']} 陣営の勝利！")
+    else:
+        st.warning("規定ターン内に勝敗が決まりませんでした。")
+    df_results = pd.DataFrame(result["players"])
+    df_results = df_results.rename(columns={"name": "名前", "role": "役職", "team": "陣営", "strategy": "戦略", "winner": "勝利"})
+    df_results["勝利"] = df_results["勝利"].map(lambda won: "🏆" if won else "")
+    st.dataframe(df_results[["名前", "役職", "陣営", "戦略", "勝利"]], hide_index=True)
+
+
+def _render_back_button():
+    st.markdown("--- ")
+    if st.button("設定に戻る"):
+        job = st.session_state.get("spectator_job")
+        if job is not None:
+            job.cancel() # 順番待ちなら取り消す
+        for key in ["spectator_job", "spectator_index", "spectator_autoplay"]:
+            if key in st.session_state:
+                del st.session_state[key]
+        st.session_state.stage = 'confirm_setup'
+        st.rerun()
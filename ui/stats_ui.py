@@ -0,0 +1,92 @@
+import streamlit as st
+import pandas as pd
+from game.results_store import ResultsStore
+from ui.resources import results_db_path
+
+ALL = "すべて"
+
+
+def render_stats():
+    """保存済みのゲームの統計 (陣営・役職ごとの勝率、死因) とプレイヤーのリーダーボードを表示する"""
+    st.header("統計📊")
+    store = ResultsStore(results_db_path())
+    try:
+        tab_stats, tab_leaderboard = st.tabs(["統計", "リーダーボード"])
+        with tab_stats:
+            _render_stats(store)
+        with tab_leaderboard:
+            _render_leaderboard(store)
+    finally:
+        store.close()
+    _render_back_button()
+
+
+def _render_stats(store: ResultsStore):
+    """陣営・役職ごとの勝率、死因 (集計テーブルから求める)"""
+    stats = store.stats()
+    months = stats.months()
+    if not months:
+        st.info("まだ保存されたゲームがありません。")
+        return
+
+    # --- 絞り込み ---
+    col1, col2 = st.columns(2)
+    player_count = col1.selectbox("プレイヤー数", options=[ALL] + stats.player_counts(), key="stats_player_count")
+    player_count = None if player_count == ALL else player_count
+    if len(months) > 1:
+        since, until = col2.select_slider("期間", options=months, value=(months[0], months[-1]), key="stats_months")
+    else:
+        since = until = months[0]
+        col2.write(f"期間: {since}")
+
+    summary = stats.summary(player_count, since, until)
+    col1, col2 = st.columns(2)
+    col1.metric("ゲーム数", summary["games"])
+    col2.metric("平均ターン数", f"{summary['avg_turns']:.1f}")
+
+    # --- 陣営 ---
+    st.subheader("陣営ごとの勝率")
+    teams = stats.team_stats(player_count, since, until)
+    if teams:
+        st.dataframe(pd.DataFrame([
+            {"陣営": t["team"], "ゲーム数": t["games"], "勝利": t["wins"], "勝率": f"{t['win_rate']:.1%}"}
+            for t in teams
+        ]), hide_index=True)
+
+    # --- 役職 ---
+    st.subheader("役職ごとの勝率・生存率")
+    roles = stats.role_stats(player_count, since, until)
+    if roles:
+        st.dataframe(pd.DataFrame([
+            {"役職": r["role"], "陣営": r["team"], "延べ人数": r["players"], "勝率": f"{r['win_rate']:.1%}",
+             "生存率": f"{r['survival_rate']:.1%}"}
+            for r in roles
+        ]), hide_index=True)
+
+    # --- 死因 ---
+    st.subheader("死因")
+    role = st.selectbox("役職", options=[ALL] + [r["role"] for r in roles], key="stats_death_role")
+    reasons = stats.death_reasons(None if role == ALL else role, player_count, since, until)
+    if reasons:
+        st.bar_chart(pd.DataFrame(reasons).set_index("reason")["deaths"], horizontal=True)
+    else:
+        st.write("該当する死亡はありません。")
+
+
+def _render_leaderboard(store: ResultsStore):
+    """プレイヤーごとのレーティング (ゲームの保存時に更新されたものを読むだけ)"""
+    ratings = store.ratings()
+    col1, col2 = st.columns(2)
+    team = col1.selectbox("陣営", options=[ALL] + ratings.teams(), key="leaderboard_team")
+    min_games = col2.number_input("最低試合数", min_value=1, value=1, step=1, key="leaderboard_min_games")
+    board = ratings.leaderboard(None if team == ALL else team, min_games=int(min_games))
+    if board:
+        st.dataframe(pd.DataFrame(board), hide_index=True)
+    else:
+        st.info("まだレーティングのあるプレイヤーがいません。")
+
+
+def _render_back_button():
+    if st.button("設定に戻る", key="stats_back"):
+        st.session_state.stage = 'initial_setup'
+        st.rerun()
@@ -0,0 +1,77 @@
+import os
+import time
+import streamlit as st
+import streamlit.components.v1 as components
+import config.settings as settings
+from game.discussion_timer import DiscussionTimer
+from ui.room_ui import room_update, peek_room_state
+
+DEFAULT_DISCUSSION_MINUTES = 3
+MIN_DISCUSSION_MINUTES = 1
+MAX_DISCUSSION_MINUTES = 10
+DEFAULT_TIMER_SYNC_SECONDS = 5 # 他の端末での開始・停止を反映する間隔 (秒)
+
+# フロントエンドは静的ファイル (ui/components/discussion_timer/index.html) として配信され、ブラウザには一度だけ読み込まれる。
+# 再実行のたびに送るのは残り時間と状態 (args) だけなので、HTML は埋め込み直されず、表示中のカウントダウンも途切れない
+_timer_component = components.declare_component(
+    "discussion_timer", path=os.path.join(os.path.dirname(__file__), "components", "discussion_timer"))
+
+
+def _current_timer(turn: int, saved) -> DiscussionTimer:
+    """このターンの議論タイマー (saved は画面の状態の discussion_timer)。ターンが変わっていれば新しいタイマーにする"""
+    if saved and saved.get("turn") == turn:
+        return DiscussionTimer.from_dict(saved["timer"])
+    return DiscussionTimer.new(DEFAULT_DISCUSSION_MINUTES * 60)
+
+
+def _apply_action(timer: DiscussionTimer, action: str, now: float) -> DiscussionTimer:
+    if action == "start":
+        return timer.start(now)
+    if action == "pause":
+        return timer.pause(now)
+    if action == "reset":
+        return timer.reset()
+    if action in ("minus", "plus") and not timer.running:
+        minutes = round(timer.duration / 60) + (1 if action == "plus" else -1)
+        minutes = min(max(minutes, MIN_DISCUSSION_MINUTES), MAX_DISCUSSION_MINUTES)
+        return timer.reset(minutes * 60)
+    return timer
+
+
+def _render_timer(turn: int):
+    """
+    昼の議論タイマー。残り時間はルームの画面の状態 (discussion_timer) が持つため、投票などで画面が再実行されても、
+    別の端末から開いても同じ残り時間になる。
+    ボタンを押したときだけルームのロックを取って書き換え、チェックポイントを取る。
+    """
+    # タイマーのボタンの操作 (前回の描画の後に押されたもの)。同じ操作を2回処理しないよう、処理済みの値を覚えておく
+    action = st.session_state.get("discussion_timer_view")
+    if action and action != st.session_state.get("discussion_timer_action"):
+        st.session_state.discussion_timer_action = action
+        with room_update():
+            timer = _apply_action(_current_timer(turn, st.session_state.get("discussion_timer")), action["action"],
+                                  time.time())
+            st.session_state.discussion_timer = {"turn": turn, "timer": timer.to_dict()}
+    else:
+        # 定期的な再実行では、ルームで共有しているタイマーを読むだけにする (ロックもチェックポイントも取らない)
+        timer = _current_timer(turn, peek_room_state("discussion_timer"))
+    _timer_component(
+        remaining=timer.remaining_at(time.time()), running=timer.running, duration=timer.duration,
+        min=MIN_DISCUSSION_MINUTES * 60, max=MAX_DISCUSSION_MINUTES * 60,
+        key="discussion_timer_view", default=None)
+
+
+# 各自の端末で参加するゲームでは、数秒ごとにこの部分だけを再実行して他の端末での開始・停止を反映する。
+# 1台の端末で遊ぶゲームでは他の端末から操作されないので、ボタンを押したときだけ再実行する
+_synced_timer = st.fragment(run_every=getattr(settings, "DISCUSSION_TIMER_SYNC_SECONDS", DEFAULT_TIMER_SYNC_SECONDS))(
+    _render_timer)
+_local_timer = st.fragment(_render_timer)
+
+
+def render_discussion_timer():
+    """昼の議論タイマーを描画する (昼の画面全体の描画の中で呼ぶ)"""
+    turn = st.session_state.game_manager.turn
+    if st.session_state.get("multi_device", False):
+        _synced_timer(turn)
+    else:
+        _local_timer(turn)
@@ -0,0 +1,65 @@
+import streamlit as st
+from game.undo import UndoStack
+
+# 取り消しで戻す画面の状態 (夜の手番と夜アクション、昼の投票)
+UNDO_SESSION_KEYS = ("current_player_index", "night_actions", "day_votes")
+UNDO_SESSION_KEY_PREFIXES = ("action_confirmed_",)
+# 戻したときに選択をやり直せるよう、リセットする入力欄
+UNDO_WIDGET_KEY_PREFIXES = ("vote_radio_", "vote_select_", "action_target_", "role_toggle_")
+
+
+def _get_stack() -> UndoStack:
+    if "undo_stack" not in st.session_state:
+        st.session_state.undo_stack = UndoStack()
+    stack = st.session_state.undo_stack
+    stack.sync_phase(st.session_state.game_manager)
+    return stack
+
+
+def push_undo_point(label: str):
+    """
+    操作の直前に呼び、戻る地点を記録する。
+    night_actions / day_votes は書き換えずに新しい辞書で置き換えること (記録は参照を持つだけのため)。
+    """
+    session = {key: st.session_state.get(key) for key in UNDO_SESSION_KEYS}
+    for key in st.session_state.keys():
+        if key.startswith(UNDO_SESSION_KEY_PREFIXES):
+            session[key] = st.session_state[key]
+    _get_stack().push(label, st.session_state.game_manager, session)
+
+
+def clear_undo():
+    """取り消しの履歴を消す (処刑など、取り消せない操作の後)"""
+    if "undo_stack" in st.session_state:
+        st.session_state.undo_stack.clear()
+
+
+def _restore(session):
+    for key in list(st.session_state.keys()):
+        if key.startswith(UNDO_SESSION_KEY_PREFIXES + UNDO_WIDGET_KEY_PREFIXES):
+            del st.session_state[key]
+    for key, value in session.items():
+        if value is None:
+            if key in st.session_state:
+                del st.session_state[key]
+        else:
+            st.session_state[key] = value
+
+
+def render_undo_controls():
+    """進行役向けの取り消し操作 (このフェーズ内の任意の地点まで戻せる)"""
+    stack = _get_stack()
+    if not len(stack):
+        return
+    with st.expander(f"操作の取り消し (進行役用・{len(stack)} 件)"):
+        if st.button("↩️ 直前の操作を取り消す", key="undo_last"):
+            _restore(stack.undo(st.session_state.game_manager))
+            st.rerun()
+        st.caption("このフェーズ内の任意の操作の前まで戻せます。")
+        for index in reversed(range(len(stack))):
+            point = stack.points[index]
+            col1, col2 = st.columns([4, 1])
+            col1.write(f"{index + 1}. {point.label}")
+            if col2.button("ここまで戻す", key=f"undo_to_{index}"):
+                _restore(stack.rollback(st.session_state.game_manager, index))
+                st.rerun()